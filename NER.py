@@ -1,19 +1,64 @@
 import re
-import hashlib
-from typing import Dict, List
-from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+from bisect import bisect_left
+from typing import Dict, List, Optional
+from models import get_pipeline, plan_batches
+from cache import cached_inference
+from inference_server import remote_inference
 
-MODEL_NAME = "akdeniz27/bert-base-turkish-cased-ner"
+def _get_ner(): # model ilk kullanımda config.json'daki ayarlarla yüklenir
+    return get_pipeline("ner")
 
-_tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME) #tokenizer yükleme
-_model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME) #model yükleme
+TR_SUFFIX_RE = re.compile(r"^'[\wçğıöşüÇĞİÖŞÜ]+") # Türkçe ekleri ayırmak için regex
 
-_ner = pipeline("ner", model=_model, tokenizer=_tokenizer, aggregation_strategy="simple")
+def apply_ner(text: str) -> List[Dict]: # metin üzerinde NER uygulama (önbellek açıksa önce önbelleğe bakılır)
+    remote = remote_inference("ner", [text]) # çıkarım sunucusu kullanılıyorsa model yerelde yüklenmez
+    if remote is not None:
+        return remote[0]
+    return cached_inference("ner", [text], lambda texts: [_get_ner()(texts[0])])[0]
 
-TR_SUFFIX_RE = re.compile(r"^'[\wçğıöşüÇĞİÖŞÜ]+") # Türkçe ekleri ayırmak için regex
+def apply_ner_batch(texts: List[str], batch_size: int = 32, max_tokens: int = 4096) -> List[List[Dict]]:
+    """
+    Birden fazla metin üzerinde toplu (batch) NER uygular.
+
+    Mesajlar token uzunluğuna göre sıralanır, benzer uzunluktakiler aynı batch'e
+    konur ve pipeline her batch için bir kez çalıştırılır. Sonuçlar orijinal
+    sırayla döner; karakter offset'leri her mesajın kendi metnine göredir.
+
+    Args:
+        texts: NER uygulanacak metin listesi
+        batch_size: Bir batch'teki en fazla mesaj sayısı
+        max_tokens: Bir batch'in doldurulmuş toplam token bütçesi
+
+    Returns:
+        List[List[Dict]]: Her metin için apply_ner ile aynı formatta entity listesi
+    """
+    # Çıkarım sunucusu kullanılıyorsa batch'leme sunucuda, kendi ayarlarıyla yapılır
+    remote = remote_inference("ner", texts)
+    if remote is not None:
+        return remote
+    # Önbellekte olanlar modele hiç gönderilmez
+    return cached_inference("ner", texts, lambda misses: _run_ner_batch(misses, batch_size, max_tokens))
+
+def _run_ner_batch(texts: List[str], batch_size: int, max_tokens: int) -> List[List[Dict]]:
+    """apply_ner_batch'in önbelleksiz çekirdeği"""
+    results = [[] for _ in texts]
+    # Boş mesajlar modele gönderilmez
+    pending = [i for i, t in enumerate(texts) if t and t.strip()]
+    if not pending:
+        return results
+
+    ner = _get_ner()
+    tokenizer = ner.tokenizer
+    max_len = tokenizer.model_max_length if tokenizer.model_max_length < 100000 else 512
+    encoded = tokenizer([texts[i] for i in pending], truncation=True, max_length=max_len)["input_ids"]
+    lengths = [len(ids) for ids in encoded]
 
-def apply_ner(text: str) -> List[Dict]: # metin üzerinde NER uygulama
-    return _ner(text)
+    for batch in plan_batches(lengths, batch_size, max_tokens):
+        batch_texts = [texts[pending[j]] for j in batch]
+        outputs = ner(batch_texts, batch_size=len(batch_texts))
+        for j, ents in zip(batch, outputs):
+            results[pending[j]] = ents
+    return results
 
 def norm_ent(e): # normalize entity dictionary -> Dict: 
     label = e.get('entity_group', e.get('entity')) or e.get('label')
@@ -29,13 +74,20 @@ def norm_ent(e): # normalize entity dictionary -> Dict:
         'end': end
     }
 
+def tr_casefold(text: str) -> str: # Türkçe büyük/küçük harf katlama (İ -> i, I -> ı)
+    return text.replace("İ", "i").replace("I", "ı").lower()
+
 def filter_messages(messages, label=None, query=None, min_score=0.6): # filtreleme fonksiyonu
     """
     label: "PER", "LOC", "ORG" gibi
-    query: value içinde geçen substring ("ankara", "ahmet")
+    query: value içinde geçen substring ("ankara", "ahmet"), Türkçe harf katlamasıyla karşılaştırılır
+    messages EntityIndex ise tarama yapılmaz, indeksten sorgulanır.
     """
+    if isinstance(messages, EntityIndex):
+        return messages.filter(label=label, query=query, min_score=min_score)
+
     out = []
-    q = query.lower() if isinstance(query, str) else None
+    q = tr_casefold(query) if isinstance(query, str) else None
 
     for m in messages: # her mesaj için
         ents = m.get("ents") or []
@@ -46,7 +98,7 @@ def filter_messages(messages, label=None, query=None, min_score=0.6): # filtrele
                 continue
             if label and ne["label"] != label:
                 continue
-            if q and q not in (ne["value"] or "").lower():
+            if q and q not in tr_casefold(ne["value"] or ""):
                 continue
             ok = True
             break
@@ -54,4 +106,138 @@ def filter_messages(messages, label=None, query=None, min_score=0.6): # filtrele
             out.append(m)
 
     return out
-    
+
+class EntityIndex:
+    """
+    NER sonuçları üzerinde bir kez kurulan ters indeks; filter_messages sorgularını taramasız yanıtlar.
+
+    Entity'ler kurulumda bir kez normalize edilir. Her (değer, etiket) ve her
+    etiket için skora göre sıralı posting listeleri tutulur; min_score süzgeci
+    ikili arama ile yapılır. Türkçe harf katlamalı değerlerin sıralı sonek
+    listesi önek ve alt dize aramalarını da ikili aramaya indirger. Sorgu süresi
+    sonuç sayısıyla orantılıdır.
+
+    Args:
+        messages: {'text': str, 'ents': List[Dict]} formatında liste veya MessageTable
+    """
+
+    def __init__(self, messages):
+        from message_table import MessageTable
+
+        self.messages = messages
+        records = messages.iter_records() if isinstance(messages, MessageTable) else messages
+        value_ids = {}
+        postings = {}       # (değer id, etiket) -> [(skor, mesaj)]
+        label_postings = {} # etiket (None = tümü) -> [(skor, mesaj)]
+        value_labels = {}   # değer id -> etiketler
+
+        for i, m in enumerate(records):
+            for e in m.get("ents") or []:
+                ne = norm_ent(e)
+                label = ne["label"]
+                if label is None:
+                    continue
+                value = tr_casefold(ne["value"] or "")
+                vid = value_ids.setdefault(value, len(value_ids))
+                hit = (ne["score"], i)
+                postings.setdefault((vid, label), []).append(hit)
+                label_postings.setdefault(label, []).append(hit)
+                label_postings.setdefault(None, []).append(hit)
+                value_labels.setdefault(vid, {})[label] = None
+
+        self.size = len(messages)
+        self.values = list(value_ids)
+        self._value_ids = value_ids
+        self._value_labels = {vid: list(labels) for vid, labels in value_labels.items()}
+        self._postings = {key: self._sorted_postings(hits) for key, hits in postings.items()}
+        self._label_postings = {key: self._sorted_postings(hits) for key, hits in label_postings.items()}
+        # Önek araması için sıralı değerler, alt dize araması için sıralı sonekler
+        order = sorted(range(len(self.values)), key=self.values.__getitem__)
+        self._sorted_values = [self.values[vid] for vid in order]
+        self._sorted_value_ids = order
+        suffixes = sorted((v[k:], vid) for vid, v in enumerate(self.values) for k in range(len(v)))
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._suffix_value_ids = [vid for _, vid in suffixes]
+
+    @staticmethod
+    def _sorted_postings(hits):
+        """(skor, mesaj) listesini artan skor sırasıyla iki paralel listeye çevirir"""
+        hits.sort(key=lambda hit: hit[0])
+        return [score for score, _ in hits], [msg for _, msg in hits]
+
+    @property
+    def labels(self) -> List[str]:
+        """İndeksteki etiketler"""
+        return [label for label in self._label_postings if label is not None]
+
+    def _prefix_range(self, keys: List[str], prefix: str):
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + "\U0010ffff")
+        return lo, hi
+
+    def match_values(self, query: str, match: str = "substring") -> List[int]:
+        """
+        Sorguya uyan (harf katlanmış) değerlerin id'leri.
+
+        Args:
+            query: Aranan metin
+            match: "substring" (değer içinde geçen), "prefix" (değerin başı) veya "exact"
+
+        Returns:
+            List[int]: Değer id'leri (self.values indeksleri)
+        """
+        q = tr_casefold(query)
+        if match == "exact":
+            return [self._value_ids[q]] if q in self._value_ids else []
+        if match == "prefix":
+            lo, hi = self._prefix_range(self._sorted_values, q)
+            return self._sorted_value_ids[lo:hi]
+        if match != "substring":
+            raise ValueError(f"Bilinmeyen eşleşme türü: {match}")
+        lo, hi = self._prefix_range(self._suffixes, q)
+        return list(dict.fromkeys(self._suffix_value_ids[lo:hi]))
+
+    def search(self, label: Optional[str] = None, query: Optional[str] = None,
+               min_score: float = 0.6, match: str = "substring") -> List[int]:
+        """
+        filter_messages ile aynı koşulu sağlayan mesajların indekslerini döndürür.
+
+        Args:
+            label: "PER", "LOC", "ORG" gibi (None ise tüm etiketler)
+            query: Değerde aranan metin (None veya boşsa değer süzgeci yok)
+            min_score: En düşük entity skoru
+            match: query için "substring", "prefix" veya "exact"
+
+        Returns:
+            List[int]: Artan sırada mesaj indeksleri
+        """
+        if query:
+            lists = []
+            for vid in self.match_values(query, match):
+                for lab in ([label] if label else self._value_labels.get(vid, [])):
+                    posting = self._postings.get((vid, lab))
+                    if posting is not None:
+                        lists.append(posting)
+        else:
+            posting = self._label_postings.get(label or None)
+            lists = [posting] if posting is not None else []
+
+        found = set()
+        for scores, msgs in lists:
+            found.update(msgs[bisect_left(scores, min_score):])
+        return sorted(found)
+
+    def filter(self, label: Optional[str] = None, query: Optional[str] = None,
+               min_score: float = 0.6, match: str = "substring"):
+        """
+        search() sonucunu mesaj olarak döndürür (filter_messages'ın indeksli karşılığı).
+
+        Returns:
+            List[Dict] veya MessageTable: Girdi bir tabloysa seçilen satırların tablosu
+        """
+        from message_table import MessageTable
+
+        indices = self.search(label=label, query=query, min_score=min_score, match=match)
+        if isinstance(self.messages, MessageTable):
+            return self.messages.take(indices)
+        return [self.messages[i] for i in indices]
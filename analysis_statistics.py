@@ -2,9 +2,13 @@
 İstatistik ve Analiz Modülü
 Mesajlar hakkında detaylı istatistikler ve analizler sağlar.
 """
+from abc import ABC, abstractmethod
 from typing import Dict, List, Counter
 from collections import Counter
+import math
 import re
+from message_table import MessageTable, as_message_list, decode_text
+from sketches import SpaceSaving, CountMinSketch, sketch_from_dict
 
 def count_words(text: str) -> int:
     """Metindeki kelime sayısını hesaplar"""
@@ -14,53 +18,189 @@ def count_characters(text: str) -> int:
     """Metindeki karakter sayısını hesaplar"""
     return len(text)
 
+# Emoji aralıkları; desen bir kez derlenir ve NumPy çekirdeğinde de aynı aralıklar kullanılır
+EMOJI_RANGES = [
+    (0x1F600, 0x1F64F),  # emoticons
+    (0x1F300, 0x1F5FF),  # symbols & pictographs
+    (0x1F680, 0x1F6FF),  # transport & map symbols
+    (0x1F1E0, 0x1F1FF),  # flags
+    (0x2702, 0x27B0),
+    (0x24C2, 0x1F251),
+]
+EMOJI_RE = re.compile(
+    "[" + "".join(f"{chr(lo)}-{chr(hi)}" for lo, hi in EMOJI_RANGES) + "]+",
+    flags=re.UNICODE
+)
+_EMOJI_MIN = min(lo for lo, _ in EMOJI_RANGES)
+
+# Karakter uzunluğu histogramının kova genişliği
+CHAR_BUCKET_SIZE = 10
+# NumPy çekirdeğinin tek seferde işlediği en fazla tampon baytı (bellek sınırı)
+_KERNEL_CHUNK_BYTES = 1 << 22
+
 def count_emojis(text: str) -> int:
     """Metindeki emoji sayısını hesaplar"""
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251"
-        "]+", flags=re.UNICODE)
-    return len(emoji_pattern.findall(text))
-
-def get_message_statistics(messages: List[str]) -> Dict:
+    return len(EMOJI_RE.findall(text))
+
+def _whitespace_table():
+    """str.split()'in boşluk saydığı kod noktaları için arama tablosu (hepsi U+3000 ve altında)"""
+    import numpy as np
+
+    global _WHITESPACE_TABLE
+    if _WHITESPACE_TABLE is None:
+        _WHITESPACE_TABLE = np.array([chr(c).isspace() for c in range(0x3001)], dtype=bool)
+    return _WHITESPACE_TABLE
+
+_WHITESPACE_TABLE = None
+
+def _table_word_emoji_counts(table: MessageTable):
+    """
+    MessageTable için mesaj başına kelime ve emoji sayılarını vektörel hesaplar.
+
+    UTF-8 tamponu parça parça kod noktası dizisine çevrilir (mesajların bayt
+    offset'leri karakter offset'lerine dönüştürülür); kelime ve emoji dizilerinin
+    başlangıçları maskelerle bulunup mesaja göre sayılır.
+    """
+    import numpy as np
+
+    n = len(table)
+    offsets = table.offsets
+    words = np.zeros(n, dtype=np.int64)
+    emojis = np.zeros(n, dtype=np.int64)
+    ws_table = _whitespace_table()
+
+    first_msg = 0
+    while first_msg < n:
+        last_msg = int(np.searchsorted(offsets, offsets[first_msg] + _KERNEL_CHUNK_BYTES, side="right")) - 1
+        last_msg = min(max(last_msg, first_msg + 1), n)
+        base = int(offsets[first_msg])
+        chunk = table.buffer[base:int(offsets[last_msg])]
+        codes = np.frombuffer(decode_text(chunk).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        # Bayt -> karakter konumu: UTF-8 devam baytları (10xxxxxx) yeni karakter başlatmaz
+        char_pos = np.zeros(len(chunk) + 1, dtype=np.int64)
+        np.cumsum((np.frombuffer(chunk, dtype=np.uint8) & 0xC0) != 0x80, out=char_pos[1:])
+        local = char_pos[offsets[first_msg:last_msg + 1] - base]
+        if len(codes):
+            msg_start = np.zeros(len(codes), dtype=bool)
+            starts = local[:-1]
+            msg_start[starts[starts < len(codes)]] = True
+
+            # Boşluk olup olmadığı tabloya bakılması gereken kod noktaları (ASCII kontrol ve U+0085..U+3000) seyrektir
+            space = codes == 32
+            unusual = np.flatnonzero((codes < 32) | ((codes >= 0x85) & (codes < len(ws_table))))
+            space[unusual] = ws_table[codes[unusual]]
+            # Emoji aralıkları yalnızca en küçük alt sınırın üstündeki (seyrek) kod noktalarında denetlenir
+            emoji = np.zeros(len(codes), dtype=bool)
+            candidates = np.flatnonzero(codes >= _EMOJI_MIN)
+            if len(candidates):
+                sub = codes[candidates]
+                hit = np.zeros(len(sub), dtype=bool)
+                for lo, hi in EMOJI_RANGES:
+                    hit |= (sub >= lo) & (sub <= hi)
+                emoji[candidates[hit]] = True
+
+            for mask, out in ((~space, words), (emoji, emojis)):
+                run_start = mask.copy()
+                run_start[1:] &= ~mask[:-1]
+                run_start |= mask & msg_start
+                # Her dizi başlangıcı, offset'i kendisinden küçük-eşit olan son mesaja aittir
+                owner = np.searchsorted(local, np.flatnonzero(run_start), side="right") - 1
+                out[first_msg:last_msg] = np.bincount(owner, minlength=last_msg - first_msg)
+        first_msg = last_msg
+    return words, emojis
+
+def compute_message_kernel(messages) -> Dict:
+    """
+    Tüm mesaj istatistiklerini tek geçişte hesaplayan birleşik çekirdek.
+
+    Kelime, karakter ve emoji toplamları, en uzun/en kısa mesaj ve uzunluk
+    histogramları tek döngüde (MessageTable için NumPy ile vektörel) üretilir.
+
+    Args:
+        messages: Mesaj metinlerinin listesi veya MessageTable
+
+    Returns:
+        Dict: Toplamlar, en uzun/en kısa mesaj ve histogramlar
+            ('word_count_histogram'[k] = k kelimeli mesaj sayısı,
+             'char_length_histogram'[b] = uzunluğu b. kovada olan mesaj sayısı)
+    """
+    total_messages = len(messages)
+    if not total_messages:
+        return {}
+
+    if isinstance(messages, MessageTable):
+        import numpy as np
+
+        lengths = messages.char_lengths()
+        words, emojis = _table_word_emoji_counts(messages)
+        longest_msg = messages.text(int(lengths.argmax()))
+        shortest_msg = messages.text(int(lengths.argmin()))
+        total_words = int(words.sum())
+        total_chars = int(lengths.sum())
+        total_emojis = int(emojis.sum())
+        word_hist = np.bincount(words).tolist()
+        char_hist = np.bincount(lengths // CHAR_BUCKET_SIZE).tolist()
+    else:
+        findall = EMOJI_RE.findall
+        lengths = []
+        word_counts = []
+        total_emojis = 0
+        for msg in messages:
+            lengths.append(len(msg))
+            word_counts.append(len(msg.split()))
+            total_emojis += len(findall(msg))
+        total_words = sum(word_counts)
+        total_chars = sum(lengths)
+        # İlk en uzun / ilk en kısa mesaj (max/min ile aynı seçim)
+        longest_msg = messages[max(range(total_messages), key=lengths.__getitem__)]
+        shortest_msg = messages[min(range(total_messages), key=lengths.__getitem__)]
+        word_counter = Counter(word_counts)
+        char_counter = Counter(length // CHAR_BUCKET_SIZE for length in lengths)
+        word_hist = [word_counter.get(i, 0) for i in range(max(word_counter) + 1)]
+        char_hist = [char_counter.get(i, 0) for i in range(max(char_counter) + 1)]
+
+    return {
+        'total_messages': total_messages,
+        'total_words': total_words,
+        'total_characters': total_chars,
+        'total_emojis': total_emojis,
+        'longest_message': longest_msg,
+        'shortest_message': shortest_msg,
+        'word_count_histogram': word_hist,
+        'char_length_histogram': char_hist,
+        'char_bucket_size': CHAR_BUCKET_SIZE
+    }
+
+def get_message_statistics(messages: List[str], kernel: Dict = None) -> Dict:
     """
     Mesaj listesi için genel istatistikler hesaplar.
     
     Args:
-        messages: Mesaj metinlerinin listesi
+        messages: Mesaj metinlerinin listesi veya MessageTable
+        kernel: Önceden hesaplanmış compute_message_kernel çıktısı (verilirse yeniden taranmaz)
         
     Returns:
         Dict: İstatistikler
     """
-    if not messages:
+    if kernel is None:
+        kernel = compute_message_kernel(messages)
+    if not kernel:
         return {}
     
-    total_messages = len(messages)
-    total_words = sum(count_words(msg) for msg in messages)
-    total_chars = sum(count_characters(msg) for msg in messages)
-    total_emojis = sum(count_emojis(msg) for msg in messages)
+    total_messages = kernel['total_messages']
+    total_words = kernel['total_words']
+    total_chars = kernel['total_characters']
+    longest_msg = kernel['longest_message']
+    shortest_msg = kernel['shortest_message']
     
     avg_words_per_message = total_words / total_messages if total_messages > 0 else 0
     avg_chars_per_message = total_chars / total_messages if total_messages > 0 else 0
     
-    # En uzun ve en kısa mesajlar
-    if messages:
-        longest_msg = max(messages, key=len)
-        shortest_msg = min(messages, key=len)
-    else:
-        longest_msg = ""
-        shortest_msg = ""
-    
     return {
         'total_messages': total_messages,
         'total_words': total_words,
         'total_characters': total_chars,
-        'total_emojis': total_emojis,
+        'total_emojis': kernel['total_emojis'],
         'avg_words_per_message': round(avg_words_per_message, 2),
         'avg_characters_per_message': round(avg_chars_per_message, 2),
         'longest_message': longest_msg[:100] + "..." if len(longest_msg) > 100 else longest_msg,
@@ -69,45 +209,64 @@ def get_message_statistics(messages: List[str]) -> Dict:
         'shortest_message_length': len(shortest_msg)
     }
 
-def get_most_common_words(messages: List[str], top_n: int = 10, min_length: int = 3) -> List[tuple]:
+# "auto" kipinde kesin sayımın kullanıldığı en fazla mesaj sayısı
+AUTO_EXACT_MAX_MESSAGES = 100000
+# Özetler güncellenirken tek seferde kesin sayılan mesaj sayısı (geçici sözlüğü sınırlar)
+SKETCH_CHUNK_MESSAGES = 5000
+
+def get_most_common_words(messages: List[str], top_n: int = 10, min_length: int = 3,
+                          mode: str = "exact", **sketch_options) -> List[tuple]:
     """
     En sık kullanılan kelimeleri bulur.
     
     Args:
-        messages: Mesaj listesi
+        messages: Mesaj listesi veya MessageTable
         top_n: Kaç kelime döndürülecek
         min_length: Minimum kelime uzunluğu
+        mode: "exact" (tam Counter), "space_saving" / "count_min" (sınırlı bellekli özet)
+            veya "auto" (küçük girdilerde exact, büyüklerde space_saving)
+        **sketch_options: WordSketchAccumulator'a verilecek epsilon, delta, capacity
         
     Returns:
-        List[tuple]: (kelime, sayı) formatında liste
+        List[tuple]: (kelime, sayı) formatında liste; özet kiplerinde
+            (kelime, sayı, hata) WordEstimate listesi
     """
-    # Türkçe stop words (basit bir liste)
-    stop_words = {
-        'bir', 'bu', 'şu', 'o', 've', 'ile', 'için', 'gibi', 'kadar',
-        'de', 'da', 'ki', 'mi', 'mı', 'mu', 'mü', 'var', 'yok',
-        'ben', 'sen', 'biz', 'siz', 'onlar', 'benim', 'senin'
-    }
-    
-    all_words = []
-    for msg in messages:
-        # Kelimeleri ayır ve temizle
-        words = re.findall(r'\b\w+\b', msg.lower())
-        words = [w for w in words if len(w) >= min_length and w not in stop_words]
-        all_words.extend(words)
-    
-    word_counts = Counter(all_words)
+    if mode == "auto":
+        mode = "exact" if len(messages) <= AUTO_EXACT_MAX_MESSAGES else "space_saving"
+    if mode != "exact":
+        acc = WordSketchAccumulator(mode=mode, min_length=min_length, **sketch_options)
+        return acc.update(messages).result(top_n)
+
+    word_counts = Counter()
+    for msg in as_message_list(messages):
+        word_counts.update(_filtered_words(msg, min_length))
     return word_counts.most_common(top_n)
 
+# Türkçe stop words (basit bir liste)
+STOP_WORDS = {
+    'bir', 'bu', 'şu', 'o', 've', 'ile', 'için', 'gibi', 'kadar',
+    'de', 'da', 'ki', 'mi', 'mı', 'mu', 'mü', 'var', 'yok',
+    'ben', 'sen', 'biz', 'siz', 'onlar', 'benim', 'senin'
+}
+RE_WORD = re.compile(r'\b\w+\b')
+
+def _filtered_words(msg: str, min_length: int = 3) -> List[str]:
+    """Mesajı küçük harfe çevirip kelimelere ayırır; kısa kelimeleri ve stop words'ü atar"""
+    return [w for w in RE_WORD.findall(msg.lower()) if len(w) >= min_length and w not in STOP_WORDS]
+
 def get_entity_statistics(messages_with_entities: List[Dict]) -> Dict:
     """
     NER sonuçları için istatistikler hesaplar.
     
     Args:
-        messages_with_entities: {'text': str, 'ents': List[Dict]} formatında liste
+        messages_with_entities: {'text': str, 'ents': List[Dict]} formatında liste veya MessageTable
         
     Returns:
         Dict: Entity istatistikleri
     """
+    if isinstance(messages_with_entities, MessageTable):
+        return _table_entity_statistics(messages_with_entities)
+    
     entity_counts = Counter()
     entity_by_label = {}
     
@@ -128,19 +287,512 @@ def get_entity_statistics(messages_with_entities: List[Dict]) -> Dict:
         'unique_entities': {k: list(set(v))[:10] for k, v in entity_by_label.items()}  # Her label'dan ilk 10
     }
 
+def _table_entity_statistics(table: MessageTable) -> Dict:
+    """get_entity_statistics'in MessageTable sürümü (etiket sayımları bincount ile)"""
+    entity_counts = table.entity_label_counts()
+    unique_entities = {}
+    if entity_counts:
+        for code, label in enumerate(table.entity_labels):
+            words = set()
+            for j in (table.ent_label_codes == code).nonzero()[0].tolist():
+                words.add(table.entity_word(j))
+            if words:
+                unique_entities[label] = list(words)[:10]
+    
+    return {
+        'total_entities': sum(entity_counts.values()),
+        'entity_counts': entity_counts,
+        'entities_by_label': dict(entity_counts),
+        'unique_entities': unique_entities
+    }
+
 def compare_authors(messages_dict: Dict[str, List[str]]) -> Dict:
     """
     Farklı yazarların mesajlarını karşılaştırır.
     
     Args:
-        messages_dict: {'author_key': [messages]} formatında dict
+        messages_dict: {'author_key': [messages]} formatında dict veya MessageTable
         
     Returns:
         Dict: Karşılaştırma istatistikleri
     """
     comparison = {}
+    if isinstance(messages_dict, MessageTable):
+        messages_dict = messages_dict.by_author()
     
     for author, msgs in messages_dict.items():
         comparison[author] = get_message_statistics(msgs)
     
     return comparison
+
+class StatisticsAccumulator(ABC):
+    """
+    Birleştirilebilir, artımlı istatistik biriktiricilerin temel sınıfı.
+
+    update(batch) yeni mesajları ekler, merge(other) başka bir parçanın
+    biriktiricisini bu biriktiricinin *ardına* ekler. Parçalar mesaj sırasıyla
+    birleştirildiğinde result() tüm mesajlar üzerinde doğrudan hesaplanan
+    sonuçla aynıdır. to_dict()/from_dict() JSON'a yazılabilir durum üretir.
+    """
+
+    @abstractmethod
+    def update(self, batch) -> "StatisticsAccumulator":
+        ...
+
+    @abstractmethod
+    def merge(self, other: "StatisticsAccumulator") -> "StatisticsAccumulator":
+        ...
+
+    @abstractmethod
+    def result(self, *args, **kwargs) -> Dict:
+        ...
+
+    @abstractmethod
+    def to_dict(self) -> Dict:
+        ...
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, state: Dict) -> "StatisticsAccumulator":
+        ...
+
+class MessageStatisticsAccumulator(StatisticsAccumulator):
+    """get_message_statistics için biriktirici; durum compute_message_kernel çıktısıdır"""
+
+    def __init__(self):
+        self.kernel = {}
+
+    def update(self, batch) -> "MessageStatisticsAccumulator":
+        """
+        Mesaj grubunu ekler.
+
+        Args:
+            batch: Mesaj metinlerinin listesi veya MessageTable
+        """
+        return self._merge_kernel(compute_message_kernel(batch))
+
+    def merge(self, other: "MessageStatisticsAccumulator") -> "MessageStatisticsAccumulator":
+        return self._merge_kernel(other.kernel)
+
+    def _merge_kernel(self, kernel: Dict) -> "MessageStatisticsAccumulator":
+        if not kernel:
+            return self
+        if not self.kernel:
+            self.kernel = dict(kernel)
+            return self
+        merged = self.kernel
+        for key in ('total_messages', 'total_words', 'total_characters', 'total_emojis'):
+            merged[key] += kernel[key]
+        # Eşitlikte önceki parçanın mesajı kalır (tek geçişteki "ilk en uzun/en kısa" seçimi)
+        if len(kernel['longest_message']) > len(merged['longest_message']):
+            merged['longest_message'] = kernel['longest_message']
+        if len(kernel['shortest_message']) < len(merged['shortest_message']):
+            merged['shortest_message'] = kernel['shortest_message']
+        for key in ('word_count_histogram', 'char_length_histogram'):
+            merged[key] = _add_histograms(merged[key], kernel[key])
+        return self
+
+    def result(self) -> Dict:
+        """get_message_statistics formatında sonuç"""
+        return get_message_statistics([], kernel=self.kernel)
+
+    def to_dict(self) -> Dict:
+        return {'kernel': self.kernel}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "MessageStatisticsAccumulator":
+        acc = cls()
+        acc.kernel = dict(state.get('kernel', {}))
+        return acc
+
+def _add_histograms(a: List[int], b: List[int]) -> List[int]:
+    """Farklı uzunluktaki iki histogramı eleman eleman toplar"""
+    if len(a) < len(b):
+        a, b = b, a
+    return [x + (b[i] if i < len(b) else 0) for i, x in enumerate(a)]
+
+class WordCountAccumulator(StatisticsAccumulator):
+    """
+    get_most_common_words için biriktirici.
+
+    Counter ilk görülme sırasını koruduğundan, eşit sayıdaki kelimelerin
+    sıralaması da tek geçişteki most_common sonucuyla aynıdır.
+    """
+
+    def __init__(self, min_length: int = 3):
+        self.min_length = min_length
+        self.counts = Counter()
+
+    def update(self, batch) -> "WordCountAccumulator":
+        """
+        Mesaj grubunu ekler.
+
+        Args:
+            batch: Mesaj metinlerinin listesi veya MessageTable
+        """
+        counts = self.counts
+        for msg in as_message_list(batch):
+            counts.update(_filtered_words(msg, self.min_length))
+        return self
+
+    def merge(self, other: "WordCountAccumulator") -> "WordCountAccumulator":
+        if other.min_length != self.min_length:
+            raise ValueError("Farklı min_length ile biriktirilmiş kelime sayımları birleştirilemez")
+        self.counts.update(other.counts)
+        return self
+
+    def result(self, top_n: int = 10) -> List[tuple]:
+        """get_most_common_words formatında (kelime, sayı) listesi"""
+        return self.counts.most_common(top_n)
+
+    def to_dict(self) -> Dict:
+        return {'min_length': self.min_length, 'counts': dict(self.counts)}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "WordCountAccumulator":
+        acc = cls(state.get('min_length', 3))
+        acc.counts.update(state.get('counts', {}))
+        return acc
+
+class EntityStatisticsAccumulator(StatisticsAccumulator):
+    """
+    get_entity_statistics için biriktirici.
+
+    Kelime listeleri yerine etiket başına ilk görülme sırasıyla tekil kelimeler
+    tutulur; bu, set() sonucunu (ve dolayısıyla 'unique_entities' çıktısını) değiştirmez.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.words = {}
+
+    def update(self, batch) -> "EntityStatisticsAccumulator":
+        """
+        Mesaj grubunu ekler.
+
+        Args:
+            batch: {'text': str, 'ents': List[Dict]} formatında liste veya MessageTable
+        """
+        records = batch.iter_records() if isinstance(batch, MessageTable) else batch
+        counts = self.counts
+        words = self.words
+        for msg in records:
+            for ent in msg.get('ents') or []:
+                label = ent.get('entity_group') or ent.get('label') or 'UNKNOWN'
+                counts[label] += 1
+                words.setdefault(label, {})[ent.get('word', '')] = None
+        return self
+
+    def merge(self, other: "EntityStatisticsAccumulator") -> "EntityStatisticsAccumulator":
+        self.counts.update(other.counts)
+        for label, label_words in other.words.items():
+            self.words.setdefault(label, {}).update(label_words)
+        return self
+
+    def result(self) -> Dict:
+        """get_entity_statistics formatında sonuç"""
+        return {
+            'total_entities': sum(self.counts.values()),
+            'entity_counts': dict(self.counts),
+            'entities_by_label': dict(self.counts),
+            # set(list(...)): kümeye ekleme sırası tek geçiştekiyle aynı kalsın (dict doğrudan verilirse ön boyutlandırılır)
+            'unique_entities': {k: list(set(list(v)))[:10] for k, v in self.words.items()}
+        }
+
+    def to_dict(self) -> Dict:
+        return {'counts': dict(self.counts), 'words': {k: list(v) for k, v in self.words.items()}}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "EntityStatisticsAccumulator":
+        acc = cls()
+        acc.counts.update(state.get('counts', {}))
+        acc.words = {k: dict.fromkeys(v) for k, v in state.get('words', {}).items()}
+        return acc
+
+class SentimentStatisticsAccumulator(StatisticsAccumulator):
+    """
+    sentiment.get_sentiment_statistics için biriktirici.
+
+    Skor toplamları kesin kısmi toplamlar (Shewchuk) olarak tutulur; sonuç
+    math.fsum ile yuvarlandığından birleştirme sırası ortalamaları değiştirmez.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.positive_count = 0
+        self.negative_count = 0
+        self.positive_partials = []
+        self.negative_partials = []
+
+    def update(self, batch) -> "SentimentStatisticsAccumulator":
+        """
+        Mesaj grubunu ekler.
+
+        Args:
+            batch: {'text': str, 'sentiment': Dict} formatında liste veya MessageTable
+        """
+        records = batch.iter_records() if isinstance(batch, MessageTable) else batch
+        for msg in records:
+            self.total += 1
+            sentiment = msg.get('sentiment') or {}
+            label = sentiment.get('label')
+            if label == 'POSITIVE':
+                self.positive_count += 1
+                _add_exact(self.positive_partials, sentiment.get('score', 0))
+            elif label == 'NEGATIVE':
+                self.negative_count += 1
+                _add_exact(self.negative_partials, sentiment.get('score', 0))
+        return self
+
+    def merge(self, other: "SentimentStatisticsAccumulator") -> "SentimentStatisticsAccumulator":
+        self.total += other.total
+        self.positive_count += other.positive_count
+        self.negative_count += other.negative_count
+        for x in other.positive_partials:
+            _add_exact(self.positive_partials, x)
+        for x in other.negative_partials:
+            _add_exact(self.negative_partials, x)
+        return self
+
+    def result(self) -> Dict:
+        """get_sentiment_statistics formatında sonuç"""
+        total = self.total
+        if not total:
+            return {}
+        return {
+            'total_messages': total,
+            'positive_count': self.positive_count,
+            'negative_count': self.negative_count,
+            'positive_percentage': self.positive_count / total * 100,
+            'negative_percentage': self.negative_count / total * 100,
+            'avg_positive_score': math.fsum(self.positive_partials) / max(self.positive_count, 1),
+            'avg_negative_score': math.fsum(self.negative_partials) / max(self.negative_count, 1)
+        }
+
+    def to_dict(self) -> Dict:
+        return {key: list(value) if isinstance(value, list) else value for key, value in vars(self).items()}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "SentimentStatisticsAccumulator":
+        acc = cls()
+        for key in vars(acc):
+            setattr(acc, key, state.get(key, getattr(acc, key)))
+        return acc
+
+def _add_exact(partials: List[float], x: float):
+    """x'i örtüşmeyen kısmi toplamlar listesine hatasız ekler (math.fsum'ın kullandığı yöntem)"""
+    x = float(x)
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+class WordSketchAccumulator(StatisticsAccumulator):
+    """
+    Sınırlı bellekli en sık kelime biriktiricisi (WordCountAccumulator'ın özet karşılığı).
+
+    Mesajlar SKETCH_CHUNK_MESSAGES'lık parçalar halinde kesin sayılıp özete
+    eklenir; bellek kullanımı toplam kelime dağarcığından bağımsızdır.
+
+    Args:
+        mode: "space_saving" (capacity sayaç, hata <= n / capacity) veya
+            "count_min" (hata 1 - delta olasılıkla <= epsilon * n)
+        epsilon: Göreli hata sınırı (capacity verilmezse space_saving için 1 / epsilon sayaç)
+        delta: Count-Min için hata olasılığı
+        capacity: Space-Saving sayaç / Count-Min aday kelime sayısı
+        min_length: Minimum kelime uzunluğu
+    """
+
+    def __init__(self, mode: str = "space_saving", epsilon: float = 1e-4, delta: float = 0.01,
+                 capacity: int = None, min_length: int = 3):
+        self.min_length = min_length
+        if mode == "space_saving":
+            self.sketch = SpaceSaving(capacity) if capacity else SpaceSaving.from_error(epsilon)
+        elif mode == "count_min":
+            self.sketch = CountMinSketch.from_error(epsilon, delta, capacity=capacity or 1000)
+        else:
+            raise ValueError(f"Bilinmeyen kelime özeti kipi: {mode}")
+        self.mode = mode
+
+    def empty_copy(self) -> "WordSketchAccumulator":
+        """Aynı parametrelerle boş bir biriktirici (birleştirme hedefi olarak)"""
+        acc = WordSketchAccumulator.__new__(WordSketchAccumulator)
+        acc.mode = self.mode
+        acc.min_length = self.min_length
+        sketch = self.sketch
+        if isinstance(sketch, SpaceSaving):
+            acc.sketch = SpaceSaving(sketch.capacity)
+        else:
+            acc.sketch = CountMinSketch(sketch.width, sketch.depth, sketch.capacity, sketch.seed)
+        return acc
+
+    def update(self, batch) -> "WordSketchAccumulator":
+        """
+        Mesaj grubunu ekler.
+
+        Args:
+            batch: Mesaj metinlerinin listesi veya MessageTable
+        """
+        counts = Counter()
+        pending = 0
+        for msg in as_message_list(batch):
+            counts.update(_filtered_words(msg, self.min_length))
+            pending += 1
+            if pending == SKETCH_CHUNK_MESSAGES:
+                self.sketch.update_counts(counts)
+                counts = Counter()
+                pending = 0
+        if counts:
+            self.sketch.update_counts(counts)
+        return self
+
+    def merge(self, other: "WordSketchAccumulator") -> "WordSketchAccumulator":
+        if other.mode != self.mode or other.min_length != self.min_length:
+            raise ValueError("Farklı kip veya min_length ile biriktirilmiş özetler birleştirilemez")
+        self.sketch.merge(other.sketch)
+        return self
+
+    def result(self, top_n: int = 10) -> List[tuple]:
+        """(kelime, sayı, hata) WordEstimate listesi; gerçek sayı [sayı - hata, sayı] aralığında"""
+        return self.sketch.top(top_n)
+
+    @property
+    def error_bound(self) -> float:
+        """Tahminlerin en büyük fazlası (Count-Min için 1 - delta olasılıkla)"""
+        return self.sketch.error_bound
+
+    def to_dict(self) -> Dict:
+        return {'mode': self.mode, 'min_length': self.min_length, 'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "WordSketchAccumulator":
+        acc = cls.__new__(cls)
+        acc.mode = state['mode']
+        acc.min_length = state.get('min_length', 3)
+        acc.sketch = sketch_from_dict(state['sketch'])
+        return acc
+
+# Dönem anahtarları için NumPy datetime64 birimleri
+PERIOD_UNITS = {"day": "D", "week": "W", "month": "M", "year": "Y"}
+
+def _iter_author_period_texts(messages, period: str = None):
+    """MessageTable veya parser.ChatMessage akışından (yazar, dönem, metin) üçlüleri"""
+    import numpy as np
+
+    unit = PERIOD_UNITS[period] if period else None
+    if isinstance(messages, MessageTable):
+        periods = messages.timestamps.astype(f"datetime64[{unit}]").astype(str).tolist() if unit else None
+        for i, text in enumerate(messages.texts()):
+            key = periods[i] if periods is not None else None
+            yield messages.author(i), (None if key == "NaT" else key), text
+        return
+    for record in messages:
+        key = None
+        if unit and record.timestamp is not None:
+            key = str(np.datetime64(record.timestamp, unit))
+        yield record.author, key, record.text
+
+def word_frequency_summaries(messages, period: str = "month", by_author: bool = True,
+                             author_key=None, **options) -> Dict[tuple, WordSketchAccumulator]:
+    """
+    Yazar ve dönem başına birleştirilebilir en sık kelime özetleri üretir.
+
+    Mesajlar akış halinde okunur ve parça parça özetlere eklenir; her özetin
+    belleği sınırlıdır. Sonuçlar merge_word_summaries ile yazar, dönem veya
+    genel toplamlara indirgenebilir.
+
+    Args:
+        messages: MessageTable veya parser.iter_messages akışı
+        period: "day", "week", "month", "year" veya None (dönemsiz)
+        by_author: False ise tüm yazarlar tek özette toplanır
+        author_key: Yazar adını anahtara çeviren fonksiyon (ör. parser.author_key)
+        **options: WordSketchAccumulator parametreleri (mode, epsilon, delta, capacity, min_length)
+
+    Returns:
+        Dict[tuple, WordSketchAccumulator]: (yazar, dönem) -> özet
+    """
+    summaries = {}
+    pending = {}
+    for author, key, text in _iter_author_period_texts(messages, period):
+        if not by_author:
+            author = None
+        elif author_key is not None:
+            author = author_key(author)
+        group = pending.setdefault((author, key), [])
+        group.append(text)
+        if len(group) == SKETCH_CHUNK_MESSAGES:
+            summaries.setdefault((author, key), WordSketchAccumulator(**options)).update(group)
+            pending[(author, key)] = []
+    for group_key, group in pending.items():
+        if group:
+            summaries.setdefault(group_key, WordSketchAccumulator(**options)).update(group)
+    return summaries
+
+def merge_word_summaries(summaries: Dict[tuple, WordSketchAccumulator], by: str = None) -> Dict:
+    """
+    word_frequency_summaries çıktısını birleştirir.
+
+    Args:
+        summaries: (yazar, dönem) -> özet
+        by: "author" (yazar başına), "period" (dönem başına) veya None (tek genel özet)
+
+    Returns:
+        Dict: anahtar -> özet; by None ise tek WordSketchAccumulator (özet yoksa None)
+    """
+    merged = {}
+    for (author, key), summary in summaries.items():
+        group = author if by == "author" else key if by == "period" else None
+        if group not in merged:
+            merged[group] = summary.empty_copy()
+        merged[group].merge(summary)
+    if by is None:
+        return merged.get(None)
+    return merged
+
+def _accumulate_shard(args) -> StatisticsAccumulator:
+    """Süreç havuzu işçisi: bir parça için biriktirici oluşturup doldurur"""
+    accumulator_cls, kwargs, shard = args
+    return accumulator_cls(**kwargs).update(shard)
+
+def accumulate_parallel(accumulator_cls, messages, workers: int = None,
+                        shard_size: int = 50000, **kwargs) -> StatisticsAccumulator:
+    """
+    İstatistikleri parçalar halinde süreç havuzunda hesaplayıp birleştirir (map-reduce).
+
+    Args:
+        accumulator_cls: StatisticsAccumulator alt sınıfı
+        messages: Biriktiricinin update() ile kabul ettiği liste veya MessageTable
+        workers: Süreç sayısı (None ise CPU sayısı; 1 ise aynı süreçte)
+        shard_size: Parça başına mesaj sayısı
+        **kwargs: Biriktirici kurucusuna verilecek argümanlar
+
+    Returns:
+        StatisticsAccumulator: Tüm parçaların sırayla birleştirildiği biriktirici
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    total = len(messages)
+    if workers <= 1 or total <= shard_size:
+        return accumulator_cls(**kwargs).update(messages)
+
+    if isinstance(messages, MessageTable):
+        import numpy as np
+        shards = [messages.take(np.arange(i, min(i + shard_size, total))) for i in range(0, total, shard_size)]
+    else:
+        shards = [messages[i:i + shard_size] for i in range(0, total, shard_size)]
+
+    result = accumulator_cls(**kwargs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map sırayı koruduğu için birleştirme mesaj sırasıyla yapılır
+        for partial in pool.map(_accumulate_shard, [(accumulator_cls, kwargs, shard) for shard in shards]):
+            result.merge(partial)
+    return result
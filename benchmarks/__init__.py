@@ -0,0 +1,4 @@
+"""
+Performans ölçümleri.
+Depo kökünden `python -m benchmarks.<modül>` ile çalıştırılır.
+"""
@@ -0,0 +1,88 @@
+"""
+ONNX / int8 Arka Ucu Doğruluk Karşılaştırması
+ONNX Runtime arka ucunu PyTorch arka ucuyla aynı metinlerde karşılaştırır:
+duygu etiketleri ve skorları, NER entity parçaları (etiket, başlangıç, bitiş).
+
+Kullanım:
+    python -m benchmarks.onnx_parity [--input metinler.txt] [--fp32] [--output sonuc.json]
+"""
+import argparse
+import json
+import sys
+
+from config import get_config, merge_config
+from onnx_backend import parity_report
+
+# Kabul eşikleri (int8 nicemleme küçük skor farkları doğurur; etiketler ve parçalar korunmalı)
+MIN_LABEL_AGREEMENT = 0.99
+MIN_SPAN_F1 = 0.98
+MAX_SCORE_DIFF = 0.05
+
+REFERENCE_TEXTS = [
+    "Yarın Ankara'ya gidiyorum, Ahmet Bey de gelecek.",
+    "Bu film gerçekten harikaydı, herkese tavsiye ederim!",
+    "Türk Telekom'un müşteri hizmetleri çok kötü, saatlerdir bekliyorum.",
+    "Ayşe ile İstanbul'da Kadıköy'de buluştuk.",
+    "Toplantı saat 3'te, unutmayın.",
+    "Mustafa Kemal Atatürk 1881'de Selanik'te doğdu.",
+    "Hiç beğenmedim, param boşa gitti.",
+    "Galatasaray dün akşam Fenerbahçe'yi yendi.",
+    "Annemle babam hafta sonu İzmir'e taşınıyor.",
+    "Siparişim hâlâ gelmedi, Trendyol'a şikâyet edeceğim.",
+    "Çok teşekkürler, çok yardımcı oldunuz :)",
+    "ok",
+    "Mehmet Öz, Koç Üniversitesi'nde ders veriyor.",
+    "Bugün hava çok güzel, sahilde yürüyüş yaptık.",
+    "Antalya'daki otel berbattı ama deniz muhteşemdi.",
+    "Elif Hanım'a Türkiye İş Bankası'ndan yazı gönderildi.",
+]
+
+def load_texts(path: str) -> list:
+    """Her satırı bir metin olan dosyayı okur (boş satırlar atlanır)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def violations(report: dict) -> list:
+    """Eşikleri aşan ölçümlerin açıklamaları"""
+    found = []
+    if report["sentiment"]["label_agreement"] < MIN_LABEL_AGREEMENT:
+        found.append(f"duygu etiket uyumu {report['sentiment']['label_agreement']:.3f} < {MIN_LABEL_AGREEMENT}")
+    if report["sentiment"]["max_score_diff"] > MAX_SCORE_DIFF:
+        found.append(f"duygu skor farkı {report['sentiment']['max_score_diff']:.4f} > {MAX_SCORE_DIFF}")
+    if report["ner"]["span_f1"] < MIN_SPAN_F1:
+        found.append(f"NER parça F1 {report['ner']['span_f1']:.3f} < {MIN_SPAN_F1}")
+    if report["ner"]["max_score_diff"] > MAX_SCORE_DIFF:
+        found.append(f"NER skor farkı {report['ner']['max_score_diff']:.4f} > {MAX_SCORE_DIFF}")
+    return found
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="ONNX arka ucu ile PyTorch arka ucunun karşılaştırması")
+    arg_parser.add_argument("--input", help="Her satırı bir metin olan referans dosyası (varsayılan: yerleşik Türkçe küme)")
+    arg_parser.add_argument("--fp32", action="store_true", help="Nicemlenmemiş (fp32) ONNX modelini karşılaştır")
+    arg_parser.add_argument("--batch-size", type=int, default=16)
+    arg_parser.add_argument("--output", help="Raporun yazılacağı JSON dosyası")
+    args = arg_parser.parse_args(argv)
+
+    texts = load_texts(args.input) if args.input else REFERENCE_TEXTS
+    config = merge_config(get_config(), {"onnx": {"quantize": not args.fp32}})
+    report = parity_report(texts, config=config, batch_size=args.batch_size)
+    problems = violations(report)
+
+    sentiment, ner = report["sentiment"], report["ner"]
+    print(f"Arka uç: {report['backend']}  metin: {report['texts']}")
+    print(f"Duygu: etiket uyumu {sentiment['label_agreement']:.3f}, en büyük skor farkı "
+          f"{sentiment['max_score_diff']:.4f}, hızlanma x{sentiment['speedup']:.2f}")
+    print(f"NER:   parça F1 {ner['span_f1']:.3f} ({ner['onnx_entities']}/{ner['torch_entities']} entity), "
+          f"etiket farkı {ner['label_mismatches']}, en büyük skor farkı {ner['max_score_diff']:.4f}, "
+          f"hızlanma x{ner['speedup']:.2f}")
+    for problem in problems:
+        print(f"İHLAL: {problem}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(dict(report, violations=problems), f, ensure_ascii=False, indent=2)
+
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+PII Regex En Kötü Durum Ölçümü ve Fuzz Testi
+Her desenin girdi baytı başına süresinin sınırlı kaldığını (doğrusal zaman) doğrular.
+
+Kullanım:
+    python -m benchmarks.pii_regex [--seed 0] [--iterations 300] [--output sonuc.json]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+import pii
+import utility
+
+# Uzun girdide bayt başına süre kısa girdiye göre en fazla bu kadar artabilir (karesel desen ~8x verir)
+MAX_GROWTH = 3.0
+# Bayt başına mutlak süre sınırı (nanosaniye)
+MAX_NS_PER_BYTE = 5000.0
+
+SMALL = 2000
+LARGE = 16000
+
+def target_patterns() -> Dict[str, Callable[[str], object]]:
+    """Ölçülecek desenler: tek tek regex'ler, doğrulamalı extract_* ve birleşik tarayıcılar"""
+    targets = {}
+    for name, pattern, _ in pii.PII_TYPES:
+        targets[f"re:{name}"] = re.compile(pattern).findall
+    targets["utility.RE_IBAN"] = utility.RE_IBAN.findall
+    targets["utility.RE_PHONE"] = utility.RE_PHONE.findall
+    targets["pii.RE_ADDRESS"] = pii.RE_ADDRESS.findall
+    targets["extract_credit_card_numbers"] = pii.extract_credit_card_numbers
+    targets["extract_ip_addresses"] = pii.extract_ip_addresses
+    targets["engine.scan"] = pii.get_pii_engine().scan
+    targets["utility.clean_text"] = lambda text: utility.clean_text(text, mask_emails=True, mask_phones=True)
+    return targets
+
+def adversarial_inputs(n: int) -> Dict[str, str]:
+    """Geri izlemeyi tetiklemesi bilinen n uzunluğundaki girdiler"""
+    return {
+        "digits": "1" * n,
+        "digits_space": "1 " * (n // 2),
+        "digits_dash": "1-" * (n // 2),
+        "digits_double_space": "1  " * (n // 3),
+        "letters": "a" * n,
+        "upper": "A" * n,
+        "dotted": "a." * (n // 2),
+        "ip_like": "1." * (n // 2),
+        "at_run": "a@" + "a" * (n - 2),
+        "at_dotted": "a@" + "a." * ((n - 2) // 2),
+        "digit_then_letters": "1 " + "a" * (n - 2),
+        "colons": "1:" * (n // 2),
+        "plus": "+1 " * (n // 3),
+        "parens": "(123) " * (n // 6),
+        "iban_like": "TR33" + " 0000" * ((n - 4) // 5),
+        "spaces": " " * n,
+    }
+
+def _time_call(fn: Callable[[str], object], text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run_worst_case() -> List[Dict]:
+    """
+    Her desen ve adversarial girdi için bayt başına süreyi iki boyutta ölçer.
+
+    Returns:
+        List[Dict]: Ölçüm kayıtları (ihlal varsa 'ok': False)
+    """
+    results = []
+    small_inputs = adversarial_inputs(SMALL)
+    large_inputs = adversarial_inputs(LARGE)
+    for name, fn in target_patterns().items():
+        for kind in small_inputs:
+            small = _time_call(fn, small_inputs[kind]) / len(small_inputs[kind]) * 1e9
+            large = _time_call(fn, large_inputs[kind]) / len(large_inputs[kind]) * 1e9
+            # Çok kısa süreler gürültülüdür; 50 ns/bayt altı büyüme oranı için dikkate alınmaz
+            growth = large / max(small, 50.0)
+            results.append({
+                "pattern": name,
+                "input": kind,
+                "ns_per_byte_small": round(small, 1),
+                "ns_per_byte_large": round(large, 1),
+                "growth": round(growth, 2),
+                "ok": growth <= MAX_GROWTH and large <= MAX_NS_PER_BYTE,
+            })
+    return results
+
+def _random_text(rng: random.Random, length: int) -> str:
+    alphabet = "0123456789" * 4 + " -.:@+()/" * 2 + "abcAZTR\n<>çğıİ"
+    pieces = []
+    while sum(len(p) for p in pieces) < length:
+        if rng.random() < 0.2:
+            # Geçerli PII parçaları da karışsın
+            pieces.append(rng.choice([
+                "4111 1111 1111 1111", "555-123-4567", "192.168.1.1", "a.b@example.com",
+                "TR33 0006 1005 1978 6457 8413 26", "12/03/2023", "12:30 PM", "<Medya dahil edilmedi>",
+            ]))
+        else:
+            pieces.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 64))))
+    return "".join(pieces)[:length]
+
+def run_fuzz(seed: int = 0, iterations: int = 300, max_length: int = 4096) -> List[Dict]:
+    """
+    Rastgele girdilerde süre sınırını ve motor değişmezlerini denetler.
+
+    Değişmezler: parçalar sıralı ve çakışmasız, değerleri offset'lerle tutarlı,
+    kart numaraları Luhn'u, IP'ler aralık kontrolünü geçiyor.
+
+    Returns:
+        List[Dict]: Başarısız girdiler
+    """
+    rng = random.Random(seed)
+    engine = pii.get_pii_engine()
+    targets = target_patterns()
+    failures = []
+    for i in range(iterations):
+        text = _random_text(rng, rng.randint(1, max_length))
+        for name, fn in targets.items():
+            elapsed = _time_call(fn, text, repeat=2)
+            # Kısa girdilerde sabit çağrı maliyeti baskın olduğundan 1 ms pay bırakılır
+            if elapsed - 1e-3 > len(text) * MAX_NS_PER_BYTE * 1e-9:
+                failures.append({"iteration": i, "pattern": name, "reason": "slow", "length": len(text)})
+        last_end = 0
+        for span in engine.scan(text):
+            problems = []
+            if span.start < last_end or span.end <= span.start:
+                problems.append("overlap")
+            if text[span.start:span.end] != span.value:
+                problems.append("offset")
+            validator = pii.VALIDATORS.get(span.type)
+            if validator is not None and not validator(span.value):
+                problems.append("validation")
+            for problem in problems:
+                failures.append({"iteration": i, "pattern": span.type, "reason": problem, "value": span.value})
+            last_end = span.end
+    return failures
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="PII regex en kötü durum ölçümü ve fuzz testi")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--iterations", type=int, default=300)
+    arg_parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = arg_parser.parse_args(argv)
+
+    worst_case = run_worst_case()
+    fuzz_failures = run_fuzz(seed=args.seed, iterations=args.iterations)
+    violations = [r for r in worst_case if not r["ok"]]
+
+    for r in sorted(worst_case, key=lambda r: -r["growth"])[:10]:
+        print(f"{r['pattern']:32} {r['input']:22} {r['ns_per_byte_large']:8.1f} ns/bayt  büyüme x{r['growth']}")
+    print(f"\nEn kötü durum ihlalleri: {len(violations)}")
+    print(f"Fuzz hataları: {len(fuzz_failures)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"worst_case": worst_case, "fuzz_failures": fuzz_failures}, f, ensure_ascii=False, indent=2)
+
+    return 1 if violations or fuzz_failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
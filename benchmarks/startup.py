@@ -0,0 +1,127 @@
+"""
+Başlangıç Süresi ve Bellek Bütçesi
+Her giriş noktasını (main, pipeline, incremental, inference_server) ayrı bir
+süreçte `python -X importtime` ile yükler; toplam import süresini, en yavaş
+importları ve en yüksek RSS'i ölçer. Bütçe aşılırsa ya da ağır bir bağımlılık
+(torch, transformers, matplotlib, pandas, ...) başlangıçta yüklenirse hata
+koduyla çıkar.
+
+Kullanım:
+    python -m benchmarks.startup [--repeat 5] [--scale 1.0] [--output sonuc.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Giriş noktası -> (import süresi ms, RSS MB) bütçesi
+BUDGETS = {
+    "main": (150, 48),
+    "pipeline": (150, 48),
+    "incremental": (300, 64),
+    "inference_server": (200, 48),
+}
+# Başlangıçta yüklenmemesi gereken ağır paketler (yalnızca kullanıldıklarında yüklenir)
+HEAVY_MODULES = ("torch", "transformers", "matplotlib", "seaborn", "pandas", "pyarrow",
+                 "openpyxl", "onnxruntime", "onnx", "zstandard")
+TOP_IMPORTS = 5
+
+_PROBE = (
+    "import json, resource, sys; import {module}; "
+    "print(json.dumps({{'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "
+    "'heavy': [m for m in {heavy!r} if m in sys.modules]}}))"
+)
+
+def parse_importtime(stderr: str) -> list:
+    """
+    -X importtime çıktısını (modül, kendi süresi µs, kümülatif µs, derinlik) listesine çevirir.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            # Başlık satırı
+            continue
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def measure(module: str, cwd: str) -> dict:
+    """Modülü yeni bir süreçte bir kez yükler ve ölçümleri döndürür"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    # Kök seviyedeki (derinlik 0) importların kümülatif toplamı; yorumlayıcının kendi başlangıç importları dahil
+    total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:TOP_IMPORTS]
+    return {
+        "import_ms": total_us / 1000,
+        "rss_mb": probe["rss_kb"] / 1024,
+        "heavy_modules": probe["heavy"],
+        "slowest_imports": [{"module": name, "self_ms": self_us / 1000} for name, self_us, _, _ in slowest],
+    }
+
+def run(entry_points, repeat: int = 5, scale: float = 1.0, cwd: str = None) -> dict:
+    """
+    Giriş noktalarını ölçer; her biri için en iyi (en düşük) ölçüm bütçeyle karşılaştırılır.
+
+    Args:
+        entry_points: Modül adları
+        repeat: Tekrar sayısı (disk önbelleği ve gürültü için en düşüğü alınır)
+        scale: Bütçe çarpanı (yavaş makineler için)
+        cwd: Modüllerin yüklendiği klasör (None ise depo kökü)
+
+    Returns:
+        Dict: {giriş noktası: ölçümler, bütçe ve ihlaller}
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    report = {}
+    for module in entry_points:
+        runs = [measure(module, cwd) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["import_ms"])
+        best["rss_mb"] = min(r["rss_mb"] for r in runs)
+        time_budget, rss_budget = BUDGETS.get(module, (None, None))
+        problems = []
+        if time_budget is not None and best["import_ms"] > time_budget * scale:
+            problems.append(f"import süresi {best['import_ms']:.0f} ms > {time_budget * scale:.0f} ms")
+        if rss_budget is not None and best["rss_mb"] > rss_budget * scale:
+            problems.append(f"RSS {best['rss_mb']:.0f} MB > {rss_budget * scale:.0f} MB")
+        if best["heavy_modules"]:
+            problems.append(f"başlangıçta yüklenen ağır paketler: {', '.join(best['heavy_modules'])}")
+        report[module] = dict(best, budget={"import_ms": time_budget, "rss_mb": rss_budget}, violations=problems)
+    return report
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Giriş noktalarının başlangıç süresi ve bellek bütçesi")
+    arg_parser.add_argument("entry_points", nargs="*", default=list(BUDGETS),
+                            help=f"Ölçülecek modüller (varsayılan: {', '.join(BUDGETS)})")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="Bütçe çarpanı (ör. yavaş CI için 2)")
+    arg_parser.add_argument("--output", help="Raporun yazılacağı JSON dosyası")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.entry_points, repeat=args.repeat, scale=args.scale)
+    failed = False
+    for module, result in report.items():
+        budget = result["budget"]
+        print(f"{module}: {result['import_ms']:.0f} ms (bütçe {budget['import_ms']}), "
+              f"{result['rss_mb']:.0f} MB RSS (bütçe {budget['rss_mb']})")
+        print("  en yavaş: " + ", ".join(f"{row['module']} {row['self_ms']:.1f} ms" for row in result["slowest_imports"]))
+        for problem in result["violations"]:
+            print(f"  İHLAL: {problem}")
+            failed = True
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
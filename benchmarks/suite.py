@@ -0,0 +1,281 @@
+"""
+Tekrarlanabilir Performans Ölçüm Takımı
+Sentetik bir sohbet (benchmarks.synthetic_chat) üzerinde ayrıştırma, temizleme,
+PII tarama, istatistikler, dışa aktarımlar ve küçük rastgele modellerle
+(benchmarks.tiny_models) NER ve duygu batch'lemesini ölçer. Sonuçlar JSON
+olarak yazılır; --compare ile önceki bir çalışmanın sonuçlarıyla
+karşılaştırılıp yavaşlamalar raporlanır.
+
+Kullanım:
+    python -m benchmarks.suite [--messages 20000] [--seed 0] [--repeat 3] [--no-models]
+                               [--output sonuc.json] [--compare onceki.json] [--tolerance 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic_chat import generate_chat
+
+# Karşılaştırmada bu orandan fazla yavaşlayan ölçümler gerileme sayılır
+DEFAULT_TOLERANCE = 1.25
+# Bu süreden kısa ölçümler gürültüye çok açık olduğu için karşılaştırılmaz
+MIN_COMPARABLE_SECONDS = 0.01
+MODEL_DIRECTORY = os.path.join(".cache", "benchmarks", "tiny_models")
+
+def _git_commit(cwd: str) -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class BenchmarkRun:
+    """
+    Ölçümleri toplar: her ölçüm repeat kez çalıştırılır, en düşük ve ortanca süre saklanır.
+    Ölçülmeyen bir ısınma çağrısı tembel importları ve ilk çağrı maliyetlerini dışarıda
+    bırakır; yükleme gibi soğuk yol ölçümleri warmup=False ile çağrılır.
+
+    Args:
+        repeat: Tekrar sayısı
+    """
+
+    def __init__(self, repeat: int = 3):
+        from models import current_rss_mb
+
+        self.repeat = repeat
+        self.results = {}
+        self._rss = current_rss_mb
+
+    def measure(self, name: str, fn: Callable[[], object], items: Optional[int] = None, repeat: Optional[int] = None,
+                warmup: bool = True):
+        """fn'i ölçer ve son çağrının sonucunu döndürür"""
+        runs = []
+        result = fn() if warmup else None
+        for _ in range(repeat or self.repeat):
+            started = time.perf_counter()
+            result = fn()
+            runs.append(time.perf_counter() - started)
+        best = min(runs)
+        self.results[name] = {
+            "seconds": best,
+            "median_seconds": statistics.median(runs),
+            "runs": runs,
+            "items": items,
+            "items_per_second": items / best if items and best > 0 else None,
+            "rss_mb": self._rss(),
+        }
+        rate = f", {items / best:,.0f}/sn" if items and best > 0 else ""
+        print(f"  {name}: {best * 1000:.1f} ms{rate}")
+        return result
+
+def _bench_text_stages(run: BenchmarkRun, path: str, workers: int) -> Dict:
+    from analysis_statistics import (WordCountAccumulator, accumulate_parallel, compute_message_kernel,
+                                     get_most_common_words)
+    from message_table import MessageTable
+    from parser import read_data, sanitize_messages
+    from pii import get_pii_engine
+
+    messages, _ = run.measure("parse", lambda: read_data(path))
+    total = sum(len(v) for v in messages.values())
+    run.results["parse"]["items"] = total
+    run.results["parse"]["items_per_second"] = total / run.results["parse"]["seconds"]
+    if workers > 1:
+        run.measure("parse_parallel", lambda: read_data(path, workers=workers), items=total)
+
+    sanitized = run.measure("sanitize", lambda: sanitize_messages(messages), items=total)
+    # Maskeleme ve PII çıkarma aynı taramada
+    run.measure("sanitize_with_spans", lambda: sanitize_messages(messages, with_spans=True), items=total)
+    texts = [text for msgs in messages.values() for text in msgs]
+    engine = get_pii_engine()
+    run.measure("pii_scan", lambda: engine.scan_batch(texts), items=total)
+
+    table = run.measure("message_table", lambda: MessageTable.from_messages_dict(sanitized), items=total)
+    by_author = table.by_author()
+    run.measure("statistics", lambda: {a: compute_message_kernel(t) for a, t in by_author.items()}, items=total)
+    all_texts = [text for msgs in sanitized.values() for text in msgs]
+    run.measure("common_words", lambda: get_most_common_words(all_texts, top_n=20), items=total)
+    run.measure("common_words_sketch", lambda: get_most_common_words(all_texts, top_n=20, mode="space_saving"),
+                items=total)
+    if workers > 1:
+        run.measure("accumulate_parallel", lambda: accumulate_parallel(
+            WordCountAccumulator, all_texts, workers=workers, shard_size=max(1000, total // workers)), items=total)
+    return sanitized
+
+def _bench_exports(run: BenchmarkRun, path: str, workdir: str):
+    import export
+    from parser import author_key, iter_messages, sanitize_stream
+
+    records = [
+        {"author": author_key(r.author), "timestamp": r.timestamp.isoformat() if r.timestamp else None, "text": r.text}
+        for r in sanitize_stream(iter_messages(path))
+    ]
+    total = len(records)
+    out = lambda name: os.path.join(workdir, name)
+    run.measure("export_json", lambda: export.export_to_json(records, out("messages.json")), items=total)
+    run.measure("export_jsonl_gzip", lambda: export.export_to_jsonl(records, out("messages.jsonl.gz")), items=total)
+    if export.ZSTD_AVAILABLE:
+        run.measure("export_jsonl_zstd", lambda: export.export_to_jsonl(records, out("messages.jsonl.zst")), items=total)
+    run.measure("export_csv", lambda: export.export_to_csv(records, out("messages.csv")), items=total)
+    if export.PYARROW_AVAILABLE:
+        run.measure("export_parquet", lambda: export.export_to_parquet(records, out("messages.parquet")), items=total)
+
+        def partitioned():
+            shutil.rmtree(out("partitioned"), ignore_errors=True)
+            return export.export_to_parquet(records, out("partitioned"), partition_by=("author", "month"))
+        run.measure("export_parquet_partitioned", partitioned, items=total)
+    if export.OPENPYXL_AVAILABLE:
+        run.measure("export_excel", lambda: export.export_to_excel(records, out("messages.xlsx")), items=total, repeat=1)
+
+def _bench_models(run: BenchmarkRun, sanitized: Dict, model_messages: int, seed: int) -> Dict:
+    from benchmarks.tiny_models import build_tiny_models
+    from config import DEFAULT_CONFIG, merge_config, set_config
+
+    paths = run.measure("tiny_models_build", lambda: build_tiny_models(MODEL_DIRECTORY, seed), repeat=1, warmup=False)
+    # Kullanıcının config.json'u ölçümü etkilemesin: varsayılanlar + küçük modeller, önbellek ve sunucu kapalı
+    set_config(merge_config(DEFAULT_CONFIG, {
+        "ner": {"model_name": os.path.abspath(paths["ner"])},
+        "sentiment": {"model_name": os.path.abspath(paths["sentiment"])},
+        "cache": {"enabled": False},
+        "server": {"use_server": False},
+        "onnx": {"enabled": False},
+    }))
+
+    from NER import apply_ner_batch
+    from export import export_entities_to_csv
+    from models import get_registry
+    from sentiment import analyze_sentiments_with_status
+
+    texts = [text for msgs in sanitized.values() for text in msgs if text][:model_messages]
+    registry = get_registry()
+    run.measure("ner_model_load", lambda: registry.get_pipeline("ner"), repeat=1, warmup=False)
+    run.measure("sentiment_model_load", lambda: registry.get_pipeline("sentiment"), repeat=1, warmup=False)
+    ents = run.measure("ner_batch", lambda: apply_ner_batch(texts), items=len(texts))
+    # İlk çağrı batch boyutunu ölçerek belirler ("auto"); ayarlama ayrı ölçülür
+    run.measure("sentiment_autotune", lambda: analyze_sentiments_with_status(texts[:64]), repeat=1, warmup=False)
+    run.measure("sentiment_batch", lambda: analyze_sentiments_with_status(texts), items=len(texts))
+
+    records = [{"text": text, "ents": e} for text, e in zip(texts, ents)]
+    directory = tempfile.mkdtemp(prefix="bench_entities_")
+    try:
+        run.measure("export_entities_csv", lambda: export_entities_to_csv(
+            records, os.path.join(directory, "entities.csv")), items=len(records))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    import torch
+    import transformers
+    return {"torch": torch.__version__, "transformers": transformers.__version__}
+
+def run_suite(messages: int = 20000, seed: int = 0, repeat: int = 3, models: bool = True,
+              model_messages: int = 2000, workers: Optional[int] = None) -> Dict:
+    """
+    Tüm ölçümleri çalıştırır.
+
+    Args:
+        messages: Sentetik sohbetteki mesaj sayısı
+        seed: Sohbet ve model ağırlıkları için tohum
+        repeat: Ölçüm başına tekrar sayısı (en düşük süre raporlanır)
+        models: False ise NER/duygu ölçümleri atlanır (torch/transformers gerekmez)
+        model_messages: NER ve duygu ölçümlerinde kullanılan mesaj sayısı
+        workers: Paralel ölçümler için süreç sayısı (None ise CPU sayısı)
+
+    Returns:
+        Dict: {'meta': {...}, 'results': {ölçüm: {'seconds', 'median_seconds', 'runs',
+            'items', 'items_per_second', 'rss_mb'}}}
+    """
+    workers = workers or os.cpu_count() or 1
+    run = BenchmarkRun(repeat)
+    meta = {
+        "commit": _git_commit(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "messages": messages,
+        "seed": seed,
+        "repeat": repeat,
+        "model_messages": model_messages if models else 0,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        path = os.path.join(workdir, "chat.txt")
+        print("Sohbet üretiliyor...")
+        run.measure("generate", lambda: generate_chat(path, messages, seed), items=messages, repeat=1, warmup=False)
+        meta["input_bytes"] = os.path.getsize(path)
+        print("Metin aşamaları:")
+        sanitized = _bench_text_stages(run, path, workers)
+        print("Dışa aktarımlar:")
+        _bench_exports(run, path, workdir)
+        if models:
+            print("Modeller (küçük, rastgele ağırlıklı):")
+            meta["versions"] = _bench_models(run, sanitized, model_messages, seed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"meta": meta, "results": run.results}
+
+def compare(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    İki çalışmayı karşılaştırır; tolerance'tan fazla yavaşlayan ölçümleri döndürür.
+
+    Girdi boyutu veya tohum farklıysa süreler doğrudan karşılaştırılamayacağı için uyarı verilir.
+    """
+    for key in ("messages", "seed", "model_messages"):
+        if current["meta"].get(key) != baseline["meta"].get(key):
+            print(f"Uyarı: '{key}' farklı ({baseline['meta'].get(key)} -> {current['meta'].get(key)})")
+    regressions = []
+    print(f"\nKarşılaştırma ({baseline['meta'].get('commit')} -> {current['meta'].get('commit')}):")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] > 0 else float("inf")
+        print(f"  {name}: {before['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms (x{ratio:.2f})")
+        if ratio > tolerance and max(result["seconds"], before["seconds"]) >= MIN_COMPARABLE_SECONDS:
+            regressions.append(f"{name} x{ratio:.2f} yavaşladı")
+    return regressions
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Sentetik sohbet üzerinde tekrarlanabilir performans ölçümleri")
+    arg_parser.add_argument("--messages", type=int, default=20000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--workers", type=int, help="Paralel ölçümler için süreç sayısı (varsayılan: CPU sayısı)")
+    arg_parser.add_argument("--no-models", action="store_true", help="NER ve duygu ölçümlerini atla")
+    arg_parser.add_argument("--model-messages", type=int, default=2000)
+    arg_parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    arg_parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    arg_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="Gerileme sayılan yavaşlama oranı")
+    args = arg_parser.parse_args(argv)
+
+    report = run_suite(args.messages, args.seed, args.repeat, models=not args.no_models,
+                       model_messages=args.model_messages, workers=args.workers)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar kaydedildi: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for problem in regressions:
+            print(f"GERİLEME: {problem}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Sentetik WhatsApp Sohbet Üreteci
+parser.read_data'nın beklediği "gg.aa.yyyy ss:dd - Yazar: mesaj" biçiminde,
+istenen boyutta Türkçe sohbet dışa aktarımı üretir. Aynı tohum (seed) ve mesaj
+sayısı her zaman bayt bayt aynı dosyayı verir.
+
+İçerik karışımı: adlandırılmış varlıklar (kişi, yer, kurum), medya yer
+tutucuları, IBAN'lar, e-postalar, telefon numaraları, emojiler, çok satırlı
+mesajlar ve yazarı olmayan sistem mesajları.
+
+Kullanım:
+    python -m benchmarks.synthetic_chat sohbet.txt [--messages 100000] [--seed 0]
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Iterator
+
+AUTHORS = ["İrem", "Çağın"]
+# Yazar anahtarı "unknown" olan ara sıra katılan yazar
+GUEST = "Ahmet Yılmaz"
+PEOPLE = ["Ahmet", "Ayşe", "Mehmet", "Elif", "Zeynep", "Mustafa", "Emre", "Selin", "Burak", "Deniz", "Can", "Ece"]
+PLACES = ["Ankara", "İstanbul", "İzmir", "Kadıköy", "Antalya", "Bursa", "Eskişehir", "Beşiktaş", "Moda", "Kapadokya"]
+ORGANIZATIONS = ["Türk Telekom", "Koç Üniversitesi", "Trendyol", "Galatasaray", "Fenerbahçe",
+                 "Türkiye İş Bankası", "Migros", "THY", "ODTÜ", "Getir"]
+EMOJIS = ["😀", "😂", "❤️", "😍", "😢", "😡", "👍", "🙏", "🎉", "😴", "🤔", "😘"]
+# Ek almadan cümleye uyan ifadeler (ünlü uyumu gerektirmez)
+POSITIVE = ["çok güzeldi", "harikaydı", "mükemmeldi", "süperdi", "beklediğimden iyiydi", "bayağı keyifliydi"]
+NEGATIVE = ["berbattı", "rezaletti", "çok kötüydü", "hayal kırıklığıydı", "vasattı", "tam bir fiyaskoydu"]
+TEMPLATES = [
+    "Yarın {place} yolundayız, {person} de gelecek",
+    "{person} ile {place} merkezde buluştuk, {sentiment}",
+    "{org} müşteri hizmetleri {sentiment}",
+    "Bugün {person} aradı, {org} ile anlaşmış",
+    "{place} sahilindeki kafe {sentiment}",
+    "Akşam {org} maçı var, izleyecek misin?",
+    "{person} doğum günü için {place} tarafında yer ayırttı",
+    "Siparişim hâlâ gelmedi, {org} destek hattına yazacağım",
+    "Film {sentiment}",
+    "Hafta sonu {place} gezisine gidelim mi?",
+    "{person} dün {place} dönüşü uğradı",
+    "Tamam",
+    "Geliyorum",
+    "Neredesin?",
+    "Uyudun mu",
+    "Aynen öyle",
+    "Bence de",
+    "Çok yoruldum bugün",
+    "Ne yiyelim akşam?",
+    "Haha evet",
+]
+MEDIA = "<Medya dahil edilmedi>"
+SYSTEM_MESSAGES = [
+    "Mesajlar ve aramalar uçtan uca şifrelidir. Daha fazla bilgi edinmek için dokunun.",
+    "İrem güvenlik kodunuzu değiştirdi.",
+]
+# Mesaj türlerinin olasılıkları (geri kalanı düz metin)
+P_MEDIA = 0.06
+P_IBAN = 0.005
+P_EMAIL = 0.01
+P_PHONE = 0.01
+P_EMOJI = 0.2
+P_MULTILINE = 0.05
+P_SYSTEM = 0.001
+P_GUEST = 0.01
+P_LONG = 0.01
+
+def _iban(rng: random.Random) -> str:
+    """Geçerli kontrol basamaklı TR IBAN (4'lü gruplarla)"""
+    bban = "".join(str(rng.randrange(10)) for _ in range(22))
+    # ISO 13616: BBAN + "TR00" sayısal karşılığı (T=29, R=27)
+    check = 98 - int(bban + "292700") % 97
+    iban = f"TR{check:02d}{bban}"
+    return " ".join(iban[i:i + 4] for i in range(0, len(iban), 4))
+
+def _email(rng: random.Random) -> str:
+    name = rng.choice(PEOPLE).lower().replace("ş", "s").replace("ç", "c").replace("ü", "u").replace("ö", "o")
+    return f"{name}{rng.randrange(100)}@{rng.choice(['gmail.com', 'hotmail.com', 'outlook.com'])}"
+
+def _phone(rng: random.Random) -> str:
+    return f"05{rng.randrange(30, 56)} {rng.randrange(100, 1000)} {rng.randrange(10, 100)} {rng.randrange(10, 100)}"
+
+def _sentence(rng: random.Random) -> str:
+    return rng.choice(TEMPLATES).format(
+        person=rng.choice(PEOPLE),
+        place=rng.choice(PLACES),
+        org=rng.choice(ORGANIZATIONS),
+        sentiment=rng.choice(POSITIVE if rng.random() < 0.6 else NEGATIVE),
+    )
+
+def _message(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < P_MEDIA:
+        return MEDIA
+    roll -= P_MEDIA
+    if roll < P_IBAN:
+        return f"IBAN: {_iban(rng)} {rng.choice(PEOPLE)} adına"
+    roll -= P_IBAN
+    if roll < P_EMAIL:
+        return f"Maili {_email(rng)} adresine at"
+    roll -= P_EMAIL
+    if roll < P_PHONE:
+        return f"{rng.choice(PEOPLE)} numarasını değiştirmiş: {_phone(rng)}"
+    text = _sentence(rng)
+    if rng.random() < P_LONG:
+        text = ". ".join(_sentence(rng) for _ in range(rng.randint(8, 20)))
+    if rng.random() < P_MULTILINE:
+        text += "\n" + "\n".join(_sentence(rng) for _ in range(rng.randint(1, 3)))
+    if rng.random() < P_EMOJI:
+        text += " " + "".join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 3)))
+    return text
+
+def iter_chat_lines(messages: int, seed: int = 0, start: datetime = datetime(2023, 1, 1, 9, 0)) -> Iterator[str]:
+    """
+    Sentetik sohbetin satırlarını üretir (sabit bellek).
+
+    Args:
+        messages: Yazarlı mesaj sayısı (sistem mesajları hariç)
+        seed: Rastgelelik tohumu
+        start: İlk mesajın zamanı
+
+    Yields:
+        str: Satır sonu karakteri içermeyen satırlar
+    """
+    rng = random.Random(seed)
+    timestamp = start
+    author = rng.choice(AUTHORS)
+    produced = 0
+    while produced < messages:
+        # Konuşmalar yoğun, aralar uzun: çoğunlukla dakikalar, bazen saatler
+        timestamp += timedelta(minutes=rng.randint(0, 5) if rng.random() < 0.9 else rng.randint(60, 900))
+        header = timestamp.strftime("%d.%m.%Y %H:%M")
+        if rng.random() < P_SYSTEM:
+            yield f"{header} - {rng.choice(SYSTEM_MESSAGES)}"
+            continue
+        if rng.random() < 0.4:
+            author = AUTHORS[1] if author == AUTHORS[0] else AUTHORS[0]
+        sender = GUEST if rng.random() < P_GUEST else author
+        lines = _message(rng).split("\n")
+        yield f"{header} - {sender}: {lines[0]}"
+        yield from lines[1:]
+        produced += 1
+
+def generate_chat(path: str, messages: int = 10000, seed: int = 0) -> str:
+    """
+    Sentetik sohbet dosyası yazar.
+
+    Args:
+        path: Çıktı dosyası
+        messages: Yazarlı mesaj sayısı
+        seed: Rastgelelik tohumu
+
+    Returns:
+        str: Yazılan dosya yolu
+    """
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 20) as f:
+        for line in iter_chat_lines(messages, seed):
+            f.write(line)
+            f.write("\n")
+    return path
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Sentetik Türkçe WhatsApp sohbet dışa aktarımı üretir")
+    arg_parser.add_argument("path", help="Çıktı dosyası")
+    arg_parser.add_argument("--messages", type=int, default=100000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    generate_chat(args.path, args.messages, args.seed)
+    print(f"{args.messages} mesaj yazıldı: {args.path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
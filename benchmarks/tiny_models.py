@@ -0,0 +1,65 @@
+"""
+Küçük Rastgele Modeller
+NER ve duygu pipeline'larının batch'leme, önbellek ve çıkarım yolunu gerçek
+modelleri indirmeden ölçmek için rastgele ağırlıklı küçük BERT modelleri
+üretir. Sonuçların anlamı yoktur; ölçülen şey hız ve batch davranışıdır.
+"""
+import os
+from typing import Dict
+
+# Karakter düzeyinde sözlük: Türkçe harfler, rakamlar ve noktalama
+CHARACTERS = list("abcçdefgğhıijklmnoöprsştuüvyzqwxABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZQWX0123456789.,!?'@:-")
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+NER_LABELS = ["O", "B-PER", "I-PER", "B-LOC", "I-LOC", "B-ORG", "I-ORG"]
+SENTIMENT_LABELS = ["negative", "positive"]
+# Karakter düzeyinde tokenizasyon gerçek modellerden çok daha uzun diziler üretir;
+# sentetik sohbetteki en uzun mesajlar sığsın diye konum sayısı geniş tutulur
+MAX_POSITIONS = 2048
+
+def _bert_config(vocab_size: int, labels):
+    from transformers import BertConfig
+
+    return BertConfig(
+        vocab_size=vocab_size,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=MAX_POSITIONS,
+        id2label=dict(enumerate(labels)),
+        label2id={label: i for i, label in enumerate(labels)},
+    )
+
+def build_tiny_models(directory: str, seed: int = 0) -> Dict[str, str]:
+    """
+    Küçük NER ve duygu modellerini klasöre yazar (varsa yeniden üretmez).
+
+    Args:
+        directory: Modellerin yazılacağı klasör
+        seed: Ağırlıkların rastgelelik tohumu
+
+    Returns:
+        Dict[str, str]: {'ner': model klasörü, 'sentiment': model klasörü}
+    """
+    paths = {"ner": os.path.join(directory, "ner"), "sentiment": os.path.join(directory, "sentiment")}
+    if all(os.path.exists(os.path.join(path, "config.json")) for path in paths.values()):
+        return paths
+
+    import torch
+    from transformers import BertForSequenceClassification, BertForTokenClassification, BertTokenizerFast
+
+    os.makedirs(directory, exist_ok=True)
+    vocab = SPECIAL_TOKENS + CHARACTERS + ["##" + c for c in CHARACTERS]
+    vocab_path = os.path.join(directory, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab))
+    tokenizer = BertTokenizerFast(vocab_path, do_lower_case=False, model_max_length=MAX_POSITIONS)
+
+    torch.manual_seed(seed)
+    ner = BertForTokenClassification(_bert_config(len(vocab), NER_LABELS))
+    ner.save_pretrained(paths["ner"])
+    tokenizer.save_pretrained(paths["ner"])
+    sentiment = BertForSequenceClassification(_bert_config(len(vocab), SENTIMENT_LABELS))
+    sentiment.save_pretrained(paths["sentiment"])
+    tokenizer.save_pretrained(paths["sentiment"])
+    return paths
@@ -0,0 +1,223 @@
+"""
+Çıkarım (Inference) Önbellek Modülü
+NER ve duygu analizi sonuçlarını SQLite üzerinde, içerik adresli olarak saklar.
+Anahtar: (model adı, model revizyonu, pipeline seçenekleri, metnin hash'i)
+Metin olduğu gibi (normalize edilmeden) anahtarlanır: NER sonuçlarındaki start/end
+konumları modele verilen metnin karakterlerini gösterir.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config import get_config
+
+# SQLite'ın tek sorguda kabul ettiği parametre sayısı sınırının altında kal
+_LOOKUP_CHUNK = 500
+
+def _to_builtin(value):
+    """numpy skalerlerini JSON'a yazılabilir Python tiplerine çevirir"""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+class InferenceCache:
+    """
+    Boyut sınırlı, LRU tahliyeli kalıcı çıkarım önbelleği.
+
+    Args:
+        path: SQLite dosya yolu
+        max_size_mb: Saklanan sonuçların toplam boyut sınırı (None ise sınırsız)
+    """
+
+    def __init__(self, path: str, max_size_mb: Optional[float] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def namespace(model_name: str, revision: str, options: Dict) -> str:
+        """Model adı, revizyon ve pipeline seçeneklerinden ad alanı üretir"""
+        return json.dumps([model_name, revision, options], sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        """Ad alanı ve metnin kendisinden önbellek anahtarı üretir"""
+        digest = hashlib.sha256(namespace.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        """
+        Birden fazla anahtarı tek seferde arar.
+
+        Args:
+            keys: Önbellek anahtarları
+
+        Returns:
+            Dict: Bulunan anahtar -> sonuç
+        """
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[i:i + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, object]):
+        """
+        Birden fazla sonucu tek işlemde yazar ve gerekirse tahliye yapar.
+
+        Args:
+            items: Anahtar -> sonuç
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            encoded = json.dumps(_to_builtin(value), ensure_ascii=False)
+            rows.append((key, encoded, len(encoded.encode("utf-8")), now))
+        with self._lock:
+            keys = [r[0] for r in rows]
+            replaced = 0
+            for i in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[i:i + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            self._total_bytes += sum(r[2] for r in rows) - replaced
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Boyut sınırı aşıldıysa en eski erişilen kayıtları siler (kilit altında çağrılır)"""
+        if self.max_bytes is None or self._total_bytes <= self.max_bytes:
+            return
+        # Sık tahliyeden kaçınmak için sınırın %90'ına kadar temizle
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC")
+        doomed = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def stats(self) -> Dict:
+        """Önbellek kayıt sayısı ve boyutunu döndürür"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"entries": count, "size_mb": round(self._total_bytes / (1024 * 1024), 2), "path": self.path}
+
+    def clear(self):
+        """Tüm kayıtları siler"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        """Veritabanı bağlantısını kapatır"""
+        with self._lock:
+            self._conn.close()
+
+_cache = None
+
+def get_inference_cache() -> Optional[InferenceCache]:
+    """Config'e göre paylaşılan önbelleği döndürür; kapalıysa None"""
+    global _cache
+    cache_config = get_config().get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    if _cache is None:
+        _cache = InferenceCache(
+            cache_config.get("path", os.path.join(".cache", "inference.sqlite")),
+            cache_config.get("max_size_mb")
+        )
+    return _cache
+
+def cached_inference(model_key: str, texts: List[str], compute: Callable[[List[str]], List],
+                     store_if: Optional[Callable[[], bool]] = None) -> List:
+    """
+    Önbellekte olmayan metinler için compute'u çağırır, sonuçları sırayla döndürür.
+
+    Önce tüm metinler tek bir toplu sorguyla aranır; eksikler tekilleştirilip
+    compute'a tek çağrıda verilir ve önbelleğe yazılır.
+
+    Args:
+        model_key: Model kaydındaki anahtar ("ner" veya "sentiment")
+        texts: Metin listesi
+        compute: Metin listesi alıp aynı sırada sonuç listesi döndüren fonksiyon
+        store_if: False dönerse hesaplanan sonuçlar önbelleğe yazılmaz (ör. yedek model kullanıldıysa)
+
+    Returns:
+        List: Her metin için sonuç
+    """
+    cache = get_inference_cache()
+    if cache is None or not texts:
+        return compute(texts)
+
+    from models import get_registry
+
+    settings = get_registry().model_settings(model_key)
+    options = settings["options"]
+    if settings["backend"] != "torch":
+        # ONNX/int8 sonuçları PyTorch'unkilerden biraz farklı olabilir; ayrı saklanır
+        options = dict(options, backend=settings["backend"])
+    namespace = cache.namespace(settings["model_name"], settings["revision"], options)
+    keys = [cache.make_key(namespace, t) for t in texts]
+    found = cache.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+    if missing:
+        computed = compute(list(missing.values()))
+        fresh = {key: _to_builtin(value) for key, value in zip(missing.keys(), computed)}
+        if store_if is None or store_if():
+            # None "sonuç yok" demektir (ör. skorlanamayan mesaj); önbelleğe yazılmaz
+            cache.put_many({key: value for key, value in fresh.items() if value is not None})
+        found.update(fresh)
+    return [found[key] for key in keys]
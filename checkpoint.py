@@ -0,0 +1,244 @@
+"""
+Kontrol Noktası (Checkpoint) Modülü
+Uzun NER ve duygu analizi çalışmalarının ilerlemesini batch batch kalıcı bir
+günlüğe (SQLite) yazar. Aynı girdi ve model ayarlarıyla yeniden başlatılan
+çalışma tamamlanmış batch'leri atlar ve son kaydedilen batch'ten devam eder.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cache import _to_builtin
+from config import get_config
+
+# Girdi dosyası özeti için okuma parçası
+_HASH_CHUNK = 1 << 20
+
+def file_digest(path: str) -> str:
+    """Dosya içeriğinin SHA-256 özeti"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def run_fingerprint(input_digest: str, config: Dict) -> str:
+    """
+    Girdi özeti ve sonuçları etkileyen ayarlardan çalışma kimliği üretir.
+
+    Batch boyutu gibi yalnızca hızı etkileyen ayarlar dahil edilmez; model adı,
+    revizyon, pipeline seçenekleri, arka uç ve ortak encoder ayarı dahildir.
+    """
+    from models import ModelRegistry
+
+    registry = ModelRegistry(config)
+    joint = config.get("joint", {})
+    settings = {
+        "ner": registry.model_settings("ner"),
+        "sentiment": registry.model_settings("sentiment"),
+        "joint": [joint.get("shared_encoder", False), joint.get("encoder", "ner")],
+        "pii": config.get("pii", {}),
+    }
+    payload = json.dumps([input_digest, settings], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+def failed_result(value) -> bool:
+    """
+    Kayıtlı sonuç yeniden denenmeli mi: işlenemeyen NER sonucu (None), skorlanamayan
+    duygu sonucu (status "failed", bkz. sentiment.STATUS_FAILED) ya da bunlardan
+    birini içeren birleşik kayıt.
+    """
+    if value is None:
+        return True
+    if not isinstance(value, dict):
+        return False
+    if value.get("status") == "failed":
+        return True
+    if "ents" in value or "sentiment" in value:
+        return value.get("ents", []) is None or failed_result(value.get("sentiment", {}))
+    return False
+
+class RunJournal:
+    """
+    Bir analiz çalışmasının kalıcı günlüğü.
+
+    Her aşama ("ner", "sentiment", "joint") ve yazar için mesajlar sabit
+    boyutlu batch'lere bölünür. Bir batch'in sonuçları (mesaj kimliği = yazar +
+    sıra) ve batch kaydı tek işlemde yazılır; yarıda kalan batch hiç yazılmamış
+    sayılır. Tamamlanmış batch'lerdeki başarısız sonuçlar (geçici bir bellek
+    hatası gibi) devam edilen çalışmada yeniden hesaplanır.
+
+    Args:
+        path: SQLite dosya yolu
+        batch_messages: Bir kontrol noktasındaki mesaj sayısı
+    """
+
+    def __init__(self, path: str, batch_messages: int = 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_messages = batch_messages
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "stage TEXT NOT NULL, author TEXT NOT NULL, batch INTEGER NOT NULL, "
+            "start INTEGER NOT NULL, size INTEGER NOT NULL, committed_at REAL NOT NULL, "
+            "PRIMARY KEY (stage, author, batch))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "stage TEXT NOT NULL, author TEXT NOT NULL, message INTEGER NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (stage, author, message))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        stored = self.get_meta("batch_messages")
+        if stored is None:
+            self.set_meta("batch_messages", str(batch_messages))
+        else:
+            # Batch sınırları kayıtlı günlükle aynı kalmalı
+            self.batch_messages = int(stored)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self._conn.commit()
+
+    def committed_batches(self, stage: str, author: str) -> List[int]:
+        """Bir aşama ve yazar için tamamlanmış batch numaraları"""
+        rows = self._conn.execute(
+            "SELECT batch FROM batches WHERE stage = ? AND author = ? ORDER BY batch", (stage, author)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def load_batch(self, stage: str, author: str, start: int, size: int) -> List:
+        """Kayıtlı bir batch'in sonuçlarını mesaj sırasıyla döndürür"""
+        rows = self._conn.execute(
+            "SELECT message, value FROM results WHERE stage = ? AND author = ? AND message >= ? AND message < ? "
+            "ORDER BY message", (stage, author, start, start + size)
+        ).fetchall()
+        return [json.loads(value) for _, value in rows]
+
+    def load_results(self, stage: str, author: str) -> List:
+        """Bir aşama ve yazar için kayıtlı tüm sonuçlar (mesaj sırasıyla)"""
+        rows = self._conn.execute(
+            "SELECT value FROM results WHERE stage = ? AND author = ? ORDER BY message", (stage, author)
+        ).fetchall()
+        return [json.loads(value) for value, in rows]
+
+    def _write_results(self, stage: str, author: str, start: int, results: List):
+        rows = [
+            (stage, author, start + offset, json.dumps(_to_builtin(value), ensure_ascii=False))
+            for offset, value in enumerate(results)
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results (stage, author, message, value) VALUES (?, ?, ?, ?)", rows
+        )
+
+    def commit_results(self, results: Dict[Tuple[str, str], Tuple[int, List]], meta: Optional[Dict[str, str]] = None):
+        """
+        Birden fazla aşama/yazar sonucunu ve meta değerlerini tek işlemde yazar.
+
+        Args:
+            results: (aşama, yazar) -> (ilk mesaj sırası, sonuçlar)
+            meta: Aynı işlemde yazılacak meta anahtarları
+        """
+        with self._conn:
+            for (stage, author), (start, values) in results.items():
+                self._write_results(stage, author, start, values)
+            for key, value in (meta or {}).items():
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def commit_batch(self, stage: str, author: str, batch: int, start: int, results: List):
+        """Bir batch'in sonuçlarını ve batch kaydını tek işlemde yazar"""
+        with self._conn:
+            self._write_results(stage, author, start, results)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO batches (stage, author, batch, start, size, committed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (stage, author, batch, start, len(results), time.time())
+            )
+
+    def run(self, stage: str, author: str, texts: List[str], compute: Callable[[List[str]], List],
+            is_failed: Callable[[object], bool] = failed_result) -> List:
+        """
+        Metinleri batch batch işler; tamamlanmış batch'ler günlükten okunur.
+
+        Args:
+            stage: Aşama adı
+            author: Yazar anahtarı
+            texts: Yazarın mesajları (sıra mesaj kimliğidir)
+            compute: Metin listesi alıp aynı sırada sonuç listesi döndüren fonksiyon
+            is_failed: Kayıtlı bir sonucun yeniden hesaplanması gerekip gerekmediği
+
+        Returns:
+            List: Her metin için sonuç
+        """
+        done = set(self.committed_batches(stage, author))
+        results = []
+        for batch, start in enumerate(range(0, len(texts), self.batch_messages)):
+            chunk = texts[start:start + self.batch_messages]
+            if batch in done:
+                stored = self.load_batch(stage, author, start, len(chunk))
+                retry = [i for i, value in enumerate(stored) if is_failed(value)]
+                if retry:
+                    # Yalnızca başarısız mesajlar yeniden hesaplanır ve üzerine yazılır
+                    with self._conn:
+                        for i, value in zip(retry, compute([chunk[i] for i in retry])):
+                            stored[i] = value
+                            self._write_results(stage, author, start + i, [value])
+                results.extend(stored)
+                continue
+            chunk_results = compute(chunk)
+            self.commit_batch(stage, author, batch, start, chunk_results)
+            results.extend(chunk_results)
+        return results
+
+    def progress(self) -> Dict[str, int]:
+        """Aşama başına kaydedilmiş mesaj sayısı"""
+        rows = self._conn.execute("SELECT stage, SUM(size) FROM batches GROUP BY stage").fetchall()
+        return {stage: total for stage, total in rows}
+
+    def mark_complete(self):
+        """Çalışmanın tamamlandığını kaydeder"""
+        self.set_meta("completed_at", str(time.time()))
+
+    def close(self):
+        self._conn.close()
+
+def open_run_journal(input_path: str, config: Optional[Dict] = None) -> Optional[RunJournal]:
+    """
+    Girdi dosyası ve yapılandırma için çalışma günlüğünü açar (varsa devam eder).
+
+    Args:
+        input_path: Analiz edilen sohbet dosyası
+        config: Yapılandırma (None ise config.json)
+
+    Returns:
+        Optional[RunJournal]: checkpoint.enabled kapalıysa None
+    """
+    config = config if config is not None else get_config()
+    settings = config.get("checkpoint", {})
+    if not settings.get("enabled", False):
+        return None
+    run_id = run_fingerprint(file_digest(input_path), config)
+    path = os.path.join(settings.get("directory", os.path.join(".cache", "runs")), f"{run_id}.sqlite")
+    journal = RunJournal(path, settings.get("batch_messages", 1024))
+    if journal.get_meta("input") is None:
+        journal.set_meta("input", os.path.abspath(input_path))
+    return journal
+
+def checkpointed(journal: Optional[RunJournal], stage: str, author: str, texts: List[str],
+                 compute: Callable[[List[str]], List]) -> List:
+    """Günlük varsa journal.run, yoksa doğrudan compute(texts)"""
+    if journal is None:
+        return compute(texts)
+    return journal.run(stage, author, texts, compute)
@@ -7,13 +7,68 @@ import os
 from typing import Dict, Any
 
 DEFAULT_CONFIG = {
+    "parser": {
+        "workers": 1
+    },
     "ner": {
         "model_name": "akdeniz27/bert-base-turkish-cased-ner",
         "min_score": 0.6,
-        "aggregation_strategy": "simple"
+        "aggregation_strategy": "simple",
+        "batch_size": 32,
+        "max_tokens": 4096
     },
     "sentiment": {
-        "model_name": "savasy/bert-base-turkish-sentiment-cased"
+        "model_name": "savasy/bert-base-turkish-sentiment-cased",
+        "batch_size": "auto",
+        "max_tokens": None,
+        "autotune_sample_size": 64,
+        "autotune_max_batch_size": 128,
+        "autotune_memory_mb": None
+    },
+    "joint": {
+        "enabled": True,
+        "shared_encoder": False,
+        "encoder": "ner"
+    },
+    "onnx": {
+        "enabled": False,
+        "quantize": True,
+        "intra_op_threads": 0,
+        "inter_op_threads": 0,
+        "directory": ".cache/onnx"
+    },
+    "server": {
+        "use_server": False,
+        "host": "127.0.0.1",
+        "port": 8765,
+        "socket_path": None,
+        "max_batch_size": 64,
+        "max_latency_ms": 10,
+        "timeout": 300
+    },
+    "models": {
+        "memory_limit_mb": None,
+        "idle_timeout": None,
+        "min_idle_seconds": 0
+    },
+    "statistics": {
+        "word_frequency_mode": "exact",
+        "sketch_epsilon": 0.0001,
+        "sketch_delta": 0.01,
+        "sketch_capacity": None
+    },
+    "checkpoint": {
+        "enabled": True,
+        "directory": ".cache/runs",
+        "batch_messages": 1024
+    },
+    "incremental": {
+        "directory": ".cache/incremental"
+    },
+    "cache": {
+        "enabled": True,
+        "path": ".cache/inference.sqlite",
+        "max_size_mb": 512
     },
     "pii": {
         "mask_iban": True,
@@ -65,6 +120,16 @@ def load_config(config_path: str = "config.json") -> Dict[str, Any]:
     
     return _config
 
+def set_config(config: Dict[str, Any]):
+    """
+    Süreç genelinde kullanılacak yapılandırmayı ayarlar (config.json okunmaz).
+
+    Args:
+        config: Tam yapılandırma (eksik bölümler için merge_config(DEFAULT_CONFIG, ...) kullanın)
+    """
+    global _config
+    _config = config
+
 def save_config(config: Dict[str, Any], config_path: str = "config.json"):
     """
     Yapılandırmayı dosyaya kaydeder.
@@ -110,6 +175,18 @@ def get_sentiment_config() -> Dict:
     """Sentiment yapılandırmasını döndürür"""
     return get_config().get("sentiment", {})
 
+def get_models_config() -> Dict:
+    """Model kaydı (bellek limiti, boşta kalma süresi) yapılandırmasını döndürür"""
+    return get_config().get("models", {})
+
+def get_onnx_config() -> Dict:
+    """ONNX Runtime arka ucu (nicemleme, iş parçacığı sayıları) yapılandırmasını döndürür"""
+    return get_config().get("onnx", {})
+
+def get_statistics_config() -> Dict:
+    """İstatistik (kelime sıklığı kipi ve özet hata sınırları) yapılandırmasını döndürür"""
+    return get_config().get("statistics", {})
+
 def get_pii_config() -> Dict:
     """PII yapılandırmasını döndürür"""
     return get_config().get("pii", {})
@@ -117,3 +194,7 @@ def get_pii_config() -> Dict:
 def get_export_config() -> Dict:
     """Export yapılandırmasını döndürür"""
     return get_config().get("export", {})
+
+def get_visualization_config() -> Dict:
+    """Görselleştirme (figür boyutu, dpi, stil) yapılandırmasını döndürür"""
+    return get_config().get("visualization", {})
@@ -2,23 +2,189 @@
 Veri Dışa Aktarma Modülü
 Analiz sonuçlarını farklı formatlarda dışa aktarır.
 """
+import importlib.util
+import io
 import json
+import re
 import csv
-from typing import Dict, List, Any
+import gzip
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Tuple
 from datetime import datetime
+from message_table import MessageTable
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Ağır isteğe bağlı paketler yalnızca ilgili dışa aktarım çağrıldığında yüklenir;
+# burada sadece kurulu olup olmadıkları denetlenir
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Akış yazıcılarının tampon boyutu (bayt)
+WRITE_BUFFER = 1 << 20
+# Şema verilmezse alan adları ilk bu kadar kayıttan çıkarılır
+SCHEMA_SAMPLE_SIZE = 1000
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+ENTITY_FIELDS = ["text", "entity", "label", "score"]
+# Parquet satır grubu boyutu: okuyucular grup grup akış halinde okuyabilir
+PARQUET_ROW_GROUP_SIZE = 65536
+PARQUET_PARTITIONS = ("author", "month")
+# Excel sınırları: sayfa başına satır (başlık dahil), hücre başına karakter, sayfa adı uzunluğu
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_CELL_CHARS = 32767
+EXCEL_MAX_SHEET_NAME = 31
+# Özet istatistikler bu kadar kayıtlık gruplarla biriktirilir
+SUMMARY_BATCH_SIZE = 1024
+# Excel'in kabul etmediği kontrol karakterleri (openpyxl ILLEGAL_CHARACTERS_RE ile aynı)
+EXCEL_ILLEGAL_CHARACTERS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+def _timestamped(prefix: str, extension: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{timestamp}.{extension}"
+
+def _json_default(value):
+    """numpy skalerleri/dizileri ve tarihleri JSON'a çevirir"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value).__name__}")
+
+def open_output(filename: str, compression: Optional[str] = None, newline: Optional[str] = None):
+    """
+    Tamponlu, isteğe bağlı sıkıştırmalı metin dosyası açar.
+
+    Args:
+        filename: Dosya yolu
+        compression: "gzip", "zstd" veya None (None ise uzantıdan: .gz, .zst)
+        newline: open() ile aynı anlamda (CSV için "")
+
+    Returns:
+        Yazılabilir metin dosyası nesnesi
+    """
+    if compression is None:
+        compression = next((c for suffix, c in COMPRESSION_SUFFIXES.items() if filename.endswith(suffix)), None)
+    if compression is None:
+        return open(filename, "w", encoding="utf-8", newline=newline, buffering=WRITE_BUFFER)
+    if compression == "gzip":
+        # Hız için orta sıkıştırma seviyesi
+        raw = gzip.open(filename, "wb", compresslevel=6)
+    elif compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstd sıkıştırma için zstandard paketi gerekli. pip install zstandard")
+        import zstandard
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(filename, "wb"))
+    else:
+        raise ValueError(f"Bilinmeyen sıkıştırma: {compression}")
+    return io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER), encoding="utf-8", newline=newline)
+
+def iter_records(messages) -> Iterator[Dict]:
+    """MessageTable, liste veya herhangi bir kayıt akışını kayıt kayıt dolaşır (kopya oluşturmaz)"""
+    if isinstance(messages, MessageTable):
+        return messages.iter_records()
+    return iter(messages)
+
+def infer_schema(records: Iterable[Dict], sample_size: int = SCHEMA_SAMPLE_SIZE) -> Tuple[List[str], Iterator[Dict]]:
+    """
+    İlk sample_size kaydın anahtarlarından (ilk görülme sırasıyla) alan adları çıkarır.
+
+    Returns:
+        Tuple[List[str], Iterator[Dict]]: Alan adları ve incelenen kayıtlar dahil tüm akış
+    """
+    records = iter(records)
+    head = list(islice(records, sample_size))
+    fieldnames = {}
+    for record in head:
+        fieldnames.update(dict.fromkeys(record))
+    return list(fieldnames), chain(head, records)
+
+class JsonlWriter:
+    """
+    Kayıtları satır başına bir JSON nesnesi olarak yazan akış yazıcısı.
+
+    Args:
+        filename: Dosya yolu (.gz/.zst uzantısı sıkıştırmayı seçer)
+        compression: "gzip", "zstd" veya None
+    """
+
+    def __init__(self, filename: str, compression: Optional[str] = None):
+        self.filename = filename
+        self.rows = 0
+        self._file = open_output(filename, compression)
+        self._encoder = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+
+    def write(self, record: Dict):
+        self._file.write(self._encoder.encode(record))
+        self._file.write("\n")
+        self.rows += 1
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CsvWriter:
+    """
+    Sabit şemalı CSV akış yazıcısı; iç içe dict/list değerleri JSON metni olarak yazılır.
+
+    Şemada olmayan alanlar yazılmaz, eksik alanlar boş bırakılır.
+
+    Args:
+        filename: Dosya yolu (.gz/.zst uzantısı sıkıştırmayı seçer)
+        fieldnames: Sütunlar
+        compression: "gzip", "zstd" veya None
+    """
+
+    def __init__(self, filename: str, fieldnames: Sequence[str], compression: Optional[str] = None):
+        self.filename = filename
+        self.fieldnames = list(fieldnames)
+        self.rows = 0
+        self._file = open_output(filename, compression, newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.fieldnames)
+        self._encoder = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+
+    def _cell(self, value):
+        if isinstance(value, (dict, list, tuple)):
+            return self._encoder.encode(value)
+        if hasattr(value, "item"):
+            return value.item()
+        return "" if value is None else value
+
+    def write(self, record: Dict):
+        cell = self._cell
+        self._writer.writerow([cell(record.get(name)) for name in self.fieldnames])
+        self.rows += 1
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 def export_to_json(data: Any, filename: str = None) -> str:
     """
     Veriyi JSON formatında dışa aktarır.
     
     Args:
-        data: Dışa aktarılacak veri
+        data: Dışa aktarılacak veri (MessageTable ise kayıt listesine çevrilir)
         filename: Dosya adı (None ise otomatik oluşturulur)
         
     Returns:
@@ -28,81 +194,180 @@ def export_to_json(data: Any, filename: str = None) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"export_{timestamp}.json"
     
+    if isinstance(data, MessageTable):
+        data = data.to_records()
+    
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
     
     return filename
 
-def export_to_csv(messages: List[Dict], filename: str = None) -> str:
+def export_to_jsonl(records: Iterable[Dict], filename: str = None, compression: Optional[str] = None) -> str:
     """
-    Mesajları CSV formatında dışa aktarır.
+    Kayıtları JSON Lines formatında akış halinde dışa aktarır (sabit bellek).
+
+    Args:
+        records: Kayıt listesi, üreteç veya MessageTable
+        filename: Dosya adı (None ise otomatik oluşturulur; .gz/.zst sıkıştırır)
+        compression: "gzip", "zstd" veya None (None ise uzantıdan)
+
+    Returns:
+        str: Kaydedilen dosya yolu
+    """
+    if filename is None:
+        filename = _timestamped("export", "jsonl")
+    with JsonlWriter(filename, compression) as writer:
+        writer.write_many(iter_records(records))
+    return filename
+
+def export_to_csv(messages: Iterable[Dict], filename: str = None, fieldnames: Optional[Sequence[str]] = None,
+                  compression: Optional[str] = None, sample_size: int = SCHEMA_SAMPLE_SIZE) -> str:
+    """
+    Mesajları CSV formatında akış halinde dışa aktarır.
     
     Args:
-        messages: Dışa aktarılacak mesaj listesi
-        filename: Dosya adı (None ise otomatik oluşturulur)
+        messages: Dışa aktarılacak mesaj listesi, üreteç veya MessageTable
+        filename: Dosya adı (None ise otomatik oluşturulur; .gz/.zst sıkıştırır)
+        fieldnames: Sütunlar (None ise ilk sample_size kayıttan çıkarılır)
+        compression: "gzip", "zstd" veya None (None ise uzantıdan)
+        sample_size: Şema çıkarımında incelenecek kayıt sayısı
         
     Returns:
         str: Kaydedilen dosya yolu
     """
     if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"export_{timestamp}.csv"
-    
-    if not messages:
-        return filename
+        filename = _timestamped("export", "csv")
     
-    # CSV için uygun format
-    fieldnames = set()
-    for msg in messages:
-        fieldnames.update(msg.keys())
-    fieldnames = list(fieldnames)
+    records = iter_records(messages)
+    if fieldnames is None:
+        fieldnames, records = infer_schema(records, sample_size)
+        if not fieldnames:
+            return filename
     
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for msg in messages:
-            # Nested dict'leri string'e çevir
-            row = {}
-            for key, value in msg.items():
-                if isinstance(value, (dict, list)):
-                    row[key] = json.dumps(value, ensure_ascii=False)
-                else:
-                    row[key] = value
-            writer.writerow(row)
+    with CsvWriter(filename, fieldnames, compression) as writer:
+        writer.write_many(records)
     
     return filename
 
-def export_to_excel(messages: List[Dict], filename: str = None, sheet_name: str = "Messages") -> str:
+def _excel_cell(value):
+    """Değeri Excel hücresine yazılabilir hale getirir (iç içe değerler JSON, uzun metin kesilir)"""
+    if isinstance(value, (dict, list, tuple)):
+        value = json.dumps(value, ensure_ascii=False, default=_json_default)
+    elif hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, str):
+        value = EXCEL_ILLEGAL_CHARACTERS_RE.sub("", value)[:EXCEL_MAX_CELL_CHARS]
+    return value
+
+def _summary_rows(statistics: Dict, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """İç içe istatistik sözlüğünü (anahtar yolu, değer) satırlarına düzleştirir"""
+    for key, value in statistics.items():
+        name = f"{prefix} / {key}" if prefix else str(key)
+        if isinstance(value, dict) and value:
+            yield from _summary_rows(value, name)
+        else:
+            yield name, _excel_cell(value)
+
+class _SummaryStatistics:
+    """Excel'e yazılan kayıtlardan özet istatistikleri sabit bellekte biriktirir"""
+
+    def __init__(self, fieldnames: Sequence[str]):
+        from analysis_statistics import (EntityStatisticsAccumulator, MessageStatisticsAccumulator,
+                                         SentimentStatisticsAccumulator)
+
+        self.accumulators = {"messages": MessageStatisticsAccumulator()}
+        if "ents" in fieldnames:
+            self.accumulators["entities"] = EntityStatisticsAccumulator()
+        if "sentiment" in fieldnames:
+            self.accumulators["sentiment"] = SentimentStatisticsAccumulator()
+        self.pending = []
+
+    def add(self, record: Dict):
+        self.pending.append(record)
+        if len(self.pending) >= SUMMARY_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        for name, acc in self.accumulators.items():
+            acc.update([r.get("text") or "" for r in self.pending] if name == "messages" else self.pending)
+        self.pending = []
+
+    def result(self) -> Dict:
+        self.flush()
+        result = {name: acc.result() for name, acc in self.accumulators.items()}
+        # Histogramlar özet sayfası için fazla uzun
+        for key in ("word_count_histogram", "char_length_histogram"):
+            result["messages"].pop(key, None)
+        return result
+
+def export_to_excel(messages: Iterable[Dict], filename: str = None, sheet_name: str = "Messages",
+                    statistics: Optional[Dict] = None, summary: bool = True,
+                    fieldnames: Optional[Sequence[str]] = None, sample_size: int = SCHEMA_SAMPLE_SIZE,
+                    max_rows: int = EXCEL_MAX_ROWS) -> str:
     """
-    Mesajları Excel formatında dışa aktarır.
-    
+    Mesajları Excel formatında akış halinde dışa aktarır (openpyxl write-only).
+
+    Satırlar geçici dosyalara yazılır; bellekte tüm tablo tutulmaz. Sayfa satır
+    sınırına ulaşıldığında "Messages (2)", "Messages (3)" ... sayfalarına geçilir.
+    İlk sayfa olarak bir "Summary" sayfası eklenir.
+
     Args:
-        messages: Dışa aktarılacak mesaj listesi
+        messages: Dışa aktarılacak mesaj listesi, üreteç veya MessageTable
         filename: Dosya adı (None ise otomatik oluşturulur)
         sheet_name: Excel sheet adı
-        
+        statistics: Özet sayfasına yazılacak analysis_statistics çıktısı
+            (None ise yazılan kayıtlardan mesaj/entity/duygu istatistikleri biriktirilir)
+        summary: False ise özet sayfası yazılmaz
+        fieldnames: Sütunlar (None ise ilk sample_size kayıttan çıkarılır)
+        sample_size: Şema çıkarımında incelenecek kayıt sayısı
+        max_rows: Sayfa başına en fazla satır (başlık dahil)
+
     Returns:
         str: Kaydedilen dosya yolu
     """
-    if not PANDAS_AVAILABLE:
-        raise ImportError("pandas ve openpyxl paketleri gerekli. pip install pandas openpyxl")
-    
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("openpyxl paketi gerekli. pip install openpyxl")
+
     if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"export_{timestamp}.xlsx"
-    
-    # DataFrame oluştur
-    df = pd.DataFrame(messages)
-    
-    # Nested dict/list kolonlarını string'e çevir
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            df[col] = df[col].apply(
-                lambda x: json.dumps(x, ensure_ascii=False) if isinstance(x, (dict, list)) else x
-            )
-    
-    df.to_excel(filename, index=False, sheet_name=sheet_name, engine='openpyxl')
+        filename = _timestamped("export", "xlsx")
+
+    records = iter_records(messages)
+    if fieldnames is None:
+        fieldnames, records = infer_schema(records, sample_size)
+    fieldnames = list(fieldnames)
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    summary_sheet = workbook.create_sheet("Summary") if summary else None
+    collector = _SummaryStatistics(fieldnames) if summary and statistics is None else None
+
+    base_name = sheet_name[:EXCEL_MAX_SHEET_NAME]
+    sheet = workbook.create_sheet(base_name)
+    sheet.append(fieldnames)
+    sheet_rows, sheets = 1, 1
+    for record in records:
+        if sheet_rows >= max_rows:
+            sheets += 1
+            suffix = f" ({sheets})"
+            sheet = workbook.create_sheet(base_name[:EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix)
+            sheet.append(fieldnames)
+            sheet_rows = 1
+        sheet.append([_excel_cell(record.get(name)) for name in fieldnames])
+        sheet_rows += 1
+        if collector is not None:
+            collector.add(record)
+
+    if summary_sheet is not None:
+        if collector is not None:
+            statistics = collector.result()
+        summary_sheet.append(["Statistic", "Value"])
+        for row in _summary_rows(statistics):
+            summary_sheet.append(row)
+
+    workbook.save(filename)
     return filename
 
 def export_statistics_to_json(stats: Dict, filename: str = None) -> str:
@@ -122,41 +387,186 @@ def export_statistics_to_json(stats: Dict, filename: str = None) -> str:
     
     return export_to_json(stats, filename)
 
-def export_entities_to_csv(messages_with_entities: List[Dict], filename: str = None) -> str:
-    """
-    Entity'leri CSV formatında dışa aktarır.
-    
-    Args:
-        messages_with_entities: Entity içeren mesaj listesi
-        filename: Dosya adı
-        
-    Returns:
-        str: Kaydedilen dosya yolu
-    """
-    if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"entities_{timestamp}.csv"
-    
-    # Entity'leri düzleştir
-    flattened = []
-    for msg in messages_with_entities:
+def iter_entity_rows(messages_with_entities: Iterable[Dict]) -> Iterator[Dict]:
+    """Mesajları entity başına bir satıra düzleştirir (entity'siz mesaj tek boş satır verir)"""
+    for msg in iter_records(messages_with_entities):
         text = msg.get('text', '')
-        ents = msg.get('ents', [])
+        ents = msg.get('ents') or []
         
         if not ents:
-            flattened.append({
-                'text': text,
-                'entity': '',
-                'label': '',
-                'score': ''
-            })
+            yield {'text': text, 'entity': '', 'label': '', 'score': ''}
         else:
             for ent in ents:
-                flattened.append({
+                yield {
                     'text': text,
                     'entity': ent.get('word', ''),
                     'label': ent.get('entity_group', ent.get('label', '')),
                     'score': ent.get('score', '')
-                })
+                }
+
+def export_entities_to_csv(messages_with_entities: Iterable[Dict], filename: str = None,
+                           compression: Optional[str] = None) -> str:
+    """
+    Entity'leri CSV formatında akış halinde dışa aktarır (düzleştirilmiş kopya oluşturulmaz).
+    
+    Args:
+        messages_with_entities: Entity içeren mesaj listesi, üreteç veya MessageTable
+        filename: Dosya adı (.gz/.zst sıkıştırır)
+        compression: "gzip", "zstd" veya None (None ise uzantıdan)
+        
+    Returns:
+        str: Kaydedilen dosya yolu
+    """
+    if filename is None:
+        filename = _timestamped("entities", "csv")
     
-    return export_to_csv(flattened, filename)
+    return export_to_csv(iter_entity_rows(messages_with_entities), filename, fieldnames=ENTITY_FIELDS,
+                         compression=compression)
+
+def _parquet_types() -> Dict[str, Any]:
+    """Bilinen alanların Parquet tipleri (entity ve duygu iç içe yapı olarak)"""
+    import pyarrow as pa
+
+    return {
+        "id": pa.int64(),
+        "line": pa.int64(),
+        "author": pa.string(),
+        "timestamp": pa.timestamp("s"),
+        "text": pa.string(),
+        # status/error (analyze_sentiments_with_status) skorlanamayan mesajı skorlanandan ayırır
+        "sentiment": pa.struct([
+            ("label", pa.string()),
+            ("score", pa.float32()),
+            ("status", pa.string()),
+            ("error", pa.string()),
+        ]),
+        "ents": pa.list_(pa.struct([
+            ("word", pa.string()),
+            ("entity_group", pa.string()),
+            ("score", pa.float32()),
+            ("start", pa.int32()),
+            ("end", pa.int32()),
+        ])),
+    }
+
+def _parquet_row(record: Dict) -> Dict:
+    """Kaydı Parquet şemasına uygun hale getirir (zaman damgası, entity etiket adları)"""
+    row = dict(record)
+    timestamp = row.get("timestamp")
+    if isinstance(timestamp, str):
+        row["timestamp"] = datetime.fromisoformat(timestamp) if timestamp else None
+    ents = row.get("ents")
+    if ents:
+        row["ents"] = [
+            {
+                "word": ent.get("word") or ent.get("value") or "",
+                "entity_group": ent.get("entity_group") or ent.get("entity") or ent.get("label"),
+                "score": ent.get("score"),
+                "start": ent.get("start"),
+                "end": ent.get("end"),
+            }
+            for ent in ents
+        ]
+    return row
+
+def parquet_schema(records: Iterable[Dict], sample_size: int = SCHEMA_SAMPLE_SIZE,
+                   partition_by: Sequence[str] = ()) -> Tuple["pa.Schema", Iterator[Dict]]:
+    """
+    İlk sample_size kayıttan Parquet şeması çıkarır.
+
+    Bilinen alanlar (id, author, timestamp, text, sentiment, ents, ...) sabit
+    tiplerle, diğerleri pyarrow'un örnek değerlerden çıkardığı tiple yazılır.
+
+    Returns:
+        Tuple[pa.Schema, Iterator[Dict]]: Şema ve dönüştürülmüş kayıtların tamamı
+    """
+    import pyarrow as pa
+
+    fieldnames, rows = infer_schema(map(_parquet_row, records), sample_size)
+    head = list(islice(rows, sample_size))
+    known = _parquet_types()
+    fields = []
+    for name in fieldnames:
+        if name in known:
+            fields.append(pa.field(name, known[name]))
+            continue
+        inferred = pa.array([row.get(name) for row in head]).type
+        fields.append(pa.field(name, pa.string() if pa.types.is_null(inferred) else inferred))
+    if "month" in partition_by:
+        fields.append(pa.field("month", pa.string()))
+    return pa.schema(fields), chain(head, rows)
+
+def _record_batches(rows: Iterator[Dict], schema: "pa.Schema", batch_size: int,
+                    with_month: bool) -> Iterator["pa.RecordBatch"]:
+    import pyarrow as pa
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        if with_month:
+            for row in chunk:
+                timestamp = row.get("timestamp")
+                row["month"] = timestamp.strftime("%Y-%m") if timestamp else None
+        yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+def export_to_parquet(messages: Iterable[Dict], filename: str = None, compression: str = "zstd",
+                      row_group_size: int = PARQUET_ROW_GROUP_SIZE, partition_by: Sequence[str] = (),
+                      sample_size: int = SCHEMA_SAMPLE_SIZE) -> str:
+    """
+    Mesajları sütunlu Parquet formatında akış halinde dışa aktarır.
+
+    Entity'ler list<struct>, duygu sonucu struct sütunu olarak yazılır; JSON'a
+    çevrilmez. Bellekte en fazla bir satır grubu tutulur.
+
+    Args:
+        messages: Mesaj listesi, üreteç veya MessageTable
+        filename: Dosya adı; partition_by verilirse hedef dizin (None ise otomatik)
+        compression: "zstd", "snappy", "gzip" veya "none"
+        row_group_size: Satır grubu başına mesaj sayısı
+        partition_by: Hive tarzı bölümleme sütunları: "author" ve/veya "month"
+            (ör. author=Ali/month=2024-01/part-0.parquet)
+        sample_size: Şema çıkarımında incelenecek kayıt sayısı
+
+    Returns:
+        str: Kaydedilen dosya veya dizin yolu
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Parquet dışa aktarımı için pyarrow paketi gerekli. pip install pyarrow")
+    unknown = [name for name in partition_by if name not in PARQUET_PARTITIONS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen bölümleme sütunu: {', '.join(unknown)}")
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.parquet as pq
+
+    if filename is None:
+        filename = _timestamped("export", "parquet") if not partition_by else _timestamped("export", "parquet.d")
+
+    schema, rows = parquet_schema(iter_records(messages), sample_size, partition_by)
+    if not schema:
+        return filename
+    batches = _record_batches(rows, schema, row_group_size, "month" in partition_by)
+
+    if not partition_by:
+        with pq.ParquetWriter(filename, schema, compression=compression) as writer:
+            for batch in batches:
+                writer.write_batch(batch, row_group_size=row_group_size)
+        return filename
+
+    partitioning = pa_dataset.partitioning(
+        pa.schema([schema.field(name) for name in partition_by]), flavor="hive"
+    )
+    file_format = pa_dataset.ParquetFileFormat()
+    pa_dataset.write_dataset(
+        batches,
+        filename,
+        schema=schema,
+        format=file_format,
+        file_options=file_format.make_write_options(compression=compression),
+        partitioning=partitioning,
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=row_group_size,
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return filename
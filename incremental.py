@@ -0,0 +1,259 @@
+"""
+Artımlı Analiz Modülü
+Aynı sohbetin sonuna mesaj eklenmiş yeni dışa aktarımlarında yalnızca eklenen
+kısmı ayrıştırır ve analiz eder; sonuçları ve istatistikleri kayıtlı olanlarla
+birleştirir.
+
+Her kaynak dosya için bir su seviyesi (watermark) saklanır: son mesajın başlık
+satırının bayt konumu ve o konuma kadarki içeriğin SHA-256 özeti. Son mesaj
+sonraki dışa aktarımda devam satırlarıyla uzayabileceği için kesinleşmiş
+sayılmaz; her çalışmada eklenen kısımla birlikte yeniden ayrıştırılır.
+
+Kullanım:
+    python incremental.py data.txt [--stages ner,sentiment] [--output sonuc.json]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from analysis_statistics import (EntityStatisticsAccumulator, MessageStatisticsAccumulator,
+                                 SentimentStatisticsAccumulator, WordCountAccumulator)
+from checkpoint import RunJournal, run_fingerprint
+from config import get_config
+from parser import RE_HEADER, _parse_lines, _split_text_lines, author_key, sanitize_messages
+
+STAGES = ("ner", "sentiment")
+# Yazar başına saklanan istatistik biriktiricileri ve beslendikleri veri
+STATISTICS = {
+    "messages": (MessageStatisticsAccumulator, None),
+    "words": (WordCountAccumulator, None),
+    "entities": (EntityStatisticsAccumulator, "ner"),
+    "sentiment": (SentimentStatisticsAccumulator, "sentiment"),
+}
+_HASH_CHUNK = 1 << 20
+
+def prefix_digest(path: str, offset: int) -> str:
+    """Dosyanın ilk offset baytının SHA-256 özeti"""
+    digest = hashlib.sha256()
+    remaining = offset
+    with open(path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(_HASH_CHUNK, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+class _TailLines:
+    """
+    Dosyayı bir bayt konumundan itibaren satır satır okur; son başlık satırının
+    bayt konumunu ve satır numarasını izler (yeni su seviyesi).
+    """
+
+    def __init__(self, path: str, offset: int, first_line: int):
+        self.path = path
+        self.offset = offset
+        self.first_line = first_line
+        self.last_header = (offset, first_line)
+        self.end = offset
+
+    def __iter__(self) -> Iterator[str]:
+        line_no = self.first_line
+        position = self.offset
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                # Metin kipindeki okumayla aynı satır bölümü (\r\n ve tek \r dahil)
+                lines = _split_text_lines(raw.decode("utf-8"))
+                for k, line in enumerate(lines):
+                    # Tek \r ile ayrılmış alt satırlar su seviyesi olamaz (bayt konumları ayrı izlenmez)
+                    if k == 0 and RE_HEADER.match(line.strip()):
+                        self.last_header = (position, line_no)
+                    yield line
+                    line_no += 1
+                position += len(raw)
+        self.end = position
+
+def _empty_statistics(stages: Sequence[str]) -> Dict[str, object]:
+    return {name: cls() for name, (cls, stage) in STATISTICS.items() if stage is None or stage in stages}
+
+def _load_statistics(state: Dict) -> Dict[str, Dict[str, object]]:
+    return {
+        author: {name: STATISTICS[name][0].from_dict(acc) for name, acc in accs.items()}
+        for author, accs in state.items()
+    }
+
+def _update_statistics(accs: Dict[str, object], texts: List[str], results: Dict[str, List]):
+    for name, acc in accs.items():
+        stage = STATISTICS[name][1]
+        if stage is None:
+            acc.update(texts)
+        else:
+            key = "ents" if stage == "ner" else "sentiment"
+            acc.update([{"text": t, key: r} for t, r in zip(texts, results[stage]) if r is not None])
+
+def _analyze(texts: List[str], stages: Sequence[str], config: Dict) -> Dict[str, List]:
+    """Yeni mesajlar için istenen aşamaları çalıştırır (önbellek ve çıkarım sunucusu kullanılır)"""
+    results = {}
+    if "ner" in stages:
+        from NER import apply_ner_batch
+        ner_config = config.get("ner", {})
+        results["ner"] = apply_ner_batch(texts, ner_config.get("batch_size", 32), ner_config.get("max_tokens", 4096))
+    if "sentiment" in stages:
+        from sentiment import analyze_sentiments_with_status
+        results["sentiment"] = analyze_sentiments_with_status(texts)
+    return results
+
+def _state_path(path: str, config: Dict) -> str:
+    directory = config.get("incremental", {}).get("directory", os.path.join(".cache", "incremental"))
+    name = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:24]
+    return os.path.join(directory, f"{name}.sqlite")
+
+def analyze_incremental(path: str, stages: Sequence[str] = STAGES, config: Optional[Dict] = None) -> Dict:
+    """
+    Sohbet dosyasını artımlı olarak analiz eder.
+
+    Kayıtlı su seviyesine kadarki içerik değişmemişse yalnızca sonrası
+    ayrıştırılır, temizlenir ve analiz edilir; yeni sonuçlar ve istatistikler
+    kayıtlılarla birleştirilir. Önek değişmiş, dosya kısalmış ya da sonucu
+    etkileyen ayarlar (model, revizyon, PII maskeleme, aşamalar) değişmişse tam
+    çalışmaya dönülür. Mesaj metinleri read_data + sanitize_messages ile aynıdır.
+
+    Args:
+        path: Sohbet dosyası
+        stages: "ner" ve/veya "sentiment"
+        config: Yapılandırma (None ise config.json)
+
+    Returns:
+        Dict: {'mode': 'incremental'/'full', 'reason', 'parsed_messages',
+            'messages': {yazar: [metin]}, 'ner'/'sentiment': {yazar: [sonuç]},
+            'statistics': {yazar: {'messages', 'words', 'entities', 'sentiment'}}}
+    """
+    config = config if config is not None else get_config()
+    stages = [stage for stage in STAGES if stage in stages]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dosya bulunamadı: {path}")
+    fingerprint = run_fingerprint(json.dumps(stages), config)
+    state_path = _state_path(path, config)
+    journal = RunJournal(state_path)
+    watermark = json.loads(journal.get_meta("watermark") or "null")
+
+    reason = None
+    if watermark is None:
+        reason = "kayıtlı durum yok"
+    elif watermark["fingerprint"] != fingerprint:
+        reason = "ayarlar değişmiş"
+    elif os.path.getsize(path) < watermark["offset"]:
+        reason = "dosya kısalmış"
+    elif prefix_digest(path, watermark["offset"]) != watermark["prefix_sha256"]:
+        reason = "dosyanın önceki kısmı değişmiş"
+    if reason is not None:
+        journal.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(state_path + suffix):
+                os.remove(state_path + suffix)
+        journal = RunJournal(state_path)
+        watermark = {"offset": 0, "line": 1, "counts": {}, "fingerprint": fingerprint}
+        committed_stats = {}
+    else:
+        committed_stats = _load_statistics(json.loads(journal.get_meta("statistics") or "{}"))
+
+    try:
+        # Su seviyesinden itibaren ayrıştır; ilk kayıt önceki çalışmanın kesinleşmemiş son mesajıdır
+        tail = _TailLines(path, watermark["offset"], watermark["line"])
+        records = list(_parse_lines(tail, first_line=watermark["line"]))
+        new_offset, new_line = tail.last_header
+
+        grouped = {}
+        for record in records:
+            grouped.setdefault(author_key(record.author), []).append(record)
+        texts = sanitize_messages({author: [r.text for r in recs] for author, recs in grouped.items()})
+
+        counts = dict(watermark["counts"])
+        writes = {}
+        statistics = {}
+        for author, recs in grouped.items():
+            start = counts.get(author, 0)
+            author_texts = texts[author]
+            results = _analyze(author_texts, stages, config)
+            writes[("text", author)] = (start, author_texts)
+            for stage in stages:
+                writes[(stage, author)] = (start, results[stage])
+            # Yeni su seviyesinden önce başlayan mesajlar kesinleşir
+            final = sum(1 for r in recs if r.line < new_line)
+            committed = committed_stats.setdefault(author, _empty_statistics(stages))
+            _update_statistics(committed, author_texts[:final], {s: results[s][:final] for s in stages})
+            trailing = _empty_statistics(stages)
+            _update_statistics(trailing, author_texts[final:], {s: results[s][final:] for s in stages})
+            statistics[author] = trailing
+            counts[author] = start + final
+
+        meta = {
+            "watermark": json.dumps({
+                "offset": new_offset,
+                "prefix_sha256": prefix_digest(path, new_offset),
+                "line": new_line,
+                "counts": counts,
+                "fingerprint": fingerprint,
+            }),
+            "statistics": json.dumps({
+                author: {name: acc.to_dict() for name, acc in accs.items()}
+                for author, accs in committed_stats.items()
+            }, ensure_ascii=False),
+            "input": os.path.abspath(path),
+        }
+        journal.commit_results(writes, meta)
+
+        authors = list(dict.fromkeys(list(committed_stats) + list(grouped)))
+        output = {
+            "mode": "full" if reason is not None else "incremental",
+            "reason": reason,
+            "parsed_messages": len(records),
+            "messages": {author: journal.load_results("text", author) for author in authors},
+        }
+        for stage in stages:
+            output[stage] = {author: journal.load_results(stage, author) for author in authors}
+        output["statistics"] = {}
+        for author in authors:
+            # Boş biriktiriciye kesinleşmişler, ardından kesinleşmemiş son mesaj eklenir
+            accs = _empty_statistics(stages)
+            for part in (committed_stats.get(author, {}), statistics.get(author, {})):
+                for name, acc in part.items():
+                    accs[name].merge(acc)
+            output["statistics"][author] = {name: acc.result() for name, acc in accs.items()}
+        return output
+    finally:
+        journal.close()
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Sonuna mesaj eklenmiş sohbet dışa aktarımlarının artımlı analizi")
+    arg_parser.add_argument("path", help="Sohbet dosyası (data.txt)")
+    arg_parser.add_argument("--stages", default=",".join(STAGES), help="Virgülle ayrılmış aşamalar: ner,sentiment")
+    arg_parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = arg_parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        arg_parser.error(f"Bilinmeyen aşama: {', '.join(unknown)}")
+
+    result = analyze_incremental(args.path, stages)
+    if result["mode"] == "full":
+        print(f"Tam analiz yapıldı ({result['reason']}).")
+    else:
+        print("Artımlı analiz yapıldı.")
+    print(f"Ayrıştırılan mesaj: {result['parsed_messages']}")
+    for author, stats in result["statistics"].items():
+        print(f"  {author}: {stats['messages'].get('total_messages', 0)} mesaj")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+Yerel Çıkarım Sunucusu Modülü
+NER ve duygu modellerini uzun ömürlü bir süreçte sıcak tutar; aynı makinedeki
+istemcilerin eş zamanlı isteklerini en fazla bekleme süreli mikro-batch'lerde
+birleştirir. localhost HTTP veya Unix soketi üzerinden JSON ile konuşur.
+
+Kullanım:
+    python inference_server.py [--host 127.0.0.1] [--port 8765] [--socket /tmp/mol.sock]
+
+config.json'da server.use_server açıkken apply_ner, apply_ner_batch,
+analyze_sentiment(s), analyze_sentiments_with_status ve analyze_joint
+istekleri sunucuya gönderir; sunucuya ulaşılamazsa modeller yerelde yüklenir.
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from config import get_config, get_models_config
+
+# Ulaşılamayan sunucu bu süre boyunca yeniden denenmez (saniye)
+RETRY_SECONDS = 30.0
+# Boşta kalan modellerin (models.idle_timeout) kontrol aralığı (saniye)
+IDLE_CHECK_SECONDS = 5.0
+
+# Bu süreç sunucunun kendisiyse istemci devre dışıdır (kendine istek göndermesin)
+_serving = False
+
+def _server_settings() -> Dict:
+    return get_config().get("server", {})
+
+class MicroBatcher:
+    """
+    Eş zamanlı istekleri tek model çağrısında birleştiren kuyruk.
+
+    İlk istek geldiğinde en fazla max_latency_ms beklenir; bu sürede gelen
+    istekler (toplam max_batch_size metne kadar) aynı çağrıya eklenir. Tekrarlanan
+    metinler bir kez işlenir, sonuçlar her isteğe kendi sırasıyla dağıtılır.
+
+    Args:
+        run: Metin listesi alıp aynı sırada sonuç listesi döndüren fonksiyon
+        max_batch_size: Bir çağrıdaki en fazla metin sayısı (tek istek bunu aşabilir)
+        max_latency_ms: İlk isteğin diğerlerini en fazla bekleme süresi
+    """
+
+    def __init__(self, run: Callable[[List[str]], List], max_batch_size: int = 64, max_latency_ms: float = 10.0):
+        self.run = run
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "largest_batch": 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Metinleri kuyruğa ekler; sonuç listesi Future ile döner"""
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def close(self):
+        """Kuyruktaki istekler bittikten sonra iş parçacığını durdurur"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = [first]
+            count = len(first[0])
+            deadline = time.monotonic() + self.max_latency
+            stop = False
+            while count < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                pending.append(item)
+                count += len(item[0])
+            self._flush(pending)
+            if stop:
+                return
+
+    def _flush(self, pending: List):
+        texts = list(dict.fromkeys(t for request_texts, _ in pending for t in request_texts))
+        try:
+            results = dict(zip(texts, self.run(texts))) if texts else {}
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.stats["requests"] += len(pending)
+        self.stats["texts"] += len(texts)
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(texts))
+        for request_texts, future in pending:
+            future.set_result([results[t] for t in request_texts])
+
+def _task_runners() -> Dict[str, Callable[[List[str]], List]]:
+    """Sunucu tarafında her görevin yerel (önbellekli) çekirdeği; batch ayarları config'den gelir"""
+    from cache import _to_builtin
+    from NER import apply_ner_batch
+    from sentiment import analyze_sentiments_with_status
+    from joint import analyze_joint, joint_available
+
+    ner_config = get_config().get("ner", {})
+    batch_size = ner_config.get("batch_size", 32)
+    max_tokens = ner_config.get("max_tokens", 4096)
+    joint = get_config().get("joint", {}).get("enabled", True) and joint_available()
+
+    def run_joint(texts: List[str]) -> List[Dict]:
+        if joint:
+            return [{"ents": r["ents"], "sentiment": r["sentiment"]} for r in analyze_joint(texts, batch_size, max_tokens)]
+        ents = apply_ner_batch(texts, batch_size, max_tokens)
+        sentiments = analyze_sentiments_with_status(texts)
+        return [{"ents": e, "sentiment": s} for e, s in zip(ents, sentiments)]
+
+    # Sonuçlar JSON'a yazılacağı için numpy skalerleri Python tiplerine çevrilir
+    return {
+        "ner": lambda texts: _to_builtin(apply_ner_batch(texts, batch_size, max_tokens)),
+        "sentiment": lambda texts: _to_builtin(analyze_sentiments_with_status(texts)),
+        "joint": lambda texts: _to_builtin(run_joint(texts)),
+    }
+
+class _Handler(BaseHTTPRequestHandler):
+    """POST /ner, /sentiment, /joint {'texts': [...]} -> {'results': [...]}; GET /health"""
+
+    server_version = "MOLInference/1.0"
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": f"Bilinmeyen yol: {self.path}"})
+            return
+        from models import get_registry
+        batchers = self.server.batchers
+        self._send(200, {
+            "status": "ok",
+            "pid": os.getpid(),
+            "models": get_registry().report()["models"],
+            "batching": {task: batcher.stats for task, batcher in batchers.items()},
+        })
+
+    def do_POST(self):
+        task = self.path.strip("/")
+        batcher = self.server.batchers.get(task)
+        if batcher is None:
+            self._send(404, {"error": f"Bilinmeyen görev: {task}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            texts = json.loads(self.rfile.read(length).decode("utf-8"))["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("'texts' bir metin listesi olmalı")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"Geçersiz istek: {e}"})
+            return
+        try:
+            results = batcher.submit(texts).result()
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, {"results": results})
+
+    def address_string(self) -> str:
+        # Unix soketinde istemci adresi yoktur
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+# Eş zamanlı istemciler bağlantı kuyruğunu (varsayılan 5) hızla doldurur
+_LISTEN_BACKLOG = 128
+
+class _IdleEvictionMixin:
+    """serve_forever döngüsünde models.idle_timeout süresince kullanılmayan modelleri bellekten çıkarır"""
+    _next_idle_check = 0.0
+
+    def service_actions(self):
+        super().service_actions()
+        now = time.monotonic()
+        if now < self._next_idle_check:
+            return
+        self._next_idle_check = now + IDLE_CHECK_SECONDS
+        if get_models_config().get("idle_timeout") is None:
+            return
+        from models import get_registry
+        evicted = get_registry().evict_idle()
+        if evicted and self.verbose:
+            print(f"Boşta kalan modeller bellekten çıkarıldı: {', '.join(evicted)}")
+
+class _TCPHTTPServer(_IdleEvictionMixin, ThreadingHTTPServer):
+    request_queue_size = _LISTEN_BACKLOG
+
+class _UnixHTTPServer(_IdleEvictionMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = _LISTEN_BACKLOG
+
+def create_server(host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+                  max_batch_size: int = 64, max_latency_ms: float = 10.0, preload: bool = True,
+                  verbose: bool = False):
+    """
+    Sunucuyu kurar (serve_forever ile çalıştırılır).
+
+    Args:
+        host, port: HTTP adresi (socket_path verilirse kullanılmaz)
+        socket_path: Unix soketi yolu
+        max_batch_size: Mikro-batch'teki en fazla metin sayısı
+        max_latency_ms: Bir isteğin diğerlerini en fazla bekleme süresi
+        preload: Modeller ilk istekten önce yüklensin mi
+        verbose: İstekler loglansın mı
+
+    Returns:
+        HTTP sunucusu (batchers özniteliğinde görev -> MicroBatcher)
+    """
+    global _serving
+    _serving = True
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = _TCPHTTPServer((host, port), _Handler)
+    server.verbose = verbose
+    server.batchers = {
+        task: MicroBatcher(run, max_batch_size, max_latency_ms)
+        for task, run in _task_runners().items()
+    }
+    if preload:
+        from models import get_registry
+        from sentiment import get_sentiment_analyzer
+        get_registry().get_pipeline("ner")
+        get_sentiment_analyzer()
+    return server
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class InferenceClient:
+    """
+    Çıkarım sunucusunun istemcisi.
+
+    Bağlantı kurulamazsa ConnectionError, sunucu hata döndürürse RuntimeError verir.
+
+    Args:
+        host, port: HTTP adresi
+        socket_path: Unix soketi yolu (verilirse host/port kullanılmaz)
+        timeout: İstek zaman aşımı (saniye)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+                 timeout: float = 300.0):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        if self.socket_path:
+            connection = _UnixHTTPConnection(self.socket_path, self.timeout)
+        else:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+            headers = {"Content-Type": "application/json; charset=utf-8"} if body is not None else {}
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = json.loads(response.read().decode("utf-8"))
+            except (OSError, http.client.HTTPException) as e:
+                raise ConnectionError(f"Çıkarım sunucusuna ulaşılamadı: {e}") from e
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise RuntimeError(data.get("error", f"HTTP {response.status}"))
+        return data
+
+    def health(self) -> Dict:
+        """Sunucu durumu, yüklü modeller ve mikro-batch istatistikleri"""
+        return self._request("GET", "/health")
+
+    def infer(self, task: str, texts: List[str]) -> List:
+        """
+        Metinleri sunucuda işler.
+
+        Args:
+            task: "ner", "sentiment" veya "joint"
+            texts: Metin listesi
+
+        Returns:
+            List: ner için entity listeleri, sentiment için analyze_sentiments_with_status
+                formatı, joint için {'ents', 'sentiment'}
+        """
+        if not texts:
+            return []
+        return self._request("POST", f"/{task}", {"texts": list(texts)})["results"]
+
+_client = None
+_unreachable_until = 0.0
+
+def get_inference_client() -> Optional[InferenceClient]:
+    """Config'de server.use_server açıksa paylaşılan istemciyi döndürür; değilse None"""
+    global _client
+    settings = _server_settings()
+    if _serving or not settings.get("use_server", False):
+        return None
+    if _client is None:
+        _client = InferenceClient(
+            settings.get("host", "127.0.0.1"),
+            settings.get("port", 8765),
+            settings.get("socket_path"),
+            settings.get("timeout", 300.0)
+        )
+    return _client
+
+def remote_inference(task: str, texts: List[str]) -> Optional[List]:
+    """
+    Sunucu kullanılıyorsa ve erişilebilirse sonuçları sunucudan alır.
+
+    Returns:
+        Optional[List]: Sonuçlar; sunucu kapalı/erişilemezse None (çağıran yerelde hesaplar)
+    """
+    global _unreachable_until
+    client = get_inference_client()
+    if client is None or time.monotonic() < _unreachable_until:
+        return None
+    try:
+        return client.infer(task, texts)
+    except ConnectionError as e:
+        _unreachable_until = time.monotonic() + RETRY_SECONDS
+        print(f"Uyarı: {e}; modeller yerelde yüklenecek.")
+        return None
+
+def main(argv=None) -> int:
+    settings = _server_settings()
+    arg_parser = argparse.ArgumentParser(description="NER ve duygu modelleri için yerel çıkarım sunucusu")
+    arg_parser.add_argument("--host", default=settings.get("host", "127.0.0.1"))
+    arg_parser.add_argument("--port", type=int, default=settings.get("port", 8765))
+    arg_parser.add_argument("--socket", default=settings.get("socket_path"), help="Unix soketi yolu")
+    arg_parser.add_argument("--max-batch-size", type=int, default=settings.get("max_batch_size", 64))
+    arg_parser.add_argument("--max-latency-ms", type=float, default=settings.get("max_latency_ms", 10))
+    arg_parser.add_argument("--verbose", action="store_true")
+    args = arg_parser.parse_args(argv)
+
+    print("Modeller yükleniyor...")
+    server = create_server(args.host, args.port, args.socket, args.max_batch_size, args.max_latency_ms,
+                           verbose=args.verbose)
+    print(f"Çıkarım sunucusu hazır: {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for batcher in server.batchers.values():
+            batcher.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Birleşik NER + Duygu Analizi Modülü
+Aynı kelime dağarcığını kullanan NER ve duygu modellerini her mesaj için tek
+tokenizasyonla çalıştırır; istenirse tek encoder geçişini iki görev başlığı paylaşır.
+"""
+from typing import Dict, List, Optional, Tuple
+from models import get_registry, plan_batches
+from cache import cached_inference
+from sentiment import analyze_sentiments_with_status, STATUS_SCORED
+from NER import apply_ner_batch
+from inference_server import get_inference_client, remote_inference
+
+def joint_available() -> bool:
+    """NER ve duygu modelleri aynı tokenizer'ı paylaşıyor mu (model kaydı tokenizer özetine göre paylaştırır)"""
+    client = get_inference_client()
+    if client is not None:
+        try:
+            client.health()
+            # Sunucu birleşik görevi kendi modelleriyle yapar (paylaşılamıyorsa ayrı yollarla)
+            return True
+        except ConnectionError:
+            pass
+    registry = get_registry()
+    try:
+        return registry.get_tokenizer("ner") is registry.get_tokenizer("sentiment")
+    except Exception:
+        # Modellerden biri yüklenemezse ayrı yollar (ve duygu için yedek model) kullanılır
+        return False
+
+def _joint_settings() -> Dict:
+    from config import get_config
+    return get_config().get("joint", {})
+
+def analyze_joint(texts: List[str], batch_size: int = 32, max_tokens: int = 4096,
+                  shared_encoder: Optional[bool] = None, encoded=None) -> List[Dict]:
+    """
+    Her mesaj için NER ve duygu analizini tek geçişte yapar.
+
+    Metinler bir kez tokenize edilir ve uzunluğa göre batch'lenir; aynı tensörler
+    iki modele verilir. Modele sığmayan metinler ayrı yollardan geçer; sonuçlar
+    apply_ner_batch ve analyze_sentiments_with_status ile aynıdır ve iki modelin
+    önbelleğine de yazılır.
+
+    shared_encoder açıksa (config: joint.shared_encoder) encoder yalnızca bir kez
+    çalışır ve iki görev başlığı aynı gizli durumları kullanır (joint.encoder
+    hangi modelin encoder'ının kullanılacağını seçer). Bu, iki başlık aynı
+    encoder üzerinde eğitildiyse (çok görevli model) birebir sonuç verir;
+    ayrı ince ayarlanmış modellerde sonuçlar yaklaşıktır, bu yüzden önbelleğe yazılmaz.
+
+    Çıkarım sunucusu kullanılıyorsa (config: server.use_server) istek sunucuya
+    gider; batch ve ortak encoder ayarları sunucunun yapılandırmasından gelir.
+
+    Args:
+        texts: Metin listesi
+        batch_size: Bir batch'teki en fazla mesaj sayısı
+        max_tokens: Bir batch'in doldurulmuş toplam token bütçesi
+        shared_encoder: None ise config'den okunur
+        encoded: texts için encode_texts çıktısı (önceden tokenize edildiyse)
+
+    Returns:
+        List[Dict]: Her metin için {'text', 'ents', 'sentiment'}
+    """
+    remote = remote_inference("joint", texts)
+    if remote is not None:
+        return [{"text": text, **record} for text, record in zip(texts, remote)]
+
+    settings = _joint_settings()
+    if shared_encoder is None:
+        shared_encoder = settings.get("shared_encoder", False)
+    encoder_key = settings.get("encoder", "ner")
+
+    if shared_encoder:
+        ents, sentiments = _run_joint(texts, batch_size, max_tokens, encoder_key, encoded)
+    else:
+        # Önce NER önbelleği; eksikler birleşik geçişten geçer ve duygu sonuçları da saklanır
+        statuses = {}
+
+        def compute_ner(misses: List[str]) -> List[List[Dict]]:
+            # Önceden tokenize edildiyse eksik metinlerin satırları yeniden kullanılır
+            miss_encoded = _select_rows(encoded, texts, misses) if encoded is not None else None
+            miss_ents, miss_sentiments = _run_joint(misses, batch_size, max_tokens, None, miss_encoded)
+            statuses.update(zip(misses, miss_sentiments))
+            return miss_ents
+
+        def compute_sentiment(misses: List[str]) -> List[Optional[Dict]]:
+            # NER'i önbellekten gelen metinlerin duygu sonucu ayrı yoldan hesaplanır
+            rest = [t for t in misses if t not in statuses]
+            if rest:
+                statuses.update(zip(rest, analyze_sentiments_with_status(rest, batch_size, max_tokens)))
+            return [_cacheable(statuses[t]) for t in misses]
+
+        ents = cached_inference("ner", texts, compute_ner)
+        cached = cached_inference("sentiment", texts, compute_sentiment)
+        sentiments = [statuses.get(t) or dict(r, status=STATUS_SCORED) for t, r in zip(texts, cached)]
+
+    return [
+        {"text": text, "ents": text_ents, "sentiment": sentiment}
+        for text, text_ents, sentiment in zip(texts, ents, sentiments)
+    ]
+
+def _select_rows(encoded, texts: List[str], subset: List[str]) -> Dict:
+    """encode_texts çıktısından subset metinlerinin satırları"""
+    rows = {}
+    for i, text in enumerate(texts):
+        rows.setdefault(text, i)
+    return {key: [values[rows[text]] for text in subset] for key, values in encoded.items()}
+
+def _cacheable(result: Dict) -> Optional[Dict]:
+    """Durum alanı olmadan önbelleğe yazılacak sonuç (skorlanamadıysa None)"""
+    if result["label"] is None:
+        return None
+    return {"label": result["label"], "score": result["score"]}
+
+def _shared_heads(ner_model, sentiment_model, encoder_key: str):
+    """Ortak encoder ve iki görev başlığı (BERT tipi sınıflandırıcılar için)"""
+    import torch
+
+    for model in (ner_model, sentiment_model):
+        if not isinstance(getattr(model, "classifier", None), torch.nn.Linear):
+            raise ValueError("Ortak encoder yalnızca doğrusal sınıflandırıcı başlıklı (BERT tipi) modellerle desteklenir")
+    encoder = (ner_model if encoder_key == "ner" else sentiment_model).base_model
+    pooler = getattr(sentiment_model.base_model, "pooler", None)
+
+    def run(inputs):
+        hidden = encoder(**inputs, return_dict=True).last_hidden_state
+        ner_logits = ner_model.classifier(ner_model.dropout(hidden))
+        pooled = pooler(hidden) if pooler is not None else hidden[:, 0]
+        sentiment_logits = sentiment_model.classifier(sentiment_model.dropout(pooled))
+        return ner_logits, sentiment_logits
+    return run
+
+def encode_texts(texts: List[str]):
+    """
+    Birleşik analiz için metinleri paylaşılan tokenizer ile bir kez tokenize eder.
+
+    Akış hattı (pipeline.py) bir sonraki batch'i model hesaplarken önceden
+    tokenize etmek için kullanır; sonuç analyze_joint'e encoded olarak verilir.
+    """
+    tokenizer = get_registry().get_tokenizer("ner")
+    # Kesme yapılmaz: modele sığmayan metinler _run_joint'te ayrı yollara gönderilir
+    return tokenizer(texts, truncation=False, verbose=False,
+                     return_special_tokens_mask=True, return_offsets_mapping=tokenizer.is_fast)
+
+def _max_length(tokenizer) -> int:
+    """Modelin kabul ettiği en uzun token dizisi (tanımsızsa 512)"""
+    return tokenizer.model_max_length if tokenizer.model_max_length < 100000 else 512
+
+def _run_joint(texts: List[str], batch_size: int, max_tokens: int, encoder_key: Optional[str],
+               encoded=None) -> Tuple[List[List[Dict]], List[Optional[Dict]]]:
+    """
+    Önbelleksiz birleşik çekirdek.
+
+    encoder_key None ise iki model aynı tensörlerle ayrı ayrı, verilirse o
+    modelin encoder'ı bir kez çalıştırılır. Hata veren batch'ler ve modele
+    sığmayan (kesilmesi gereken) metinler ayrı yollara (apply_ner_batch ve
+    ikiye bölen duygu analizi) devredilir; böylece sonuçlar ayrı yollarla
+    aynı kalır. Duygu sonuçları
+    analyze_sentiments_with_status formatındadır. encoded verilmezse
+    encode_texts ile tokenize edilir.
+    """
+    import torch
+
+    registry = get_registry()
+    ner_pipe = registry.get_pipeline("ner")
+    sentiment_pipe = registry.get_pipeline("sentiment")
+    tokenizer = ner_pipe.tokenizer
+    if sentiment_pipe.tokenizer is not tokenizer:
+        raise ValueError("NER ve duygu modelleri aynı tokenizer'ı kullanmıyor; birleşik analiz yapılamaz")
+
+    ents = [[] for _ in texts]
+    sentiments = [None] * len(texts)
+    if not texts:
+        return ents, sentiments
+
+    # Tek tokenizasyon: uzunluklar, offset'ler ve özel token maskesi bir kez çıkarılır
+    if encoded is None:
+        encoded = encode_texts(texts)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    model_keys = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in encoded]
+    pad_values = {"input_ids": tokenizer.pad_token_id or 0, "attention_mask": 0, "token_type_ids": 0}
+    ner_params = getattr(ner_pipe, "_postprocess_params", {})
+    sentiment_params = getattr(sentiment_pipe, "_postprocess_params", {})
+    shared = _shared_heads(ner_pipe.model, sentiment_pipe.model, encoder_key) if encoder_key else None
+
+    max_len = _max_length(tokenizer)
+    failed = [i for i, n in enumerate(lengths) if n > max_len]
+    fits = [i for i, n in enumerate(lengths) if n <= max_len]
+    for planned in plan_batches([lengths[i] for i in fits], batch_size, max_tokens):
+        batch = [fits[j] for j in planned]
+        width = max(lengths[i] for i in batch)
+        inputs = {
+            key: torch.tensor([encoded[key][i] + [pad_values[key]] * (width - lengths[i]) for i in batch])
+            for key in model_keys
+        }
+        try:
+            with torch.no_grad():
+                if shared is not None:
+                    ner_logits, sentiment_logits = shared(inputs)
+                else:
+                    ner_logits = ner_pipe.model(**inputs).logits
+                    sentiment_logits = sentiment_pipe.model(**inputs).logits
+        except Exception:
+            failed.extend(batch)
+            continue
+
+        for row, i in enumerate(batch):
+            n = lengths[i]
+            outputs = {
+                "logits": ner_logits[row:row + 1, :n],
+                "input_ids": inputs["input_ids"][row:row + 1, :n],
+                "special_tokens_mask": torch.tensor([encoded["special_tokens_mask"][i]]),
+                "offset_mapping": torch.tensor([encoded["offset_mapping"][i]]) if "offset_mapping" in encoded else None,
+                "sentence": texts[i],
+                "is_last": True,
+            }
+            ents[i] = ner_pipe.postprocess([outputs], **ner_params)
+            result = sentiment_pipe.postprocess({"logits": sentiment_logits[row:row + 1]}, **sentiment_params)
+            sentiments[i] = {"label": result["label"], "score": float(result["score"]), "status": STATUS_SCORED}
+
+    if failed:
+        failed_texts = [texts[i] for i in failed]
+        for i, text_ents in zip(failed, apply_ner_batch(failed_texts, batch_size, max_tokens)):
+            ents[i] = text_ents
+        for i, result in zip(failed, analyze_sentiments_with_status(failed_texts, batch_size, max_tokens)):
+            sentiments[i] = result
+    return ents, sentiments
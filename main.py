@@ -5,15 +5,15 @@ Mesaj analizi, NER, duygu analizi ve istatistikler için kapsamlı bir araç.
 import os
 import sys
 from parser import read_data, sanitize_messages
-from NER import apply_ner, filter_messages
-from sentiment import analyze_sentiment, analyze_sentiments, get_sentiment_statistics
-from analysis_statistics import get_message_statistics, get_entity_statistics, get_most_common_words, compare_authors
-from export import export_to_json, export_to_csv, export_to_excel, export_statistics_to_json
-from visualization import plot_entity_distribution, plot_sentiment_distribution, plot_message_length_distribution
 from config import load_config
+from checkpoint import open_run_journal, checkpointed
+
+# Model, istatistik ve çizim modülleri yalnızca seçilen analiz için fonksiyon içinde
+# yüklenir; yalnızca istatistik seçildiğinde transformers/torch hiç yüklenmez
 
 def   main():
     """Ana program fonksiyonu"""
+    journal = None
     try:
         # Yapılandırmayı yükle
         config = load_config()
@@ -30,7 +30,7 @@ def   main():
             return
         
         print("Veri okunuyor...")
-        messages, author = read_data(loc=dir)
+        messages, author = read_data(loc=dir, workers=config.get("parser", {}).get("workers", 1))
         
         if not messages or not any(messages.values()):
             print("Hata: Mesaj bulunamadı!")
@@ -49,161 +49,284 @@ def   main():
         
         choice = input("\nSeçiminiz (1-5): ").strip()
         
-        if choice == "1" or choice == "4":
+        # Model aşamalarında (1, 2, 4) aynı girdi ve ayarlarla yarıda kalmış çalışma varsa
+        # tamamlanan batch'ler atlanır; diğer seçeneklerde girdi özeti bile hesaplanmaz
+        if choice in ("1", "2", "4"):
+            journal = open_run_journal(dir, config)
+            progress = journal.progress() if journal is not None else {}
+            if progress:
+                done = ", ".join(f"{stage}: {count}" for stage, count in progress.items())
+                print(f"Önceki çalışmaya devam ediliyor (kayıtlı mesajlar - {done})")
+        
+        # Grafikler özetlerden en sonda birlikte (paralel) çizilir
+        charts = []
+        
+        # Tüm analizlerde modeller aynı tokenizer'ı paylaşıyorsa NER ve duygu tek geçişte yapılır
+        if choice == "4" and config.get("joint", {}).get("enabled", True):
+            from joint import joint_available
+            joint = joint_available()
+        else:
+            joint = False
+        if joint:
+            print("\nNER ve duygu analizi (birleşik geçiş) yapılıyor...")
+            analyze_joint_module(sanitized_messages, config, journal, charts)
+        
+        if choice == "1" or (choice == "4" and not joint):
             print("\nNER analizi yapılıyor...")
-            analyze_ner(sanitized_messages, config)
+            analyze_ner(sanitized_messages, config, journal=journal, charts=charts)
         
-        if choice == "2" or choice == "4":
+        if choice == "2" or (choice == "4" and not joint):
             print("\nDuygu analizi yapılıyor...")
-            analyze_sentiments_module(sanitized_messages)
+            analyze_sentiments_module(sanitized_messages, journal, charts)
         
         if choice == "3" or choice == "4":
             print("\nİstatistikler hesaplanıyor...")
-            show_statistics(sanitized_messages)
+            show_statistics(sanitized_messages, config, charts)
+        
+        if charts:
+            from visualization import render_report, visualization_settings
+            print("\nGrafikler çiziliyor...")
+            render_report(charts, visualization_settings(config))
         
         if choice == "5":
             # Eski versiyon
-            filter_message = []
-            for text in sanitized_messages.get("i", []):
-                ents = apply_ner(text)
-                filter_message.append({"text": text, "ents": ents})
+            from NER import apply_ner_batch, filter_messages, EntityIndex
+            ner_config = config.get("ner", {})
+            texts = sanitized_messages.get("i", [])
+            all_ents = apply_ner_batch(
+                texts,
+                batch_size=ner_config.get("batch_size", 32),
+                max_tokens=ner_config.get("max_tokens", 4096)
+            )
+            filter_message = [{"text": text, "ents": ents} for text, ents in zip(texts, all_ents)]
             
-            ankara = filter_messages(filter_message, label="LOC", query="ankara", min_score=0.7)
+            ankara = filter_messages(EntityIndex(filter_message), label="LOC", query="ankara", min_score=0.7)
             print(f"\nAnkara ile ilgili mesajlar: {len(ankara)}")
             for msg in ankara[:5]:  # İlk 5 mesajı göster
                 print(f"- {msg['text'][:100]}...")
+        
+        if journal is not None:
+            journal.mark_complete()
+        
+        show_model_report()
     
     except KeyboardInterrupt:
         print("\n\nProgram kullanıcı tarafından durduruldu.")
+        if journal is not None:
+            print("Tamamlanan batch'ler kaydedildi; aynı dosyayla yeniden çalıştırınca kaldığı yerden devam eder.")
     except Exception as e:
         print(f"\nHata oluştu: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if journal is not None:
+            journal.close()
 
-def analyze_ner(messages_dict, config):
-    """NER analizi yapar"""
+def show_model_report():
+    """Yüklenen modellerin yükleme süresi ve bellek kullanımını gösterir"""
+    if "models" not in sys.modules:
+        # Model kullanılmadıysa rapor için models yüklenmez
+        return
+    from models import get_registry
+    report = get_registry().report()
+    if not report["models"]:
+        return
+    print("\n=== Model Raporu ===")
+    for key, info in report["models"].items():
+        print(f"  {key} ({info['model_name']}): {info['load_seconds']:.1f} sn yükleme, "
+              f"{info['model_mb']:.0f} MB ağırlık, +{info['rss_delta_mb']:.0f} MB RSS")
+    print(f"  Toplam RSS: {report['rss_mb']:.0f} MB")
+
+def analyze_ner(messages_dict, config, batched=True, journal=None, charts=None):
+    """NER analizi yapar (journal verilirse ilerleme batch batch kaydedilir)"""
+    from NER import apply_ner, apply_ner_batch
     ner_config = config.get("ner", {})
     min_score = ner_config.get("min_score", 0.6)
+    batch_size = ner_config.get("batch_size", 32)
+    max_tokens = ner_config.get("max_tokens", 4096)
     
     all_messages_with_entities = []
     
     for author_key, msgs in messages_dict.items():
         print(f"  {author_key} için NER uygulanıyor...")
-        author_messages = []
-        for text in msgs:
-            try:
-                ents = apply_ner(text)
-                author_messages.append({"text": text, "ents": ents, "author": author_key})
-            except Exception as e:
-                print(f"    Uyarı: Mesaj işlenirken hata: {e}")
         
-        all_messages_with_entities.extend(author_messages)
+        def compute(texts):
+            if batched:
+                try:
+                    return apply_ner_batch(texts, batch_size=batch_size, max_tokens=max_tokens)
+                except Exception as e:
+                    print(f"    Uyarı: Toplu NER hatası, tek tek işleniyor: {e}")
+            ents_list = []
+            for text in texts:
+                try:
+                    ents_list.append(apply_ner(text))
+                except Exception as e:
+                    # İşlenemeyen mesaj None olarak kaydedilir ve sonuçlara alınmaz
+                    print(f"    Uyarı: Mesaj işlenirken hata: {e}")
+                    ents_list.append(None)
+            return ents_list
         
-        # Entity istatistikleri
-        entity_stats = get_entity_statistics(author_messages)
-        print(f"  {author_key} için bulunan entity'ler:")
-        for label, count in entity_stats.get("entity_counts", {}).items():
-            print(f"    {label}: {count}")
+        all_ents = checkpointed(journal, "ner", author_key, msgs, compute)
+        author_messages = [
+            {"text": text, "ents": ents, "author": author_key}
+            for text, ents in zip(msgs, all_ents) if ents is not None
+        ]
+        
+        all_messages_with_entities.extend(author_messages)
+        report_entities(author_key, author_messages)
     
-    # Görselleştirme
+    finish_entities(all_messages_with_entities, min_score, charts)
+    return all_messages_with_entities
+
+def report_entities(author_key, author_messages):
+    """Bir yazarın entity istatistiklerini yazdırır"""
+    from analysis_statistics import get_entity_statistics
+    entity_stats = get_entity_statistics(author_messages)
+    print(f"  {author_key} için bulunan entity'ler:")
+    for label, count in entity_stats.get("entity_counts", {}).items():
+        print(f"    {label}: {count}")
+
+def add_chart(charts, kind, data, save_path):
+    """Grafiği rapora ekler; rapor listesi yoksa hemen çizer"""
+    from visualization import render_report
+    if charts is not None:
+        charts.append((kind, data, save_path))
+    else:
+        render_report([(kind, data, save_path)], workers=1)
+
+def finish_entities(all_messages_with_entities, min_score, charts=None):
+    """Entity grafiğini rapora ekler ve örnek filtrelemeyi gösterir"""
+    from NER import filter_messages, EntityIndex
+    from visualization import entity_label_counts
+    # Görselleştirme (yalnızca etiket sayımları saklanır)
     if all_messages_with_entities:
-        try:
-            plot_entity_distribution(all_messages_with_entities, "entity_distribution.png")
-        except Exception as e:
-            print(f"  Görselleştirme hatası: {e}")
+        add_chart(charts, "entity_distribution", entity_label_counts(all_messages_with_entities),
+                  "entity_distribution.png")
     
-    # Filtreleme örneği
+    # Filtreleme örneği (indeks bir kez kurulur, sonraki sorgular taramasız yanıtlanır)
     print("\n  Örnek filtreleme (LOC, min_score=0.7):")
-    filtered = filter_messages(all_messages_with_entities, label="LOC", min_score=min_score)
+    entity_index = EntityIndex(all_messages_with_entities)
+    filtered = filter_messages(entity_index, label="LOC", min_score=min_score)
     print(f"  Bulunan mesaj sayısı: {len(filtered)}")
-    
-    return all_messages_with_entities
 
-def analyze_sentiments_module(messages_dict):
-    """Duygu analizi yapar"""
+def analyze_sentiments_module(messages_dict, journal=None, charts=None):
+    """Duygu analizi yapar (journal verilirse ilerleme batch batch kaydedilir)"""
+    from sentiment import analyze_sentiments_with_status
     all_messages_with_sentiment = []
     
     for author_key, msgs in messages_dict.items():
         print(f"  {author_key} için duygu analizi yapılıyor...")
-        author_messages = []
-        
-        # Batch processing için
-        batch_size = 10
-        for i in range(0, len(msgs), batch_size):
-            batch = msgs[i:i+batch_size]
-            try:
-                sentiments = analyze_sentiments(batch)
-                for text, sentiment in zip(batch, sentiments):
-                    author_messages.append({
-                        "text": text,
-                        "sentiment": sentiment,
-                        "author": author_key
-                    })
-            except Exception as e:
-                print(f"    Uyarı: Duygu analizi hatası: {e}")
-                # Fallback: tek tek analiz
-                for text in batch:
-                    try:
-                        sentiment = analyze_sentiment(text)
-                        author_messages.append({
-                            "text": text,
-                            "sentiment": sentiment,
-                            "author": author_key
-                        })
-                    except:
-                        pass
-        
+        # Batch boyutu config'den (varsayılan: bu makine için ölçülür); hatalı mesajlar ayrılır, düşürülmez
+        sentiments = checkpointed(journal, "sentiment", author_key, msgs, analyze_sentiments_with_status)
+        author_messages = [
+            {"text": text, "sentiment": sentiment, "author": author_key}
+            for text, sentiment in zip(msgs, sentiments)
+        ]
         all_messages_with_sentiment.extend(author_messages)
-        
-        # İstatistikler
-        stats = get_sentiment_statistics(author_messages)
-        print(f"  {author_key} duygu istatistikleri:")
-        print(f"    Pozitif: {stats.get('positive_count', 0)} ({stats.get('positive_percentage', 0):.1f}%)")
-        print(f"    Negatif: {stats.get('negative_count', 0)} ({stats.get('negative_percentage', 0):.1f}%)")
+        report_sentiments(author_key, author_messages)
     
-    # Görselleştirme
+    finish_sentiments(all_messages_with_sentiment, charts)
+    return all_messages_with_sentiment
+
+def report_sentiments(author_key, author_messages):
+    """Bir yazarın duygu istatistiklerini ve yeniden denenen/skorlanamayan mesajları yazdırır"""
+    from sentiment import get_sentiment_statistics, STATUS_RETRIED, STATUS_FAILED
+    sentiments = [m["sentiment"] for m in author_messages]
+    retried = sum(1 for s in sentiments if s.get("status") == STATUS_RETRIED)
+    failed = [s for s in sentiments if s.get("status") == STATUS_FAILED]
+    if retried or failed:
+        print(f"    Uyarı: {retried} mesaj yeniden denenerek skorlandı, {len(failed)} mesaj skorlanamadı")
+        for s in failed[:3]:
+            print(f"      {s['error']}")
+    
+    # İstatistikler
+    stats = get_sentiment_statistics(author_messages)
+    print(f"  {author_key} duygu istatistikleri:")
+    print(f"    Pozitif: {stats.get('positive_count', 0)} ({stats.get('positive_percentage', 0):.1f}%)")
+    print(f"    Negatif: {stats.get('negative_count', 0)} ({stats.get('negative_percentage', 0):.1f}%)")
+
+def finish_sentiments(all_messages_with_sentiment, charts=None):
+    """Duygu dağılımı grafiğini rapora ekler"""
+    from visualization import sentiment_label_counts
     if all_messages_with_sentiment:
-        try:
-            plot_sentiment_distribution(all_messages_with_sentiment, "sentiment_distribution.png")
-        except Exception as e:
-            print(f"  Görselleştirme hatası: {e}")
+        add_chart(charts, "sentiment_distribution", sentiment_label_counts(all_messages_with_sentiment),
+                  "sentiment_distribution.png")
+
+def analyze_joint_module(messages_dict, config, journal=None, charts=None):
+    """NER ve duygu analizini her mesaj için tek tokenizasyonla yapar; sonuçlar tek kayıtta döner"""
+    from joint import analyze_joint
+    ner_config = config.get("ner", {})
+    all_records = []
     
-    return all_messages_with_sentiment
+    for author_key, msgs in messages_dict.items():
+        print(f"  {author_key} için NER ve duygu analizi yapılıyor...")
+        records = checkpointed(journal, "joint", author_key, msgs, lambda texts: analyze_joint(
+            texts,
+            batch_size=ner_config.get("batch_size", 32),
+            max_tokens=ner_config.get("max_tokens", 4096)
+        ))
+        for record in records:
+            record["author"] = author_key
+        all_records.extend(records)
+        report_entities(author_key, records)
+        report_sentiments(author_key, records)
+    
+    finish_entities(all_records, ner_config.get("min_score", 0.6), charts)
+    finish_sentiments(all_records, charts)
+    return all_records
 
-def show_statistics(messages_dict):
+def show_statistics(messages_dict, config=None, charts=None):
     """İstatistikleri gösterir"""
+    from analysis_statistics import (get_message_statistics, get_most_common_words, compute_message_kernel,
+                                     MessageStatisticsAccumulator)
+    from message_table import MessageTable
+    from visualization import word_count_histogram
     print("\n=== Genel İstatistikler ===")
     
-    for author_key, msgs in messages_dict.items():
+    stats_config = (config or {}).get("statistics", {})
+    word_options = {"mode": stats_config.get("word_frequency_mode", "exact")}
+    if word_options["mode"] != "exact":
+        word_options.update(
+            epsilon=stats_config.get("sketch_epsilon", 1e-4),
+            delta=stats_config.get("sketch_delta", 0.01),
+            capacity=stats_config.get("sketch_capacity")
+        )
+    
+    # Mesajlar bir kez sütunlu tabloya çevrilir, yazar başına alt tablolar kullanılır
+    table = messages_dict if isinstance(messages_dict, MessageTable) else MessageTable.from_messages_dict(messages_dict)
+    by_author = table.by_author()
+    # Her yazar için birleşik istatistik çekirdeği bir kez çalışır; karşılaştırma ve uzunluk grafiği aynı sonucu kullanır
+    kernels = {author_key: compute_message_kernel(msgs) for author_key, msgs in by_author.items()}
+    comparison = {author_key: get_message_statistics(msgs, kernel=kernels[author_key])
+                  for author_key, msgs in by_author.items()}
+    
+    for author_key, msgs in by_author.items():
         print(f"\n{author_key}:")
-        stats = get_message_statistics(msgs)
+        stats = comparison[author_key]
         print(f"  Toplam mesaj: {stats.get('total_messages', 0)}")
         print(f"  Toplam kelime: {stats.get('total_words', 0)}")
         print(f"  Ortalama kelime/mesaj: {stats.get('avg_words_per_message', 0):.1f}")
         print(f"  Toplam emoji: {stats.get('total_emojis', 0)}")
         
         # En sık kullanılan kelimeler
-        common_words = get_most_common_words(msgs, top_n=5)
+        common_words = get_most_common_words(msgs, top_n=5, **word_options)
         if common_words:
             print(f"  En sık kullanılan kelimeler:")
-            for word, count in common_words:
-                print(f"    {word}: {count}")
+            for word, count, *error in common_words:
+                print(f"    {word}: {count}" + (f" (en az {count - error[0]})" if error and error[0] else ""))
     
     # Karşılaştırma
-    comparison = compare_authors(messages_dict)
     print("\n=== Yazarlar Arası Karşılaştırma ===")
     for author, stats in comparison.items():
         print(f"{author}: {stats.get('total_messages', 0)} mesaj, "
               f"ortalama {stats.get('avg_words_per_message', 0):.1f} kelime/mesaj")
     
-    # Görselleştirme
-    try:
-        plot_message_length_distribution(
-            messages_dict.get("i", []) + messages_dict.get("ç", []),
-            "message_length_distribution.png"
-        )
-    except Exception as e:
-        print(f"  Görselleştirme hatası: {e}")
+    # Görselleştirme: mesajlar yeniden taranmaz, çekirdeklerin histogramları birleştirilir
+    lengths = MessageStatisticsAccumulator()
+    for key in ("i", "ç"):
+        if key in kernels:
+            lengths.merge(MessageStatisticsAccumulator.from_dict({"kernel": kernels[key]}))
+    add_chart(charts, "message_length_distribution", word_count_histogram(lengths), "message_length_distribution.png")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,442 @@
+"""
+Sütunlu Mesaj Tablosu Modülü
+Mesajları tek bir UTF-8 bayt tamponu ve NumPy sütunları halinde saklar.
+Mesaj başına bellek maliyeti, dict/list tabanlı yapılara göre çok daha düşüktür;
+tampon bayt olduğu için tek bir emoji tüm metni karakter başına 4 bayta çıkarmaz.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+# Tampon birleştirme sıklığı: ara listeler bu kadar mesajdan büyümez
+_JOIN_EVERY = 65536
+
+# Eşleşmemiş vekil (surrogate) karakterler de tampona gidip aynen geri gelsin
+_ERRORS = "surrogatepass"
+
+def encode_text(text: str) -> bytes:
+    """Metni tampon kodlamasına (UTF-8) çevirir"""
+    return text.encode("utf-8", _ERRORS)
+
+def decode_text(data: bytes) -> str:
+    """Tampon diliminden metni geri üretir"""
+    return data.decode("utf-8", _ERRORS)
+
+class _TextBuffer:
+    """Metinleri tek bir UTF-8 bayt tamponunda biriktirip bayt offset dizisi üretir"""
+
+    def __init__(self):
+        self._chunks = []
+        self._pending = []
+        self._lengths = []
+
+    def append(self, text: str):
+        data = encode_text(text)
+        self._pending.append(data)
+        self._lengths.append(len(data))
+        if len(self._pending) >= _JOIN_EVERY:
+            self._chunks.append(b"".join(self._pending))
+            self._pending = []
+
+    def finish(self):
+        self._chunks.append(b"".join(self._pending))
+        offsets = np.zeros(len(self._lengths) + 1, dtype=np.int64)
+        np.cumsum(np.asarray(self._lengths, dtype=np.int64), out=offsets[1:])
+        return b"".join(self._chunks), offsets
+
+class MessageTable:
+    """
+    Sütunlu mesaj tablosu.
+
+    Sütunlar:
+        text: tek UTF-8 tampon + bayt offsets (mesaj i = buffer[offsets[i]:offsets[i+1]].decode())
+        author_codes: int32 yazar kodu, authors listesine indeks
+        timestamps: datetime64[m] zaman damgası (bilinmiyorsa NaT)
+        ids: int64 kararlı mesaj kimliği
+        sentiment_codes / sentiment_scores: isteğe bağlı duygu sütunları (-1 / nan = yok)
+        sentiment_status_codes: duygu durumu ("scored", "retried", "failed"; -1 = yok),
+            sentiment_errors: satır -> hata metni (yalnızca hata alanı olan seyrek satırlar)
+        ent_*: isteğe bağlı, düzleştirilmiş entity sütunları (ent_offsets ile mesaja bağlı;
+            ent_failed = NER'i başarısız olan mesaj, start/end -1 = yok)
+    """
+
+    def __init__(self, buffer: bytes, offsets: np.ndarray, author_codes: np.ndarray, authors: List[str],
+                 timestamps: Optional[np.ndarray] = None, ids: Optional[np.ndarray] = None):
+        n = len(offsets) - 1
+        self.buffer = buffer
+        self.offsets = offsets
+        self.author_codes = author_codes
+        self.authors = list(authors)
+        self.timestamps = timestamps if timestamps is not None else np.full(n, np.datetime64("NaT", "m"))
+        self.ids = ids if ids is not None else np.arange(n, dtype=np.int64)
+        self.sentiment_labels = []
+        self.sentiment_codes = None
+        self.sentiment_scores = None
+        self.sentiment_status_labels = []
+        self.sentiment_status_codes = None
+        self.sentiment_errors = {}
+        self.entity_labels = []
+        self.ent_offsets = None
+        self.ent_label_codes = None
+        self.ent_scores = None
+        self.ent_starts = None
+        self.ent_ends = None
+        self.ent_words = None
+        self.ent_word_offsets = None
+        self.ent_failed = None
+
+    # --- Oluşturma ---
+
+    @classmethod
+    def from_columns(cls, texts: Iterable[str], authors: Iterable[str],
+                     timestamps: Optional[Iterable[Optional[datetime]]] = None,
+                     ids: Optional[Iterable[int]] = None) -> "MessageTable":
+        """
+        Metin ve yazar akışlarından tablo oluşturur.
+
+        Args:
+            texts: Mesaj metinleri
+            authors: Her mesajın yazarı (metinlerle aynı uzunlukta)
+            timestamps: Zaman damgaları (None olabilir)
+            ids: Mesaj kimlikleri (None ise 0..n-1)
+
+        Returns:
+            MessageTable
+        """
+        buffer = _TextBuffer()
+        codes = []
+        author_index = {}
+        for text, author in zip(texts, authors):
+            buffer.append(text)
+            codes.append(author_index.setdefault(author, len(author_index)))
+        text_buffer, offsets = buffer.finish()
+        table_ts = None
+        if timestamps is not None:
+            table_ts = np.array(
+                [np.datetime64(ts, "m") if ts is not None else np.datetime64("NaT", "m") for ts in timestamps],
+                dtype="datetime64[m]"
+            )
+        table_ids = np.asarray(list(ids), dtype=np.int64) if ids is not None else None
+        return cls(text_buffer, offsets, np.asarray(codes, dtype=np.int32), list(author_index), table_ts, table_ids)
+
+    @classmethod
+    def from_records(cls, records: Iterable, author_key=None) -> "MessageTable":
+        """
+        parser.iter_messages kayıtlarından tablo oluşturur; kimlik olarak satır numarası kullanılır.
+
+        Args:
+            records: ChatMessage akışı
+            author_key: Yazar adını gruplama anahtarına çeviren fonksiyon (ör. parser.author_key)
+
+        Returns:
+            MessageTable
+        """
+        buffer = _TextBuffer()
+        codes, ts, ids = [], [], []
+        author_index = {}
+        for record in records:
+            author = author_key(record.author) if author_key else record.author
+            buffer.append(record.text)
+            codes.append(author_index.setdefault(author, len(author_index)))
+            ts.append(record.timestamp)
+            ids.append(record.line)
+        text_buffer, offsets = buffer.finish()
+        timestamps = np.array(
+            [np.datetime64(t, "m") if t is not None else np.datetime64("NaT", "m") for t in ts],
+            dtype="datetime64[m]"
+        )
+        return cls(text_buffer, offsets, np.asarray(codes, dtype=np.int32), list(author_index),
+                   timestamps, np.asarray(ids, dtype=np.int64))
+
+    @classmethod
+    def from_messages_dict(cls, messages_dict: Dict[str, List[str]]) -> "MessageTable":
+        """read_data / sanitize_messages çıktısından ({'i': [...], 'ç': [...]}) tablo oluşturur"""
+        def texts():
+            for msgs in messages_dict.values():
+                yield from msgs
+
+        def authors():
+            for author, msgs in messages_dict.items():
+                for _ in msgs:
+                    yield author
+
+        table = cls.from_columns(texts(), authors())
+        # Mesajı olmayan yazarlar da tabloda yer alsın
+        for author in messages_dict:
+            if author not in table.authors:
+                table.authors.append(author)
+        return table
+
+    @classmethod
+    def from_analysis(cls, messages: List[Dict]) -> "MessageTable":
+        """analyze_ner / analyze_sentiments_module çıktısından ({'text', 'author', 'ents', 'sentiment'}) tablo oluşturur"""
+        table = cls.from_columns((m.get("text", "") for m in messages),
+                                 (m.get("author", "unknown") for m in messages))
+        if any("sentiment" in m for m in messages):
+            table.set_sentiments([m.get("sentiment") for m in messages])
+        if any("ents" in m for m in messages):
+            # ents=None başarısız NER demektir ve öyle kalır; alanı olmayan mesaj entity'siz sayılır
+            table.set_entities([m["ents"] if "ents" in m else [] for m in messages])
+        return table
+
+    # --- Analiz sütunları ---
+
+    def set_sentiments(self, results: List[Optional[Dict]]):
+        """
+        Duygu sonuçlarını sütunlara yazar.
+
+        Args:
+            results: Her mesaj için {'label', 'score'[, 'status', 'error']} ya da None;
+                skorlanamayan mesajlarda label None olur, durum ve hata korunur
+        """
+        label_index = {label: i for i, label in enumerate(self.sentiment_labels)}
+        status_index = {status: i for i, status in enumerate(self.sentiment_status_labels)}
+        codes = np.full(len(self), -1, dtype=np.int8)
+        scores = np.full(len(self), np.nan, dtype=np.float64)
+        status_codes = np.full(len(self), -1, dtype=np.int8)
+        errors = {}
+        for i, result in enumerate(results):
+            if not result:
+                continue
+            if result.get("label") is not None:
+                codes[i] = label_index.setdefault(result["label"], len(label_index))
+            score = result.get("score")
+            if score is not None:
+                scores[i] = score
+            if result.get("status") is not None:
+                status_codes[i] = status_index.setdefault(result["status"], len(status_index))
+            if "error" in result:
+                errors[i] = result["error"]
+        self.sentiment_labels = list(label_index)
+        self.sentiment_codes = codes
+        self.sentiment_scores = scores
+        self.sentiment_status_labels = list(status_index)
+        self.sentiment_status_codes = status_codes
+        self.sentiment_errors = errors
+
+    def set_entities(self, results: List[List[Dict]]):
+        """
+        NER sonuçlarını düzleştirilmiş entity sütunlarına yazar.
+
+        Args:
+            results: Her mesaj için apply_ner çıktısı; None başarısız NER'dir (ent_failed)
+        """
+        label_index = {label: i for i, label in enumerate(self.entity_labels)}
+        counts = np.zeros(len(self), dtype=np.int64)
+        failed = np.zeros(len(self), dtype=bool)
+        label_codes, scores, starts, ends = [], [], [], []
+        words = _TextBuffer()
+        for i, ents in enumerate(results):
+            if ents is None:
+                failed[i] = True
+                continue
+            counts[i] = len(ents)
+            for ent in ents:
+                label = ent.get("entity_group") or ent.get("entity") or ent.get("label") or "UNKNOWN"
+                label_codes.append(label_index.setdefault(label, len(label_index)))
+                scores.append(ent.get("score", 1.0))
+                # transformers konumu bilinmeyen entity'lerde start/end None döndürebilir
+                start, end = ent.get("start"), ent.get("end")
+                starts.append(-1 if start is None else start)
+                ends.append(-1 if end is None else end)
+                words.append(ent.get("word") or ent.get("value") or "")
+        self.entity_labels = list(label_index)
+        self.ent_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.ent_offsets[1:])
+        self.ent_label_codes = np.asarray(label_codes, dtype=np.int16)
+        self.ent_scores = np.asarray(scores, dtype=np.float64)
+        self.ent_starts = np.asarray(starts, dtype=np.int32)
+        self.ent_ends = np.asarray(ends, dtype=np.int32)
+        self.ent_words, self.ent_word_offsets = words.finish()
+        self.ent_failed = failed
+
+    @property
+    def has_sentiment(self) -> bool:
+        return self.sentiment_codes is not None
+
+    @property
+    def has_entities(self) -> bool:
+        return self.ent_offsets is not None
+
+    # --- Erişim ---
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def text(self, i: int) -> str:
+        """i. mesajın metni"""
+        return decode_text(self.buffer[self.offsets[i]:self.offsets[i + 1]])
+
+    def texts(self) -> Iterator[str]:
+        """Tüm mesaj metinlerini sırayla üretir"""
+        buffer = self.buffer
+        bounds = self.offsets.tolist()
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            yield decode_text(buffer[start:end])
+
+    def author(self, i: int) -> str:
+        """i. mesajın yazarı"""
+        return self.authors[self.author_codes[i]]
+
+    def byte_lengths(self) -> np.ndarray:
+        """Mesaj başına UTF-8 bayt sayısı"""
+        return np.diff(self.offsets)
+
+    def char_lengths(self) -> np.ndarray:
+        """Mesaj başına karakter (kod noktası) sayısı"""
+        lengths = self.byte_lengths()
+        if not len(lengths):
+            return lengths
+        # UTF-8 devam baytları (10xxxxxx) yeni bir karakter başlatmaz
+        lead = (np.frombuffer(self.buffer, dtype=np.uint8) & 0xC0) != 0x80
+        if not len(lead):
+            return np.zeros(len(lengths), dtype=np.int64)
+        starts = np.minimum(self.offsets[:-1], len(lead) - 1)
+        counts = np.add.reduceat(lead, starts, dtype=np.int64)
+        # reduceat boş dilimlerde başlangıçtaki elemanı döndürür
+        counts[lengths == 0] = 0
+        return counts
+
+    def entity_word(self, j: int) -> str:
+        """Düzleştirilmiş j. entity'nin kelimesi"""
+        return decode_text(self.ent_words[self.ent_word_offsets[j]:self.ent_word_offsets[j + 1]])
+
+    def entities(self, i: int) -> Optional[List[Dict]]:
+        """i. mesajın entity'lerini apply_ner formatında döndürür (NER başarısızsa None)"""
+        if not self.has_entities:
+            return []
+        if self.ent_failed[i]:
+            return None
+        out = []
+        for j in range(self.ent_offsets[i], self.ent_offsets[i + 1]):
+            start, end = int(self.ent_starts[j]), int(self.ent_ends[j])
+            out.append({
+                "entity_group": self.entity_labels[self.ent_label_codes[j]],
+                "score": float(self.ent_scores[j]),
+                "word": self.entity_word(j),
+                "start": None if start < 0 else start,
+                "end": None if end < 0 else end,
+            })
+        return out
+
+    def sentiment(self, i: int) -> Optional[Dict]:
+        """i. mesajın duygu sonucu (yoksa None; skorlanamadıysa label None, durum ve hata ile)"""
+        if not self.has_sentiment:
+            return None
+        code, status = self.sentiment_codes[i], self.sentiment_status_codes[i]
+        if code < 0 and status < 0:
+            return None
+        score = self.sentiment_scores[i]
+        result = {
+            "label": self.sentiment_labels[code] if code >= 0 else None,
+            "score": float(score) if not np.isnan(score) else 0.0,
+        }
+        if status >= 0:
+            result["status"] = self.sentiment_status_labels[status]
+        if i in self.sentiment_errors:
+            result["error"] = self.sentiment_errors[i]
+        return result
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Her mesajı export/visualization'ın beklediği dict formatında üretir"""
+        for i, text in enumerate(self.texts()):
+            record = {"id": int(self.ids[i]), "author": self.author(i), "text": text}
+            if not np.isnat(self.timestamps[i]):
+                record["timestamp"] = str(self.timestamps[i])
+            if self.has_sentiment:
+                record["sentiment"] = self.sentiment(i)
+            if self.has_entities:
+                record["ents"] = self.entities(i)
+            yield record
+
+    def to_records(self) -> List[Dict]:
+        """Tabloyu dict listesine çevirir"""
+        return list(self.iter_records())
+
+    def to_messages_dict(self) -> Dict[str, List[str]]:
+        """Tabloyu {'yazar': [mesajlar]} formatına çevirir"""
+        out = {author: [] for author in self.authors}
+        for i, text in enumerate(self.texts()):
+            out[self.authors[self.author_codes[i]]].append(text)
+        return out
+
+    def take(self, indices) -> "MessageTable":
+        """
+        Seçilen satırlardan yeni bir tablo oluşturur.
+
+        Args:
+            indices: Satır indeksleri veya boolean maske
+
+        Returns:
+            MessageTable
+        """
+        indices = np.arange(len(self))[indices] if np.asarray(indices).dtype == bool else np.asarray(indices, dtype=np.int64)
+        buffer = _TextBuffer()
+        for i in indices.tolist():
+            buffer.append(self.text(i))
+        text_buffer, offsets = buffer.finish()
+        table = MessageTable(text_buffer, offsets, self.author_codes[indices], self.authors,
+                             self.timestamps[indices], self.ids[indices])
+        if self.has_sentiment:
+            table.sentiment_labels = list(self.sentiment_labels)
+            table.sentiment_codes = self.sentiment_codes[indices]
+            table.sentiment_scores = self.sentiment_scores[indices]
+            table.sentiment_status_labels = list(self.sentiment_status_labels)
+            table.sentiment_status_codes = self.sentiment_status_codes[indices]
+            table.sentiment_errors = {
+                new: self.sentiment_errors[old] for new, old in enumerate(indices.tolist()) if old in self.sentiment_errors
+            }
+        if self.has_entities:
+            table.entity_labels = list(self.entity_labels)
+            table.set_entities([self.entities(i) for i in indices.tolist()])
+        return table
+
+    def by_author(self) -> Dict[str, "MessageTable"]:
+        """Yazar başına alt tablolar"""
+        return {author: self.take(self.author_codes == code) for code, author in enumerate(self.authors)}
+
+    def entity_label_counts(self) -> Dict[str, int]:
+        """Entity etiketi başına sayım (NumPy bincount ile)"""
+        if not self.has_entities or len(self.ent_label_codes) == 0:
+            return {}
+        counts = np.bincount(self.ent_label_codes, minlength=len(self.entity_labels))
+        return {label: int(c) for label, c in zip(self.entity_labels, counts) if c}
+
+    def sentiment_label_counts(self) -> Dict[str, int]:
+        """Duygu etiketi başına sayım; sonucu olmayan mesajlar 'UNKNOWN' sayılır"""
+        if not self.has_sentiment:
+            return {"UNKNOWN": len(self)} if len(self) else {}
+        counts = np.bincount(self.sentiment_codes.astype(np.int64) + 1, minlength=len(self.sentiment_labels) + 1)
+        out = {label: int(c) for label, c in zip(self.sentiment_labels, counts[1:]) if c}
+        if counts[0]:
+            out["UNKNOWN"] = int(counts[0])
+        return out
+
+    def memory_usage(self) -> int:
+        """Tablonun yaklaşık bellek kullanımı (bayt)"""
+        import sys
+
+        total = sys.getsizeof(self.buffer)
+        for name in ("offsets", "author_codes", "timestamps", "ids", "sentiment_codes", "sentiment_scores",
+                     "sentiment_status_codes", "ent_offsets", "ent_label_codes", "ent_scores", "ent_starts",
+                     "ent_ends", "ent_word_offsets", "ent_failed"):
+            column = getattr(self, name)
+            if column is not None:
+                total += column.nbytes
+        if self.ent_words is not None:
+            total += sys.getsizeof(self.ent_words)
+        total += sum(sys.getsizeof(error) for error in self.sentiment_errors.values())
+        return total
+
+def as_message_list(messages) -> List[str]:
+    """MessageTable ya da metin listesini metin listesine çevirir"""
+    if isinstance(messages, MessageTable):
+        return list(messages.texts())
+    return messages
+
+def as_record_list(messages) -> List[Dict]:
+    """MessageTable ya da dict listesini dict listesine çevirir"""
+    if isinstance(messages, MessageTable):
+        return messages.to_records()
+    return messages
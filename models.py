@@ -0,0 +1,328 @@
+"""
+Model Kayıt (Registry) Modülü
+NER ve duygu analizi modellerini ilk kullanımda, config.json'daki değerlerle yükler.
+Aynı tokenizer'ı (vocab, normalizer, özel token'lar ve uzunluk sınırı) kullanan modeller onu paylaşır.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import get_config
+
+# Her model anahtarı için config bölümü, pipeline görevi ve model sınıfı
+MODEL_SPECS = {
+    "ner": {
+        "section": "ner",
+        "task": "ner",
+        "model_class": "AutoModelForTokenClassification",
+        "pipeline_options": ("aggregation_strategy",),
+    },
+    "sentiment": {
+        "section": "sentiment",
+        "task": "sentiment-analysis",
+        "model_class": "AutoModelForSequenceClassification",
+        "pipeline_options": (),
+    },
+}
+
+def current_rss_mb() -> float:
+    """Sürecin anlık yerleşik bellek kullanımını (MB) döndürür"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # Linux dışı sistemlerde en yüksek RSS değeri kullanılır
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / (1024 * 1024) if usage > 1 << 32 else usage / 1024
+    except (ImportError, OSError):
+        return 0.0
+
+def plan_batches(lengths: List[int], batch_size: int, max_tokens: int) -> List[List[int]]:
+    """
+    Mesajları token uzunluğuna göre sıralayıp doldurma (padding) maliyeti düşük batch'lere böler.
+
+    Args:
+        lengths: Her mesajın token uzunluğu
+        batch_size: Bir batch'teki en fazla mesaj sayısı
+        max_tokens: Bir batch'in doldurulmuş toplam token bütçesi (mesaj sayısı x en uzun mesaj)
+
+    Returns:
+        List[List[int]]: Orijinal indekslerden oluşan batch listesi
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    for idx in order:
+        # Sıralı olduğu için yeni eleman batch'in en uzunu olur
+        padded = (len(current) + 1) * max(lengths[idx], 1)
+        if current and (len(current) >= batch_size or padded > max_tokens):
+            batches.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        batches.append(current)
+    return batches
+
+def _model_size_mb(model) -> float:
+    """Model parametre ve buffer'larının kapladığı belleği (MB) hesaplar"""
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total / (1024 * 1024)
+
+def _tokenizer_fingerprint(tokenizer) -> str:
+    """
+    Tokenizer'ın metni nasıl işlediğinin özeti (hash).
+
+    Yalnızca vocab yetmez: do_lower_case, strip_accents, normalizer, özel
+    token'lar veya model_max_length farklıysa aynı vocab farklı girdi üretir.
+    Hızlı tokenizer'larda tüm tanım (vocab dahil) backend_tokenizer.to_str()
+    ile, yavaşlarda vocab ve init_kwargs ile özetlenir.
+    """
+    digest = hashlib.sha1(type(tokenizer).__name__.encode("utf-8"))
+    settings = {
+        "model_max_length": tokenizer.model_max_length,
+        "padding_side": getattr(tokenizer, "padding_side", None),
+        "truncation_side": getattr(tokenizer, "truncation_side", None),
+        "special_tokens": tokenizer.special_tokens_map,
+    }
+    if getattr(tokenizer, "is_fast", False):
+        digest.update(tokenizer.backend_tokenizer.to_str().encode("utf-8"))
+    else:
+        settings["init_kwargs"] = tokenizer.init_kwargs
+        for token, idx in sorted(tokenizer.get_vocab().items(), key=lambda item: item[1]):
+            digest.update(f"{idx}\t{token}\n".encode("utf-8"))
+    digest.update(json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """
+    Modelleri tembel (lazy) yükleyen ve paylaşan kayıt.
+
+    Her model ilk get_pipeline() çağrısında yüklenir. Yükleme süresi ve
+    bellek kullanımı report() ile raporlanır. memory_limit_mb aşıldığında
+    en uzun süredir kullanılmayan modeller bellekten çıkarılır.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self._config = config
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._tokenizers = {}
+        # (tokenizer adı, revizyon) -> özet; aynı tokenizer yeniden diskten yüklenmez
+        self._tokenizer_sources = {}
+
+    def _get_config(self) -> Dict:
+        return self._config if self._config is not None else get_config()
+
+    def model_settings(self, key: str) -> Dict:
+        """
+        Bir model anahtarı için yapılandırma değerlerini döndürür.
+
+        Args:
+            key: "ner" veya "sentiment"
+
+        Returns:
+            Dict: model_name, revision, pipeline seçenekleri ve çıkarım arka ucu
+        """
+        from onnx_backend import backend_name # onnxruntime yalnızca gerektiğinde yüklenir
+
+        if key not in MODEL_SPECS:
+            raise KeyError(f"Bilinmeyen model: {key}")
+        spec = MODEL_SPECS[key]
+        section = self._get_config().get(spec["section"], {})
+        options = {}
+        for name in spec["pipeline_options"]:
+            if section.get(name) is not None:
+                options[name] = section[name]
+        return {
+            "model_name": section.get("model_name"),
+            "revision": section.get("revision") or "main",
+            "tokenizer_name": section.get("tokenizer_name") or section.get("model_name"),
+            "options": options,
+            "backend": backend_name(self._onnx_config()),
+        }
+
+    def _onnx_config(self) -> Dict:
+        return self._get_config().get("onnx", {})
+
+    def _limits(self) -> Dict:
+        return self._get_config().get("models", {})
+
+    def _load_tokenizer(self, name: str, revision: str):
+        """Tokenizer'ı yükler; aynı tokenizer (aynı kaynak ya da aynı özet) yüklüyse onu paylaşır"""
+        from transformers import AutoTokenizer
+
+        fingerprint = self._tokenizer_sources.get((name, revision))
+        if fingerprint in self._tokenizers:
+            return self._tokenizers[fingerprint], fingerprint, True
+        tokenizer = AutoTokenizer.from_pretrained(name, revision=revision)
+        fingerprint = _tokenizer_fingerprint(tokenizer)
+        self._tokenizer_sources[(name, revision)] = fingerprint
+        shared = self._tokenizers.get(fingerprint)
+        if shared is not None:
+            return shared, fingerprint, True
+        self._tokenizers[fingerprint] = tokenizer
+        return tokenizer, fingerprint, False
+
+    def _load(self, key: str) -> Dict:
+        import transformers
+
+        spec = MODEL_SPECS[key]
+        settings = self.model_settings(key)
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+
+        tokenizer, fingerprint, shared = self._load_tokenizer(settings["tokenizer_name"], settings["revision"])
+        model_class = getattr(transformers, spec["model_class"])
+        if settings["backend"] != "torch":
+            from onnx_backend import load_onnx_pipeline
+            pipe, model_mb = load_onnx_pipeline(spec["task"], model_class, settings, tokenizer, self._onnx_config())
+        else:
+            model = model_class.from_pretrained(settings["model_name"], revision=settings["revision"])
+            model.eval()
+            pipe = transformers.pipeline(spec["task"], model=model, tokenizer=tokenizer, **settings["options"])
+            model_mb = _model_size_mb(model)
+
+        now = time.time()
+        return {
+            "pipeline": pipe,
+            "tokenizer_fingerprint": fingerprint,
+            "model_name": settings["model_name"],
+            "revision": settings["revision"],
+            "load_seconds": time.perf_counter() - started,
+            "rss_delta_mb": max(current_rss_mb() - rss_before, 0.0),
+            "model_mb": model_mb,
+            "backend": settings["backend"],
+            "shared_tokenizer": shared,
+            "loaded_at": now,
+            "last_used": now,
+        }
+
+    def get_pipeline(self, key: str):
+        """
+        Bir modelin pipeline'ını döndürür, gerekirse yükler.
+
+        Args:
+            key: "ner" veya "sentiment"
+
+        Returns:
+            transformers pipeline nesnesi
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+                self._entries[key] = entry
+                self._enforce_memory_limit(keep=key)
+            entry["last_used"] = time.time()
+            return entry["pipeline"]
+
+    def get_tokenizer(self, key: str):
+        """Bir modelin tokenizer'ını döndürür"""
+        return self.get_pipeline(key).tokenizer
+
+    def is_loaded(self, key: str) -> bool:
+        """Model bellekte mi?"""
+        return key in self._entries
+
+    def unload(self, key: str) -> bool:
+        """
+        Modeli bellekten çıkarır.
+
+        Args:
+            key: Model anahtarı
+
+        Returns:
+            bool: Model yüklüyse ve çıkarıldıysa True
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            fingerprint = entry["tokenizer_fingerprint"]
+            if not any(e["tokenizer_fingerprint"] == fingerprint for e in self._entries.values()):
+                self._tokenizers.pop(fingerprint, None)
+            return True
+
+    def _enforce_memory_limit(self, keep: Optional[str] = None):
+        """memory_limit_mb aşıldıysa boşta kalan modelleri LRU sırasıyla çıkarır"""
+        limits = self._limits()
+        limit = limits.get("memory_limit_mb")
+        if not limit:
+            return
+        min_idle = limits.get("min_idle_seconds", 0)
+        now = time.time()
+        candidates = sorted(
+            (k for k in self._entries if k != keep),
+            key=lambda k: self._entries[k]["last_used"]
+        )
+        for candidate in candidates:
+            if sum(e["model_mb"] for e in self._entries.values()) <= limit:
+                break
+            if now - self._entries[candidate]["last_used"] >= min_idle:
+                self.unload(candidate)
+
+    def evict_idle(self, idle_seconds: Optional[float] = None) -> List[str]:
+        """
+        Belirtilen süreden uzun süredir kullanılmayan modelleri çıkarır.
+
+        Args:
+            idle_seconds: Boşta kalma süresi (None ise config'deki idle_timeout)
+
+        Returns:
+            List[str]: Çıkarılan model anahtarları
+        """
+        if idle_seconds is None:
+            idle_seconds = self._limits().get("idle_timeout")
+        if idle_seconds is None:
+            return []
+        now = time.time()
+        with self._lock:
+            idle = [k for k, e in self._entries.items() if now - e["last_used"] >= idle_seconds]
+            for key in idle:
+                self.unload(key)
+        return idle
+
+    def report(self) -> Dict:
+        """
+        Yüklü modeller için yükleme süresi ve bellek raporu döndürür.
+
+        Returns:
+            Dict: Model anahtarına göre rapor ve toplam RSS
+        """
+        with self._lock:
+            models = {
+                key: {
+                    "model_name": e["model_name"],
+                    "revision": e["revision"],
+                    "load_seconds": round(e["load_seconds"], 3),
+                    "model_mb": round(e["model_mb"], 1),
+                    "rss_delta_mb": round(e["rss_delta_mb"], 1),
+                    "shared_tokenizer": e["shared_tokenizer"],
+                    "backend": e["backend"],
+                    "idle_seconds": round(time.time() - e["last_used"], 1),
+                }
+                for key, e in self._entries.items()
+            }
+        return {"models": models, "rss_mb": round(current_rss_mb(), 1)}
+
+_registry = None
+
+def get_registry() -> ModelRegistry:
+    """Paylaşılan model kaydını döndürür"""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
+
+def get_pipeline(key: str):
+    """Paylaşılan kayıttan pipeline döndürür"""
+    return get_registry().get_pipeline(key)
@@ -0,0 +1,380 @@
+"""
+ONNX Runtime Çıkarım Modülü
+NER ve duygu modellerini ONNX'e aktarır, isteğe bağlı olarak dinamik int8
+nicemleme (quantization) uygular ve ONNX Runtime ile CPU'da çalıştırır.
+Çıktılar transformers pipeline'larıyla aynı formattadır.
+"""
+import importlib.util
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# onnxruntime yalnızca oturum açılırken yüklenir (backend_name gibi hafif yardımcılar için gerekmez)
+ONNX_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+
+INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+# Dışa aktarılan modelin PyTorch modelinden en fazla sapması (fp32, logit)
+EXPORT_TOLERANCE = 1e-3
+
+def backend_name(onnx_config: Dict) -> str:
+    """Yapılandırmaya göre çıkarım arka ucunun adı ("torch", "onnx" veya "onnx-int8")"""
+    if not onnx_config.get("enabled"):
+        return "torch"
+    return "onnx-int8" if onnx_config.get("quantize", True) else "onnx"
+
+def _model_dir(directory: str, model_name: str, revision: str) -> str:
+    """Model adı ve revizyonundan ONNX dosyalarının klasörü"""
+    safe = re.sub(r"[^\w.-]+", "_", f"{model_name}@{revision}").strip("_")
+    return os.path.join(directory, safe)
+
+def _logits_module(model, input_names: List[str]):
+    """Dışa aktarım için konumsal girdilerle yalnızca logits döndüren torch modülü"""
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            inputs = dict(zip(INPUT_NAMES, (input_ids, attention_mask, token_type_ids)))
+            return self.model(**{name: inputs[name] for name in input_names}).logits
+
+    return LogitsOnly()
+
+def export_onnx(model, tokenizer, path: str) -> str:
+    """
+    PyTorch modelini dinamik batch ve dizi uzunluğuyla ONNX'e aktarır.
+
+    Önce torch.export tabanlı dışa aktarıcı, olmazsa eski TorchScript dışa
+    aktarıcısı denenir. Sonuç farklı boyutlu girdilerde PyTorch modeliyle
+    karşılaştırılır; sapma EXPORT_TOLERANCE'ı aşarsa hata verilir.
+
+    Args:
+        model: transformers modeli
+        tokenizer: Modelin tokenizer'ı
+        path: Yazılacak .onnx dosyası
+
+    Returns:
+        str: Dosya yolu
+    """
+    import torch
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    sample = tokenizer(["Merhaba, Ankara'da güzel bir gün.", "Selam"], padding=True, return_tensors="pt")
+    names = [name for name in INPUT_NAMES if name in sample]
+    wrapper = _logits_module(model, names)
+    args = tuple(sample[name] for name in names)
+
+    try:
+        batch = torch.export.Dim("batch")
+        sequence = torch.export.Dim("sequence")
+        torch.onnx.export(wrapper, args, path, input_names=names, output_names=["logits"],
+                          dynamic_shapes=tuple({0: batch, 1: sequence} for _ in names), dynamo=True, verbose=False)
+        _check_export(model, tokenizer, path, names)
+    except Exception:
+        axes = {name: {0: "batch", 1: "sequence"} for name in names + ["logits"]}
+        torch.onnx.export(wrapper, args, path, input_names=names, output_names=["logits"],
+                          dynamic_axes=axes, opset_version=17, dynamo=False)
+        _check_export(model, tokenizer, path, names)
+    _consolidate(path)
+    return path
+
+def _consolidate(path: str):
+    """
+    Ağırlıkları tek dosyada toplar ve dışa aktarımdaki örnek girdinin boyutlarıyla
+    kaydedilmiş ara şekil bilgisini siler (nicemlemedeki şekil çıkarımıyla çakışır).
+    """
+    import onnx
+
+    from onnx.external_data_helper import load_external_data_for_model
+
+    model = onnx.load(path, load_external_data=False)
+    data_files = {entry.value for tensor in model.graph.initializer
+                  for entry in tensor.external_data if entry.key == "location"}
+    load_external_data_for_model(model, os.path.dirname(path) or ".")
+    del model.graph.value_info[:]
+    onnx.save(model, path)
+    for name in data_files:
+        data_path = os.path.join(os.path.dirname(path), name)
+        if os.path.exists(data_path):
+            os.remove(data_path)
+
+def _check_export(model, tokenizer, path: str, names: List[str]):
+    """Dışa aktarılan modeli dışa aktarımdakinden farklı boyutlu girdilerle doğrular"""
+    import torch
+
+    session = create_session(path)
+    texts = ["İstanbul'dan Ahmet Bey aradı, yarın toplantı var mı?", "ok", "Bu akşam sinemaya gidelim mi?"]
+    encoded = tokenizer(texts, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        expected = model(**{name: encoded[name] for name in names}).logits.numpy()
+    actual = session.run(["logits"], {name: encoded[name].numpy() for name in names})[0]
+    error = float(np.abs(expected - actual).max())
+    if error > EXPORT_TOLERANCE:
+        raise RuntimeError(f"ONNX çıktısı PyTorch'tan sapıyor (en büyük fark {error:.4g})")
+
+def quantize_onnx(source: str, target: str) -> str:
+    """
+    ONNX modeline dinamik int8 nicemleme uygular (ağırlıklar int8, aktivasyonlar çalışma anında).
+
+    Args:
+        source: fp32 .onnx dosyası
+        target: Yazılacak int8 .onnx dosyası
+
+    Returns:
+        str: Dosya yolu
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    return target
+
+def create_session(path: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+    """
+    CPU için ONNX Runtime oturumu oluşturur.
+
+    Args:
+        path: .onnx dosyası
+        intra_op_threads: Bir işlem içindeki iş parçacığı sayısı (0 = ONNX Runtime varsayılanı)
+        inter_op_threads: İşlemler arası iş parçacığı sayısı (0 = varsayılan)
+    """
+    if not ONNX_AVAILABLE:
+        raise ImportError("onnxruntime paketi gerekli. pip install onnxruntime onnx")
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = intra_op_threads or 0
+    options.inter_op_num_threads = inter_op_threads or 0
+    return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+class _OnnxModelOutput:
+    def __init__(self, logits):
+        self.logits = logits
+
+class OnnxModel:
+    """ONNX oturumunu model(**inputs).logits arayüzüyle sunar (birleşik analiz bu arayüzü kullanır)"""
+
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def logits(self, inputs: Dict) -> np.ndarray:
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        return self.session.run(["logits"], feed)[0]
+
+    def __call__(self, **inputs):
+        import torch
+
+        arrays = {k: v.numpy() if hasattr(v, "numpy") else v for k, v in inputs.items()}
+        return _OnnxModelOutput(torch.from_numpy(self.logits(arrays)))
+
+class OnnxPipeline:
+    """
+    transformers pipeline'ının ONNX Runtime karşılığı.
+
+    Tokenizasyon ve son işleme (entity gruplama, etiket/skor seçimi) asıl
+    pipeline sınıfının kodunu kullanır; yalnızca model ileri geçişi ONNX
+    Runtime'da yapılır. Çağrı biçimi ve çıktılar pipeline ile aynıdır.
+
+    Args:
+        shell: Ağırlıksız (meta cihazlı) modelle kurulmuş transformers pipeline'ı (son işleme için)
+        session: ONNX Runtime oturumu
+    """
+
+    def __init__(self, shell, session):
+        self.shell = shell
+        self.task = "ner" if hasattr(shell, "aggregate") else "sentiment-analysis"
+        self.tokenizer = shell.tokenizer
+        self.model = OnnxModel(session, shell.model.config)
+        self._postprocess_params = getattr(shell, "_postprocess_params", {})
+
+    def postprocess(self, *args, **kwargs):
+        return self.shell.postprocess(*args, **kwargs)
+
+    def __call__(self, inputs, batch_size: Optional[int] = None, **kwargs):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        step = batch_size or 1
+        results = []
+        for i in range(0, len(texts), step):
+            chunk = texts[i:i + step]
+            results.extend(self._run_ner(chunk) if self.task == "ner" else self._run_classification(chunk))
+        if single:
+            # NER tek metin için entity listesi, sınıflandırma tek elemanlı liste döndürür
+            return results[0] if self.task == "ner" else results
+        return results
+
+    def _run_ner(self, texts: List[str]) -> List[List[Dict]]:
+        import torch
+
+        encoded = self.tokenizer(texts, padding=True, truncation=True, return_special_tokens_mask=True,
+                                 return_offsets_mapping=self.tokenizer.is_fast, return_tensors="np")
+        logits = self.model.logits(encoded)
+        out = []
+        for row, text in enumerate(texts):
+            keep = np.flatnonzero(encoded["attention_mask"][row])
+            outputs = {
+                "logits": torch.from_numpy(logits[row:row + 1, keep]),
+                "input_ids": torch.from_numpy(encoded["input_ids"][row:row + 1, keep]),
+                "special_tokens_mask": torch.from_numpy(encoded["special_tokens_mask"][row:row + 1, keep]),
+                "offset_mapping": torch.from_numpy(encoded["offset_mapping"][row:row + 1, keep])
+                if "offset_mapping" in encoded else None,
+                "sentence": text,
+                "is_last": True,
+            }
+            out.append(self.shell.postprocess([outputs], **self._postprocess_params))
+        return out
+
+    def _run_classification(self, texts: List[str]) -> List[Dict]:
+        import torch
+
+        # Sınıflandırma pipeline'ı gibi kesme (truncation) yapılmaz
+        encoded = self.tokenizer(texts, padding=True, return_tensors="np")
+        logits = self.model.logits(encoded)
+        return [
+            self.shell.postprocess({"logits": torch.from_numpy(logits[row:row + 1])}, **self._postprocess_params)
+            for row in range(len(texts))
+        ]
+
+def load_onnx_pipeline(task: str, model_class, settings: Dict, tokenizer, onnx_config: Dict) -> Tuple[OnnxPipeline, float]:
+    """
+    Model kaydı için ONNX pipeline'ı yükler; gerekirse dışa aktarır ve nicemler.
+
+    Dışa aktarılan dosyalar onnx.directory altında model adı ve revizyona göre
+    saklanır; sonraki açılışlarda PyTorch ağırlıkları hiç yüklenmez.
+
+    Args:
+        task: Pipeline görevi ("ner" veya "sentiment-analysis")
+        model_class: transformers model sınıfı
+        settings: ModelRegistry.model_settings çıktısı
+        tokenizer: Paylaşılan tokenizer
+        onnx_config: config.json'daki onnx bölümü
+
+    Returns:
+        Tuple[OnnxPipeline, float]: Pipeline ve model dosyasının boyutu (MB)
+    """
+    if not ONNX_AVAILABLE:
+        raise ImportError("onnxruntime paketi gerekli. pip install onnxruntime onnx")
+    import torch
+    import transformers
+
+    name, revision = settings["model_name"], settings["revision"]
+    directory = _model_dir(onnx_config.get("directory", ".cache/onnx"), name, revision)
+    fp32_path = os.path.join(directory, "model.onnx")
+    int8_path = os.path.join(directory, "model.int8.onnx")
+    path = int8_path if onnx_config.get("quantize", True) else fp32_path
+
+    if not os.path.exists(path):
+        if not os.path.exists(fp32_path):
+            model = model_class.from_pretrained(name, revision=revision)
+            model.eval()
+            export_onnx(model, tokenizer, fp32_path)
+            del model
+        if path == int8_path:
+            quantize_onnx(fp32_path, int8_path)
+
+    # Son işleme yalnızca config'e ihtiyaç duyar; model ağırlıksız (meta cihazda) kurulur
+    config = transformers.AutoConfig.from_pretrained(name, revision=revision)
+    with torch.device("meta"):
+        shell_model = model_class.from_config(config)
+    shell = transformers.pipeline(task, model=shell_model, tokenizer=tokenizer, device="meta", **settings["options"])
+    session = create_session(path, onnx_config.get("intra_op_threads", 0), onnx_config.get("inter_op_threads", 0))
+    return OnnxPipeline(shell, session), os.path.getsize(path) / (1024 * 1024)
+
+def _span_key(entity: Dict) -> Tuple:
+    return (entity.get("entity_group") or entity.get("entity"), entity.get("start"), entity.get("end"))
+
+def parity_report(texts: List[str], config: Optional[Dict] = None, batch_size: int = 16) -> Dict:
+    """
+    ONNX arka ucunu PyTorch arka ucuyla bir referans metin kümesinde karşılaştırır.
+
+    Duygu için etiket uyumu ve skor farkları; NER için (etiket, başlangıç, bitiş)
+    parçalarının kesinlik/duyarlılık/F1 değerleri ve eşleşen parçalardaki skor
+    farkları hesaplanır. Her iki arka ucun süreleri de raporlanır.
+
+    Args:
+        texts: Referans metinler
+        config: Temel yapılandırma (None ise config.json)
+        batch_size: Pipeline batch boyutu
+
+    Returns:
+        Dict: {'backend', 'texts', 'sentiment': {...}, 'ner': {...}}
+    """
+    from config import get_config, merge_config
+    from models import ModelRegistry
+
+    base = config if config is not None else get_config()
+    onnx_config = dict(base.get("onnx", {}), enabled=True)
+    registries = {
+        "torch": ModelRegistry(merge_config(base, {"onnx": {"enabled": False}})),
+        "onnx": ModelRegistry(merge_config(base, {"onnx": onnx_config})),
+    }
+
+    outputs = {}
+    timings = {}
+    for backend, registry in registries.items():
+        for key in ("sentiment", "ner"):
+            pipe = registry.get_pipeline(key)
+            pipe(texts[:1])  # ısınma
+            started = time.perf_counter()
+            outputs[(backend, key)] = pipe(texts, batch_size=batch_size)
+            timings[(backend, key)] = time.perf_counter() - started
+
+    torch_sent, onnx_sent = outputs[("torch", "sentiment")], outputs[("onnx", "sentiment")]
+    score_diffs = [abs(a["score"] - b["score"]) for a, b in zip(torch_sent, onnx_sent)]
+    label_matches = sum(a["label"] == b["label"] for a, b in zip(torch_sent, onnx_sent))
+
+    true_positive = predicted = expected = 0
+    label_only = 0
+    span_diffs = []
+    for torch_ents, onnx_ents in zip(outputs[("torch", "ner")], outputs[("onnx", "ner")]):
+        torch_spans = {_span_key(e): e for e in torch_ents}
+        onnx_spans = {_span_key(e): e for e in onnx_ents}
+        expected += len(torch_spans)
+        predicted += len(onnx_spans)
+        for key, entity in onnx_spans.items():
+            if key in torch_spans:
+                true_positive += 1
+                span_diffs.append(abs(float(entity["score"]) - float(torch_spans[key]["score"])))
+        # Aynı konumda farklı etiket
+        torch_positions = {(k[1], k[2]): k[0] for k in torch_spans}
+        label_only += sum(1 for k in onnx_spans if (k[1], k[2]) in torch_positions and torch_positions[(k[1], k[2])] != k[0])
+
+    precision = true_positive / predicted if predicted else 1.0
+    recall = true_positive / expected if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    def speedup(key):
+        return timings[("torch", key)] / max(timings[("onnx", key)], 1e-9)
+
+    return {
+        "backend": backend_name(onnx_config),
+        "texts": len(texts),
+        "sentiment": {
+            "label_agreement": label_matches / len(texts) if texts else 1.0,
+            "max_score_diff": max(score_diffs, default=0.0),
+            "mean_score_diff": float(np.mean(score_diffs)) if score_diffs else 0.0,
+            "torch_seconds": timings[("torch", "sentiment")],
+            "onnx_seconds": timings[("onnx", "sentiment")],
+            "speedup": speedup("sentiment"),
+        },
+        "ner": {
+            "torch_entities": expected,
+            "onnx_entities": predicted,
+            "span_precision": precision,
+            "span_recall": recall,
+            "span_f1": f1,
+            "label_mismatches": label_only,
+            "max_score_diff": max(span_diffs, default=0.0),
+            "mean_score_diff": float(np.mean(span_diffs)) if span_diffs else 0.0,
+            "torch_seconds": timings[("torch", "ner")],
+            "onnx_seconds": timings[("onnx", "ner")],
+            "speedup": speedup("ner"),
+        },
+    }
@@ -1,12 +1,221 @@
+import re
+from datetime import datetime
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from utility import mask_iban, mask_media
 
-messages = {
-    "i": [],
-    "ç": []
-}
+# "12.03.2023 14:22 - " veya "3/12/23, 2:22 PM - " biçimindeki mesaj başlığı
+RE_HEADER = re.compile(
+    r"^(\d{1,2})([./])(\d{1,2})[./](\d{2,4}),?\s+(\d{1,2}):(\d{2})(?::\d{2})?(?:\s?([APap][Mm]))?\s-\s"
+)
 
+class ChatMessage(NamedTuple):
+    """Dışa aktarılmış sohbetten okunan tek bir mesaj"""
+    timestamp: Optional[datetime]
+    author: str
+    text: str
+    line: int
 
-def sanitize_messages(messages, mask_emails=False, mask_phones=False):
+def parse_timestamp(match) -> Optional[datetime]:
+    """
+    RE_HEADER eşleşmesinden zaman damgası üretir.
+
+    Noktalı tarihler gün.ay.yıl, eğik çizgili tarihler ay/gün/yıl kabul edilir
+    (ilk sayı 12'den büyükse gün olarak yorumlanır).
+    """
+    first, sep, second, year, hour, minute, ampm = match.groups()
+    first, second, year, hour, minute = int(first), int(second), int(year), int(hour), int(minute)
+    if sep == "." or first > 12:
+        day, month = first, second
+    else:
+        month, day = first, second
+    if year < 100:
+        year += 2000
+    if ampm:
+        hour = hour % 12 + (12 if ampm.lower() == "pm" else 0)
+    try:
+        return datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+def author_key(author: str) -> str:
+    """Yazar adını mesaj sözlüğündeki anahtara ("i", "ç", "unknown") çevirir"""
+    if author.startswith("İremmm") or author.startswith("İrem"):
+        return "i"
+    if author.startswith("Çağın") or author.startswith("Cagin"):
+        return "ç"
+    return "unknown"
+
+def iter_messages(loc: str) -> Iterator[ChatMessage]:
+    """
+    Sohbet dosyasındaki mesajları tek tek üretir (sabit bellek).
+
+    Başlıkla (tarih, saat - ) başlamayan satırlar bir önceki mesajın devamı
+    kabul edilir. Yazarı olmayan sistem mesajları atlanır.
+
+    Args:
+        loc: Sohbet dosyası yolu
+
+    Yields:
+        ChatMessage: (timestamp, author, text, line) kaydı
+    """
+    import os
+
+    if not os.path.exists(loc):
+        raise FileNotFoundError(f"Dosya bulunamadı: {loc}")
+
+    with open(loc, "r", encoding="utf-8") as f:
+        yield from _parse_lines(f)
+
+def _parse_lines(lines: Iterable[str], first_line: int = 1) -> Iterator[ChatMessage]:
+    """Satır akışını ChatMessage kayıtlarına çevirir (iter_messages'ın çekirdeği)"""
+    current = None
+    parts = []
+
+    for line_no, line in enumerate(lines, first_line):
+        line = line.strip()
+        if not line:
+            continue
+
+        match = RE_HEADER.match(line)
+        if match is None:
+            # Çok satırlı mesajın devamı
+            if current is not None:
+                parts.append(line)
+            continue
+
+        if current is not None:
+            yield current._replace(text="\n".join(parts))
+            current = None
+
+        text = line[match.end():]
+        if ":" not in text:
+            continue  # sistem mesajı (yazar yok)
+        author, message = text.split(":", 1)
+        current = ChatMessage(parse_timestamp(match), author.strip(), "", line_no)
+        parts = [message.strip()]
+
+    if current is not None:
+        yield current._replace(text="\n".join(parts))
+
+def _split_text_lines(text: str) -> List[str]:
+    """Metin modundaki dosya okumasıyla aynı şekilde (\n, \r\n, \r) satırlara böler"""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+def _find_message_boundaries(mm, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Bellek eşlemli dosyayı mesaj başlarına hizalı bayt aralıklarına böler.
+
+    Her aralık (ilki hariç) bir mesaj başlığı satırıyla başlar; böylece çok
+    satırlı mesajlar iki aralık arasında bölünmez.
+    """
+    size = len(mm)
+    boundaries = [0]
+    target = chunk_bytes
+    while target < size:
+        pos = mm.find(b"\n", target - 1)
+        found = None
+        while pos != -1 and pos + 1 < size:
+            line_start = pos + 1
+            head = mm[line_start:line_start + 64].decode("utf-8", errors="ignore")
+            if RE_HEADER.match(head.lstrip()):
+                found = line_start
+                break
+            pos = mm.find(b"\n", line_start)
+        if found is None:
+            break
+        boundaries.append(found)
+        target = found + chunk_bytes
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _parse_range(args: Tuple[str, int, int]) -> Tuple[tuple, int]:
+    """
+    Süreç havuzu işçisi: bir bayt aralığını ayrıştırır.
+
+    Sonuçlar süreçler arası aktarım maliyetini azaltmak için sütunlar halinde
+    döner; aynı yazar adı tek nesne olarak paylaşılır.
+    """
+    import mmap
+
+    loc, start, end = args
+    with open(loc, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+    lines = _split_text_lines(data.decode("utf-8"))
+    authors = {}
+    columns = ([], [], [], [])
+    for record in _parse_lines(lines):
+        columns[0].append(record.timestamp)
+        columns[1].append(authors.setdefault(record.author, record.author))
+        columns[2].append(record.text)
+        columns[3].append(record.line)
+    return columns, len(lines)
+
+def iter_messages_parallel(loc: str, workers: Optional[int] = None,
+                           min_chunk_bytes: int = 1 << 20) -> Iterator[ChatMessage]:
+    """
+    Büyük sohbet dosyalarını süreç havuzunda paralel ayrıştırır.
+
+    Dosya bellek eşlemli (mmap) açılıp mesaj başlarına hizalı bayt aralıklarına
+    bölünür; her aralık ayrı bir süreçte ayrıştırılır ve sonuçlar sırayla
+    birleştirilir. Çıktı iter_messages ile birebir aynıdır.
+
+    Args:
+        loc: Sohbet dosyası yolu
+        workers: Süreç sayısı (None ise CPU sayısı)
+        min_chunk_bytes: Bir aralığın en küçük boyutu
+
+    Yields:
+        ChatMessage: (timestamp, author, text, line) kaydı
+    """
+    import mmap
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not os.path.exists(loc):
+        raise FileNotFoundError(f"Dosya bulunamadı: {loc}")
+
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(loc)
+    if workers <= 1 or size <= min_chunk_bytes:
+        yield from iter_messages(loc)
+        return
+
+    # Yük dengesi için işçi başına birkaç aralık
+    chunk_bytes = max(min_chunk_bytes, size // (workers * 4))
+    with open(loc, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ranges = _find_message_boundaries(mm, chunk_bytes)
+
+    line_offset = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for columns, line_count in pool.map(_parse_range, [(loc, a, b) for a, b in ranges]):
+            timestamps, authors, texts, lines = columns
+            yield from map(ChatMessage, timestamps, authors, texts, [n + line_offset for n in lines])
+            line_offset += line_count
+
+def sanitize_stream(records: Iterable[ChatMessage], mask_emails=False, mask_phones=False) -> Iterator[ChatMessage]:
+    """
+    Mesaj akışını sırayla temizler; sanitize_messages'ın akış karşılığıdır.
+
+    Args:
+        records: iter_messages çıktısı
+        mask_emails: E-postaları maskele
+        mask_phones: Telefon numaralarını maskele
+
+    Yields:
+        ChatMessage: Metni temizlenmiş kayıt
+    """
+    from utility import clean_text
+
+    for record in records:
+        yield record._replace(text=clean_text(record.text, mask_emails=mask_emails, mask_phones=mask_phones))
+
+
+def sanitize_messages(messages, mask_emails=False, mask_phones=False, with_spans=False):
     """
     Mesajları temizle ve PII bilgilerini maskele.
     
@@ -14,51 +223,48 @@ def sanitize_messages(messages, mask_emails=False, mask_phones=False):
         messages: Temizlenecek mesaj dict'i
         mask_emails: E-postaları maskele
         mask_phones: Telefon numaralarını maskele
+        with_spans: Maskelemeyle aynı taramada bulunan PII parçaları da döndürülsün mü
         
     Returns:
-        dict: Temizlenmiş mesajlar
+        dict: Temizlenmiş mesajlar; with_spans açıksa (temizlenmiş mesajlar,
+            {'yazar': mesaj başına PIISpan listeleri})
     """
-    from utility import clean_text
+    from utility import clean_texts
     
     sanitized = {}
+    spans = {}
     for author, msgs in messages.items():
-        sanitized_msgs = [clean_text(msg, mask_emails=mask_emails, mask_phones=mask_phones) for msg in msgs]
-        sanitized[author] = sanitized_msgs
-    return sanitized
+        if with_spans:
+            sanitized[author], spans[author] = clean_texts(msgs, mask_emails, mask_phones, with_spans=True)
+        else:
+            sanitized[author] = clean_texts(msgs, mask_emails=mask_emails, mask_phones=mask_phones)
+    return (sanitized, spans) if with_spans else sanitized
 
-def read_data(loc="C:\\Users\\ceren\\Desktop\\proje\\Mimicking-Our-Love-Language\\data\\data.txt"):
-    import os
-    
-    if not os.path.exists(loc):
-        raise FileNotFoundError(f"Dosya bulunamadı: {loc}")
+def read_data(loc="C:\\Users\\ceren\\Desktop\\proje\\Mimicking-Our-Love-Language\\data\\data.txt", workers=1):
+    """
+    Sohbet dosyasını okuyup mesajları yazara göre gruplar (iter_messages üzerinde ince bir sarmalayıcı).
 
-    last_author = None  
-    
-    with open(loc, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            if " - " not in line or ":" not in line:
-                continue
-
-            try:
-                meta, text = line.split(" - ", 1)
-                author, message = text.split(":", 1)
-            except ValueError:
-                continue
-
-            author = author.strip()
-            message = message.strip()
-            last_author = author  # <-- en son görülen yazarı tut
-
-            if author.startswith("İremmm") or author.startswith("İrem"):
-                messages["i"].append(message)
-            elif author.startswith("Çağın") or author.startswith("Cagin"):
-                messages["ç"].append(message)
-            else:
-                messages.setdefault("unknown", []).append(message)
+    Args:
+        loc: Sohbet dosyası yolu
+        workers: 1'den büyükse dosya iter_messages_parallel ile paralel ayrıştırılır
+
+    Returns:
+        tuple: ({'i': [...], 'ç': [...], 'unknown': [...]}, son yazar)
+    """
+    messages = {
+        "i": [],
+        "ç": []
+    }
+    last_author = None
+
+    records = iter_messages_parallel(loc, workers=workers) if workers != 1 else iter_messages(loc)
+    for record in records:
+        last_author = record.author  # <-- en son görülen yazarı tut
+        key = author_key(record.author)
+        if key == "unknown":
+            messages.setdefault("unknown", []).append(record.text)
+        else:
+            messages[key].append(record.text)
 
     print(f"İrem mesaj sayısı: {len(messages.get('i', []))}") 
     print(f"Çağın mesaj sayısı: {len(messages.get('ç', []))}")
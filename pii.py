@@ -1,40 +1,246 @@
 import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+NUMBER_PATTERN = r'\d+'
+# Yerel kısım yalnızca bir karakter dizisinin başında başlayabilir; böylece uzun dizilerde
+# her konumdan yeniden deneme (karesel geri izleme) olmaz. Eşleşmeler öncekiyle aynıdır.
+EMAIL_PATTERN = r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+URL_PATTERN = r'http[s]?://\S+'
+DATE_PATTERN = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'
+TIME_PATTERN = r'\b\d{1,2}:\d{2}(?:\s?[APMapm]{2})?\b'
+PHONE_PATTERN = r'\b(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}\b'
+ADDRESS_PATTERN = r'(?<!\d)\d+\s+[A-Za-z]+\s+(?:Street|St|Avenue|Ave|Boulevard|Blvd|Road|Rd|Lane|Ln|Drive|Dr)\b'
+# 13-16 hane, haneler arasında en fazla bir boşluk/tire; Luhn kontrolü eşleşmeden sonra yapılır
+CREDIT_CARD_PATTERN = r'\b\d(?:[ -]?\d){12,15}\b'
+IP_PATTERN = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
+SSN_PATTERN = r'\b\d{3}-\d{2}-\d{4}\b'
+LICENSE_PLATE_PATTERN = r'\b[A-Z0-9]{1,7}\b'
+IBAN_PATTERN = r'\b[A-Z]{2}\d{2}(?:\s?\d{4}){4,7}\b'
+MEDIA_PATTERN = r'<Medya dahil edilmedi>'
+
+RE_NUMBER = re.compile(NUMBER_PATTERN)
+RE_EMAIL = re.compile(EMAIL_PATTERN)
+RE_URL = re.compile(URL_PATTERN)
+RE_DATE = re.compile(DATE_PATTERN)
+RE_TIME = re.compile(TIME_PATTERN)
+RE_PHONE = re.compile(PHONE_PATTERN)
+RE_ADDRESS = re.compile(r'(?<!\d)\d+\s+[A-Za-z]+\s+(Street|St|Avenue|Ave|Boulevard|Blvd|Road|Rd|Lane|Ln|Drive|Dr)\b')
+RE_CREDIT_CARD = re.compile(CREDIT_CARD_PATTERN)
+RE_IP = re.compile(IP_PATTERN)
+RE_SSN = re.compile(SSN_PATTERN)
+RE_LICENSE_PLATE = re.compile(LICENSE_PLATE_PATTERN)
+
+def luhn_valid(number: str) -> bool:
+    """Kart numarasının Luhn sağlama toplamını doğrular (boşluk/tire yok sayılır)"""
+    digits = [int(c) for c in number if c.isdigit()]
+    if not 13 <= len(digits) <= 16:
+        return False
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+def ip_valid(address: str) -> bool:
+    """IPv4 adresinin her bölümünün 0-255 aralığında olduğunu doğrular"""
+    return all(int(part) <= 255 for part in address.split("."))
 
 def extract_numbers(text):
-    return re.findall(r'\d+', text)
+    return RE_NUMBER.findall(text)
 def extract_emails(text):
-    return re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
+    return RE_EMAIL.findall(text)
 def extract_urls(text):
-    return re.findall(r'http[s]?://\S+', text)
+    return RE_URL.findall(text)
 def extract_dates(text):
-    return re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', text)
+    return RE_DATE.findall(text)
 def extract_times(text):
-    return re.findall(r'\b\d{1,2}:\d{2}(?:\s?[APMapm]{2})?\b', text)
+    return RE_TIME.findall(text)
 def extract_phone_numbers(text):
-    return re.findall(r'\b(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}\b', text)
+    return RE_PHONE.findall(text)
 def extract_addresses(text):
-    return re.findall(r'\d+\s+[A-Za-z]+\s+(Street|St|Avenue|Ave|Boulevard|Blvd|Road|Rd|Lane|Ln|Drive|Dr)\b', text)
+    return RE_ADDRESS.findall(text)
 def extract_credit_card_numbers(text):
-    return re.findall(r'\b(?:\d[ -]*?){13,16}\b', text)
+    return [m for m in RE_CREDIT_CARD.findall(text) if luhn_valid(m)]
 def extract_ip_addresses(text):
-    return re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', text)
+    return [m for m in RE_IP.findall(text) if ip_valid(m)]
 def extract_social_security_numbers(text):
-    return re.findall(r'\b\d{3}-\d{2}-\d{4}\b', text)
+    return RE_SSN.findall(text)
 def extract_license_plates(text):
-    return re.findall(r'\b[A-Z0-9]{1,7}\b', text)
+    return RE_LICENSE_PLATE.findall(text)
+
+# Tek taramalı motorun desenleri, öncelik sırasıyla: aynı konumda önce gelen kazanır.
+# (tip, desen, extract_all_pii anahtarı)
+PII_TYPES = [
+    ("media", MEDIA_PATTERN, None),
+    ("url", URL_PATTERN, "urls"),
+    ("email", EMAIL_PATTERN, "emails"),
+    ("iban", IBAN_PATTERN, "ibans"),
+    ("credit_card", CREDIT_CARD_PATTERN, "credit_card_numbers"),
+    ("ssn", SSN_PATTERN, "social_security_numbers"),
+    ("ip", IP_PATTERN, "ip_addresses"),
+    ("date", DATE_PATTERN, "dates"),
+    ("phone", PHONE_PATTERN, "phone_numbers"),
+    ("time", TIME_PATTERN, "times"),
+    ("address", ADDRESS_PATTERN, "addresses"),
+    ("number", NUMBER_PATTERN, "numbers"),
+    ("license_plate", LICENSE_PLATE_PATTERN, "license_plates"),
+]
+
+# Eşleşme sonrası doğrulama; geçemeyen parça daha düşük öncelikli tiplerle yeniden taranır
+VALIDATORS = {
+    "credit_card": luhn_valid,
+    "ip": ip_valid,
+}
+
+class PIISpan(NamedTuple):
+    """Metinde bulunan tipli PII parçası"""
+    type: str
+    start: int
+    end: int
+    value: str
+
+class PIIEngine:
+    """
+    Tüm PII desenlerini adlandırılmış gruplarla tek bir tarayıcıda birleştirir.
+
+    Her mesaj bir kez taranır; bulunan parçalar çakışmaz (aynı konumda
+    öncelik sırasında önce gelen tip kazanır). Aynı tarama hem çıkarma hem
+    maskeleme için kullanılır.
+
+    Args:
+        types: (tip, desen, extract_all_pii anahtarı) listesi, öncelik sırasıyla
+    """
+
+    def __init__(self, types: Optional[List[Tuple[str, str, Optional[str]]]] = None):
+        self.types = types or PII_TYPES
+        self.scanner = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in self.types))
+        self.keys = {name: key for name, _, key in self.types if key}
+        self._fallbacks = {}
+
+    def _fallback(self, kind: str) -> Optional["PIIEngine"]:
+        """Doğrulamayı geçemeyen parça için kind'dan sonraki tiplerle bir motor"""
+        if kind not in self._fallbacks:
+            names = [t[0] for t in self.types]
+            rest = self.types[names.index(kind) + 1:]
+            self._fallbacks[kind] = PIIEngine(rest) if rest else None
+        return self._fallbacks[kind]
+
+    def _iter_spans(self, text: str, offset: int = 0):
+        """(tip, başlangıç, bitiş) üçlülerini sırayla üretir; doğrulamayı uygular"""
+        for m in self.scanner.finditer(text):
+            kind = m.lastgroup
+            validator = VALIDATORS.get(kind)
+            if validator is not None and not validator(m.group()):
+                fallback = self._fallback(kind)
+                if fallback is not None:
+                    yield from fallback._iter_spans(m.group(), offset + m.start())
+                continue
+            yield kind, offset + m.start(), offset + m.end()
+
+    def scan(self, text: str) -> List[PIISpan]:
+        """
+        Metni tek geçişte tarar.
+
+        Args:
+            text: Taranacak metin
+
+        Returns:
+            List[PIISpan]: Offset sırasıyla tipli parçalar
+        """
+        return [PIISpan(kind, start, end, text[start:end]) for kind, start, end in self._iter_spans(text)]
+
+    def extract(self, text: str, spans: Optional[List[PIISpan]] = None) -> Dict[str, List[str]]:
+        """
+        extract_all_pii formatında tip başına değer listesi döndürür.
+
+        Args:
+            text: Metin
+            spans: Önceden hesaplanmış scan() çıktısı (verilmezse tarama yapılır)
+
+        Returns:
+            Dict[str, List[str]]: Anahtar -> bulunan değerler
+        """
+        out = {key: [] for key in self.keys.values()}
+        for span in (spans if spans is not None else self.scan(text)):
+            key = self.keys.get(span.type)
+            if key:
+                out[key].append(span.value)
+        return out
+
+    def mask(self, text: str, replacements: Dict[str, str]) -> str:
+        """
+        Verilen tiplerdeki parçaları tek geçişte değiştirir.
+
+        Args:
+            text: Metin
+            replacements: tip -> yerine konulacak metin (listede olmayan tipler korunur)
+
+        Returns:
+            str: Maskelenmiş metin
+        """
+        return self.scan_and_mask(text, replacements)[0]
+
+    def scan_and_mask(self, text: str, replacements: Dict[str, str]) -> Tuple[str, List[PIISpan]]:
+        """
+        Tek taramada hem parçaları hem maskelenmiş metni üretir.
+
+        Args:
+            text: Metin
+            replacements: tip -> yerine konulacak metin
+
+        Returns:
+            Tuple[str, List[PIISpan]]: (maskelenmiş metin, orijinal metne göre parçalar)
+        """
+        spans = []
+        pieces = []
+        last = 0
+        for kind, start, end in self._iter_spans(text):
+            spans.append(PIISpan(kind, start, end, text[start:end]))
+            if kind in replacements:
+                pieces.append(text[last:start])
+                pieces.append(replacements[kind])
+                last = end
+        pieces.append(text[last:])
+        return "".join(pieces), spans
+
+    def scan_batch(self, messages) -> List[List[PIISpan]]:
+        """Metin listesi veya MessageTable için scan()"""
+        return [self.scan(text) for text in _iter_texts(messages)]
+
+    def extract_batch(self, messages) -> List[Dict[str, List[str]]]:
+        """Metin listesi veya MessageTable için extract()"""
+        return [self.extract(text) for text in _iter_texts(messages)]
+
+    def mask_batch(self, messages, replacements: Dict[str, str]) -> List[str]:
+        """Metin listesi veya MessageTable için mask()"""
+        return [self.mask(text, replacements) for text in _iter_texts(messages)]
+
+def _iter_texts(messages) -> Iterable[str]:
+    """MessageTable ya da metin listesini metin akışına çevirir"""
+    if hasattr(messages, "texts") and callable(messages.texts):
+        return messages.texts()
+    return messages
+
+_ENGINE = None
+
+def get_pii_engine() -> PIIEngine:
+    """Paylaşılan PII motorunu döndürür (ilk çağrıda derlenir)"""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = PIIEngine()
+    return _ENGINE
+
+def scan_pii(text: str) -> List[PIISpan]:
+    """Metindeki tipli PII parçalarını offset'leriyle döndürür"""
+    return get_pii_engine().scan(text)
 
 def extract_all_pii(text):
-    pii_data = {
-        "numbers": extract_numbers(text),
-        "emails": extract_emails(text),
-        "urls": extract_urls(text),
-        "dates": extract_dates(text),
-        "times": extract_times(text),
-        "phone_numbers": extract_phone_numbers(text),
-        "addresses": extract_addresses(text),
-        "credit_card_numbers": extract_credit_card_numbers(text),
-        "ip_addresses": extract_ip_addresses(text),
-        "social_security_numbers": extract_social_security_numbers(text),
-        "license_plates": extract_license_plates(text)
-    }
-    return pii_data
+    # Tek geçişli tarama: her karakter en fazla bir tipe atanır
+    return get_pii_engine().extract(text)
+
+def extract_all_pii_batch(messages) -> List[Dict[str, List[str]]]:
+    """Metin listesi veya MessageTable için extract_all_pii"""
+    return get_pii_engine().extract_batch(messages)
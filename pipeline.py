@@ -0,0 +1,316 @@
+"""
+Etkileşimsiz Akış Hattı (Streaming Pipeline)
+main.py'deki ayrıştırma, temizleme, NER, duygu analizi ve istatistik
+aşamalarını girdi sormadan, akış halinde çalıştırır.
+
+Aşamalar sınırlı kuyruklarla bağlı üç iş parçacığında çalışır (üçüncüsü çağıran iş parçacığıdır):
+    1. ayrıştırma + temizleme (+ birleşik analizde bir sonraki batch'in tokenizasyonu)
+    2. model çıkarımı (NER ve duygu)
+    3. istatistik biriktirme ve JSONL dışa aktarım
+Kuyruklar dolduğunda önceki aşama bekler (geri basınç); bellekte en fazla
+birkaç batch bulunur, bellek kullanımı girdi boyutundan bağımsızdır.
+
+Kullanım:
+    python pipeline.py data.txt --output sonuclar.jsonl [--stats istatistik.json] [--stages ner,sentiment]
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from config import get_config
+from parser import ChatMessage, author_key, iter_messages, sanitize_stream
+
+STAGES = ("ner", "sentiment")
+# Kuyruk sonu işareti
+_DONE = object()
+
+class PipelineError(RuntimeError):
+    """Bir aşama hata verdiğinde hat durdurulur ve hata bu istisnayla bildirilir"""
+
+def _iter_batches(records: Iterator[ChatMessage], size: int) -> Iterator[List[ChatMessage]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class _Stage(threading.Thread):
+    """Hatayı saklayan ve durdurma olayını tetikleyen aşama iş parçacığı"""
+
+    def __init__(self, name: str, target, stop: threading.Event):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self.stop = stop
+        self.error = None
+
+    def run(self):
+        try:
+            self._target_fn()
+        except BaseException as e:
+            self.error = e
+            self.stop.set()
+
+def _put(q: queue.Queue, item, stop: threading.Event):
+    """Kuyruk doluysa bekler (geri basınç); hat durdurulduysa bırakır"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def _word_accumulator(config: Dict):
+    """Kelime sıklığı biriktiricisi: kesin sayım ya da config'deki özet kipi"""
+    from analysis_statistics import WordCountAccumulator, WordSketchAccumulator
+
+    stats_config = config.get("statistics", {})
+    mode = stats_config.get("word_frequency_mode", "exact")
+    if mode == "exact":
+        return WordCountAccumulator()
+    # Akışta toplam mesaj sayısı baştan bilinmez; "auto" sınırlı bellekli özete karşılık gelir
+    return WordSketchAccumulator(
+        "space_saving" if mode == "auto" else mode,
+        epsilon=stats_config.get("sketch_epsilon", 1e-4),
+        delta=stats_config.get("sketch_delta", 0.01),
+        capacity=stats_config.get("sketch_capacity")
+    )
+
+class StreamingPipeline:
+    """
+    Sohbet dosyasını sınırlı kuyruklu üç aşamalı hatta işler.
+
+    Args:
+        path: Sohbet dosyası
+        stages: Çalıştırılacak model aşamaları ("ner", "sentiment")
+        output: Mesaj başına bir JSON satırı yazılacak dosya (None ise yazılmaz)
+        batch_messages: Aşamalar arasında taşınan batch'in mesaj sayısı
+        queue_size: Her kuyruktaki en fazla batch sayısı
+        config: Yapılandırma (None ise config.json)
+    """
+
+    def __init__(self, path: str, stages: Sequence[str] = STAGES, output: Optional[str] = None,
+                 batch_messages: int = 256, queue_size: int = 4, config: Optional[Dict] = None):
+        self.path = path
+        self.stages = [stage for stage in STAGES if stage in stages]
+        self.output = output
+        self.batch_messages = batch_messages
+        self.queue_size = queue_size
+        self.config = config if config is not None else get_config()
+        self.stats = {"messages": 0, "batches": 0, "seconds": 0.0, "stage_seconds": {}}
+
+    def _use_joint(self) -> bool:
+        from joint import joint_available
+        return (set(self.stages) == set(STAGES) and self.config.get("joint", {}).get("enabled", True)
+                and joint_available())
+
+    def _parse(self, out: queue.Queue, stop: threading.Event, pre_tokenize: bool):
+        """Aşama 1: ayrıştırma, temizleme ve (birleşik analizde) tokenizasyon"""
+        encode = None
+        if pre_tokenize:
+            from joint import encode_texts as encode
+        pii = self.config.get("pii", {})
+        records = sanitize_stream(iter_messages(self.path), mask_emails=pii.get("mask_emails", False),
+                                  mask_phones=pii.get("mask_phone_numbers", False))
+        started = time.perf_counter()
+        waited = 0.0
+        for batch in _iter_batches(records, self.batch_messages):
+            # Tokenizasyon çıkarım iş parçacığı önceki batch'i hesaplarken yapılır
+            encoded = encode([r.text for r in batch]) if encode is not None else None
+            blocked = time.perf_counter()
+            if not _put(out, (batch, encoded), stop):
+                break
+            waited += time.perf_counter() - blocked
+        # Kuyrukta bekleme (geri basınç) süresi hariç
+        self.stats["stage_seconds"]["parse"] = time.perf_counter() - started - waited
+        _put(out, _DONE, stop)
+
+    def _infer(self, source: queue.Queue, out: queue.Queue, stop: threading.Event, joint: bool):
+        """Aşama 2: model çıkarımı"""
+        ner_config = self.config.get("ner", {})
+        batch_size = ner_config.get("batch_size", 32)
+        max_tokens = ner_config.get("max_tokens", 4096)
+        busy = 0.0
+        while True:
+            item = _get(source, stop)
+            if item is _DONE:
+                break
+            batch, encoded = item
+            texts = [r.text for r in batch]
+            started = time.perf_counter()
+            results = {}
+            if joint:
+                from joint import analyze_joint
+                records = analyze_joint(texts, batch_size, max_tokens, encoded=encoded)
+                results["ner"] = [r["ents"] for r in records]
+                results["sentiment"] = [r["sentiment"] for r in records]
+            else:
+                if "ner" in self.stages:
+                    from NER import apply_ner_batch
+                    results["ner"] = apply_ner_batch(texts, batch_size, max_tokens)
+                if "sentiment" in self.stages:
+                    from sentiment import analyze_sentiments_with_status
+                    results["sentiment"] = analyze_sentiments_with_status(texts)
+            busy += time.perf_counter() - started
+            if not _put(out, (batch, results), stop):
+                break
+        self.stats["stage_seconds"]["inference"] = busy
+        _put(out, _DONE, stop)
+
+    def _collect(self, source: queue.Queue, stop: threading.Event) -> Dict[str, Dict]:
+        """Aşama 3: yazar başına istatistik biriktirme ve JSONL dışa aktarım"""
+        from analysis_statistics import (EntityStatisticsAccumulator, MessageStatisticsAccumulator,
+                                         SentimentStatisticsAccumulator)
+        from export import JsonlWriter
+
+        accumulators = {}
+        busy = 0.0
+        # .gz/.zst uzantılı çıktı sıkıştırılarak yazılır
+        sink = JsonlWriter(self.output) if self.output else None
+        try:
+            while True:
+                item = _get(source, stop)
+                if item is _DONE:
+                    break
+                batch, results = item
+                started = time.perf_counter()
+                by_author = {}
+                for i, record in enumerate(batch):
+                    row = {
+                        "line": record.line,
+                        "timestamp": record.timestamp.isoformat() if record.timestamp else None,
+                        "author": author_key(record.author),
+                        "text": record.text,
+                    }
+                    if "ner" in results:
+                        row["ents"] = results["ner"][i]
+                    if "sentiment" in results:
+                        row["sentiment"] = results["sentiment"][i]
+                    by_author.setdefault(row["author"], []).append(row)
+                    if sink is not None:
+                        sink.write(row)
+
+                for author, rows in by_author.items():
+                    accs = accumulators.get(author)
+                    if accs is None:
+                        accs = accumulators[author] = {
+                            "messages": MessageStatisticsAccumulator(),
+                            "words": _word_accumulator(self.config),
+                        }
+                        if "ner" in self.stages:
+                            accs["entities"] = EntityStatisticsAccumulator()
+                        if "sentiment" in self.stages:
+                            accs["sentiment"] = SentimentStatisticsAccumulator()
+                    texts = [row["text"] for row in rows]
+                    accs["messages"].update(texts)
+                    accs["words"].update(texts)
+                    if "entities" in accs:
+                        accs["entities"].update(rows)
+                    if "sentiment" in accs:
+                        accs["sentiment"].update(rows)
+                self.stats["messages"] += len(batch)
+                self.stats["batches"] += 1
+                busy += time.perf_counter() - started
+        finally:
+            if sink is not None:
+                sink.close()
+        self.stats["stage_seconds"]["collect"] = busy
+        return accumulators
+
+    def run(self) -> Dict[str, Dict]:
+        """
+        Hattı çalıştırır.
+
+        Returns:
+            Dict: Yazar başına {'messages', 'words', 'entities', 'sentiment'} istatistikleri
+                (entities ve sentiment yalnızca ilgili aşama çalıştıysa)
+
+        Raises:
+            PipelineError: Bir aşama hata verdiyse
+        """
+        started = time.perf_counter()
+        joint = self._use_joint() if self.stages else False
+        stop = threading.Event()
+        parsed = queue.Queue(maxsize=self.queue_size)
+        inferred = queue.Queue(maxsize=self.queue_size)
+        workers = [
+            _Stage("parse", lambda: self._parse(parsed, stop, joint), stop),
+            _Stage("inference", lambda: self._infer(parsed, inferred, stop, joint), stop),
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            accumulators = self._collect(inferred, stop)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+        errors = [w for w in workers if w.error is not None]
+        if errors:
+            raise PipelineError(f"{errors[0].name} aşaması hata verdi: {errors[0].error}") from errors[0].error
+        self.stats["seconds"] = time.perf_counter() - started
+
+        statistics = {}
+        for author, accs in accumulators.items():
+            statistics[author] = {
+                name: acc.result(10) if name == "words" else acc.result() for name, acc in accs.items()
+            }
+        return statistics
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Sohbet dosyasını etkileşimsiz, akış halinde analiz eder")
+    arg_parser.add_argument("path", help="Sohbet dosyası (data.txt)")
+    arg_parser.add_argument("--output", help="Mesaj başına bir JSON satırı yazılacak dosya")
+    arg_parser.add_argument("--stats", help="İstatistiklerin yazılacağı JSON dosyası")
+    arg_parser.add_argument("--stages", default=",".join(STAGES),
+                            help="Virgülle ayrılmış model aşamaları: ner,sentiment (boş: yalnızca istatistik)")
+    arg_parser.add_argument("--batch-messages", type=int, default=256)
+    arg_parser.add_argument("--queue-size", type=int, default=4)
+    args = arg_parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        arg_parser.error(f"Bilinmeyen aşama: {', '.join(unknown)}")
+
+    pipeline = StreamingPipeline(args.path, stages, args.output, args.batch_messages, args.queue_size)
+    try:
+        statistics = pipeline.run()
+    except KeyboardInterrupt:
+        print("\nDurduruldu.")
+        return 130
+    except (PipelineError, FileNotFoundError) as e:
+        print(f"Hata: {e}")
+        return 1
+
+    stats = pipeline.stats
+    print(f"{stats['messages']} mesaj, {stats['batches']} batch, {stats['seconds']:.1f} sn")
+    print("Aşama süreleri: " + ", ".join(f"{k} {v:.1f} sn" for k, v in stats["stage_seconds"].items()))
+    for author, author_stats in statistics.items():
+        print(f"  {author}: {author_stats['messages'].get('total_messages', 0)} mesaj")
+
+    if args.stats:
+        from cache import _to_builtin
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump(_to_builtin(statistics), f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,27 +2,34 @@
 Duygu Analizi (Sentiment Analysis) Modülü
 Türkçe metinler için duygu analizi yapar.
 """
-from transformers import pipeline
+import math
+import time
 from typing import Dict, List, Optional
+from models import get_pipeline, plan_batches, current_rss_mb
+from cache import cached_inference
+from inference_server import remote_inference
 
-# Türkçe sentiment analysis modeli
-_sentiment_analyzer = None
+# Her duygu sonucunun durumu
+STATUS_SCORED = "scored"    # ilk denemede skorlandı (veya önbellekten geldi)
+STATUS_RETRIED = "retried"  # batch hatası sonrası bölünmüş batch'te skorlandı
+STATUS_FAILED = "failed"    # tek başına da skorlanamadı; label None, hata 'error' alanında
+
+# Config'deki model yüklenemezse kullanılan genel model
+_fallback_analyzer = None
 
 def get_sentiment_analyzer():
-    """Sentiment analyzer'ı lazy load et"""
-    global _sentiment_analyzer
-    if _sentiment_analyzer is None:
-        # Türkçe için uygun bir model kullanılabilir
-        # Alternatif: "savasy/bert-base-turkish-sentiment-cased"
-        try:
-            _sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="savasy/bert-base-turkish-sentiment-cased"
-            )
-        except:
-            # Fallback: Genel bir model
-            _sentiment_analyzer = pipeline("sentiment-analysis")
-    return _sentiment_analyzer
+    """Sentiment analyzer'ı model kaydından (registry) lazy load et"""
+    global _fallback_analyzer
+    if _fallback_analyzer is not None:
+        return _fallback_analyzer
+    try:
+        # Model adı config.json'daki sentiment.model_name değerinden gelir
+        return get_pipeline("sentiment")
+    except Exception:
+        # Fallback: Genel bir model
+        from transformers import pipeline
+        _fallback_analyzer = pipeline("sentiment-analysis")
+        return _fallback_analyzer
 
 def analyze_sentiment(text: str) -> Dict:
     """
@@ -34,12 +41,10 @@ def analyze_sentiment(text: str) -> Dict:
     Returns:
         Dict: {'label': 'POSITIVE'/'NEGATIVE', 'score': float}
     """
-    analyzer = get_sentiment_analyzer()
-    result = analyzer(text)[0]
-    return {
-        'label': result['label'],
-        'score': result['score']
-    }
+    remote = remote_inference("sentiment", [text])
+    if remote is not None:
+        return _without_status(remote)[0]
+    return cached_inference("sentiment", [text], _run_sentiments, store_if=_uses_configured_model)[0]
 
 def analyze_sentiments(texts: List[str]) -> List[Dict]:
     """
@@ -51,6 +56,21 @@ def analyze_sentiments(texts: List[str]) -> List[Dict]:
     Returns:
         List[Dict]: Her metin için duygu analizi sonucu
     """
+    remote = remote_inference("sentiment", texts)
+    if remote is not None:
+        return _without_status(remote)
+    return cached_inference("sentiment", texts, _run_sentiments, store_if=_uses_configured_model)
+
+def _without_status(results: List[Dict]) -> List[Dict]:
+    """Sunucunun durumlu sonuçlarını analyze_sentiments formatına çevirir"""
+    return [{'label': r['label'], 'score': r['score']} for r in results]
+
+def _uses_configured_model() -> bool:
+    """Yedek model devredeyse sonuçlar önbelleğe yazılmaz"""
+    return _fallback_analyzer is None
+
+def _run_sentiments(texts: List[str]) -> List[Dict]:
+    """Önbelleksiz toplu duygu analizi"""
     analyzer = get_sentiment_analyzer()
     results = analyzer(texts)
     return [
@@ -58,31 +78,198 @@ def analyze_sentiments(texts: List[str]) -> List[Dict]:
         for r in results
     ]
 
+def _sentiment_settings() -> Dict:
+    """config.json'daki sentiment ayarları (batch boyutu "auto" ise ayar ölçümle seçilir)"""
+    from config import get_sentiment_config
+    return get_sentiment_config()
+
+def _token_lengths(tokenizer, texts: List[str]) -> List[int]:
+    """Metinlerin token uzunlukları (model sınırında kesilmiş)"""
+    max_len = tokenizer.model_max_length if tokenizer.model_max_length < 100000 else 512
+    return [len(ids) for ids in tokenizer(texts, truncation=True, max_length=max_len)["input_ids"]]
+
+_autotune_result = None
+
+def autotune_sentiment_batch(sample_texts: List[str], max_batch_size: int = 128,
+                             memory_budget_mb: Optional[float] = None, min_gain: float = 0.05) -> Dict:
+    """
+    Bu makine için duygu analizi batch boyutunu ve token bütçesini ölçerek seçer.
+
+    Örnek metinler 1, 2, 4, ... boyutlu batch'lerle skorlanır; her denemede
+    saniyedeki mesaj sayısı ve RSS artışı ölçülür. Verim min_gain'den az
+    arttığında, bellek bütçesi aşıldığında ya da batch hata verdiğinde durulur.
+    Sonuç süreç içinde saklanır; sonraki çağrılar yeniden ölçmez.
+
+    Args:
+        sample_texts: Gerçek iş yükünden örnek metinler
+        max_batch_size: Denenecek en büyük batch boyutu
+        memory_budget_mb: Ölçüm sırasında izin verilen en fazla RSS artışı (None ise sınırsız)
+        min_gain: Bir sonraki boyuta geçmek için gereken en az göreli verim artışı
+
+    Returns:
+        Dict: {'batch_size', 'max_tokens', 'throughput', 'rss_delta_mb', 'trials'}
+    """
+    global _autotune_result
+    if _autotune_result is not None:
+        return _autotune_result
+
+    analyzer = get_sentiment_analyzer()
+    sample = [t for t in sample_texts if t and t.strip()] or ["Bu harika bir gün!"]
+    lengths = _token_lengths(analyzer.tokenizer, sample)
+    analyzer(sample[:1])  # ısınma; ilk çağrının kurulum maliyeti ölçüme katılmaz
+
+    rss_base = current_rss_mb()
+    trials = []
+    best = None
+    batch_size = 1
+    while batch_size <= max_batch_size:
+        # Her boyut en az iki batch ve örneğin tamamı kadar mesajla ölçülür
+        count = max(len(sample), 2 * batch_size)
+        texts = [sample[i % len(sample)] for i in range(count)]
+        started = time.perf_counter()
+        try:
+            for i in range(0, count, batch_size):
+                analyzer(texts[i:i + batch_size], batch_size=batch_size)
+        except Exception as e:
+            trials.append({'batch_size': batch_size, 'error': f"{type(e).__name__}: {e}"})
+            break
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        trial = {
+            'batch_size': batch_size,
+            'throughput': count / elapsed,
+            'rss_delta_mb': max(current_rss_mb() - rss_base, 0.0)
+        }
+        trials.append(trial)
+        if memory_budget_mb is not None and trial['rss_delta_mb'] > memory_budget_mb:
+            break
+        if best is not None and trial['throughput'] < best['throughput'] * (1 + min_gain):
+            break
+        best = trial
+        batch_size *= 2
+
+    if best is None:
+        best = {'batch_size': 1, 'throughput': 0.0, 'rss_delta_mb': 0.0}
+    # Token bütçesi: seçilen boyutta, örneklerin %90'ından uzun olmayan mesajlarla dolu bir batch
+    p90 = sorted(lengths)[int(0.9 * (len(lengths) - 1))]
+    _autotune_result = dict(best, max_tokens=best['batch_size'] * max(p90, 1), trials=trials)
+    return _autotune_result
+
+def _batch_limits(texts: List[str], batch_size: Optional[int], max_tokens: Optional[int]):
+    """Verilmeyen batch boyutunu ve token bütçesini config'den alır; "auto" ise texts örneğiyle ölçer"""
+    if batch_size is not None and max_tokens is not None:
+        return batch_size, max_tokens
+    settings = _sentiment_settings()
+    configured = settings.get("batch_size", "auto")
+    if configured == "auto":
+        tuned = autotune_sentiment_batch(
+            texts[:settings.get("autotune_sample_size", 64)],
+            max_batch_size=settings.get("autotune_max_batch_size", 128),
+            memory_budget_mb=settings.get("autotune_memory_mb")
+        )
+        batch_size = batch_size or tuned['batch_size']
+        return batch_size, max_tokens or settings.get("max_tokens") or tuned['max_tokens']
+    batch_size = batch_size or configured
+    return batch_size, max_tokens or settings.get("max_tokens") or batch_size * 512
+
+def analyze_sentiments_with_status(texts: List[str], batch_size: Optional[int] = None,
+                                   max_tokens: Optional[int] = None) -> List[Dict]:
+    """
+    Hiçbir mesajı sessizce düşürmeyen toplu duygu analizi.
+
+    Mesajlar token uzunluğuna göre batch'lere ayrılır. Bir batch hata verirse
+    ikiye bölünerek yeniden denenir; böylece yalnızca hatalı mesaj ayrılır,
+    batch'in geri kalanı tek tek işlenmez. Batch boyutu verilmezse config'den
+    alınır; "auto" ise autotune_sentiment_batch ile bu makine için ölçülür.
+    Ölçüm yalnızca önbellekte olmayan mesajlar varsa yapılır.
+
+    Args:
+        texts: Analiz edilecek metin listesi
+        batch_size: Bir batch'teki en fazla mesaj sayısı
+        max_tokens: Bir batch'in doldurulmuş toplam token bütçesi
+
+    Returns:
+        List[Dict]: Her metin için {'label', 'score', 'status'}; status
+            "scored", "retried" veya "failed" (failed ise label None ve 'error' dolu)
+    """
+    remote = remote_inference("sentiment", texts)
+    if remote is not None:
+        return remote
+
+    statuses = {}
+
+    def compute(misses: List[str]) -> List[Optional[Dict]]:
+        # Batch limitleri yalnızca önbellekte olmayan metinler varsa belirlenir (gerekirse ölçülür)
+        if not misses:
+            return []
+        size, budget = _batch_limits(misses, batch_size, max_tokens)
+        return _run_sentiments_bisecting(misses, size, budget, statuses)
+
+    results = cached_inference("sentiment", texts, compute, store_if=_uses_configured_model)
+
+    out = []
+    for text, result in zip(texts, results):
+        status, error = statuses.get(text, (STATUS_SCORED, None))
+        if result is None:
+            out.append({'label': None, 'score': 0.0, 'status': STATUS_FAILED, 'error': error})
+        else:
+            out.append(dict(result, status=status))
+    return out
+
+def _run_sentiments_bisecting(texts: List[str], batch_size: int, max_tokens: int, statuses: Dict) -> List[Optional[Dict]]:
+    """Önbelleksiz çekirdek; hatalı batch'leri ikiye bölerek yeniden dener, durumu statuses'a yazar"""
+    analyzer = get_sentiment_analyzer()
+    results = [None] * len(texts)
+    lengths = _token_lengths(analyzer.tokenizer, texts) if texts else []
+
+    def score(indices: List[int], retried: bool):
+        try:
+            outputs = analyzer([texts[i] for i in indices], batch_size=len(indices))
+        except Exception as e:
+            if len(indices) == 1:
+                statuses[texts[indices[0]]] = (STATUS_FAILED, f"{type(e).__name__}: {e}")
+                return
+            mid = len(indices) // 2
+            score(indices[:mid], True)
+            score(indices[mid:], True)
+            return
+        for i, r in zip(indices, outputs):
+            results[i] = {'label': r['label'], 'score': r['score']}
+            statuses[texts[i]] = (STATUS_RETRIED if retried else STATUS_SCORED, None)
+
+    for batch in plan_batches(lengths, batch_size, max_tokens):
+        score(batch, False)
+    return results
+
 def get_sentiment_statistics(messages: List[Dict]) -> Dict:
     """
     Mesajlar için duygu istatistikleri hesaplar.
     
     Args:
-        messages: {'text': str, 'sentiment': Dict} formatında mesaj listesi
+        messages: {'text': str, 'sentiment': Dict} formatında mesaj listesi veya MessageTable
         
     Returns:
         Dict: Duygu istatistikleri
     """
-    if not messages:
+    if not len(messages):
         return {}
     
+    from message_table import MessageTable
+    if isinstance(messages, MessageTable):
+        return _table_sentiment_statistics(messages)
+    
     positive_count = sum(1 for m in messages 
                         if m.get('sentiment', {}).get('label') == 'POSITIVE')
     negative_count = sum(1 for m in messages 
                         if m.get('sentiment', {}).get('label') == 'NEGATIVE')
     
     total = len(messages)
-    avg_positive_score = sum(m.get('sentiment', {}).get('score', 0) 
-                            for m in messages 
-                            if m.get('sentiment', {}).get('label') == 'POSITIVE') / max(positive_count, 1)
-    avg_negative_score = sum(m.get('sentiment', {}).get('score', 0) 
-                            for m in messages 
-                            if m.get('sentiment', {}).get('label') == 'NEGATIVE') / max(negative_count, 1)
+    # fsum toplama sırasından bağımsızdır; parça parça biriktirilen sonuçlarla birebir aynı kalır
+    avg_positive_score = math.fsum(m.get('sentiment', {}).get('score', 0) 
+                                   for m in messages 
+                                   if m.get('sentiment', {}).get('label') == 'POSITIVE') / max(positive_count, 1)
+    avg_negative_score = math.fsum(m.get('sentiment', {}).get('score', 0) 
+                                   for m in messages 
+                                   if m.get('sentiment', {}).get('label') == 'NEGATIVE') / max(negative_count, 1)
     
     return {
         'total_messages': total,
@@ -93,3 +280,30 @@ def get_sentiment_statistics(messages: List[Dict]) -> Dict:
         'avg_positive_score': avg_positive_score,
         'avg_negative_score': avg_negative_score
     }
+
+def _table_sentiment_statistics(table) -> Dict:
+    """get_sentiment_statistics'in MessageTable sürümü (NumPy maskeleriyle)"""
+    import numpy as np
+
+    total = len(table)
+    positive = np.zeros(total, dtype=bool)
+    negative = np.zeros(total, dtype=bool)
+    if table.has_sentiment:
+        for code, label in enumerate(table.sentiment_labels):
+            if label == 'POSITIVE':
+                positive |= table.sentiment_codes == code
+            elif label == 'NEGATIVE':
+                negative |= table.sentiment_codes == code
+    positive_count = int(positive.sum())
+    negative_count = int(negative.sum())
+    scores = table.sentiment_scores if table.has_sentiment else np.zeros(total)
+    
+    return {
+        'total_messages': total,
+        'positive_count': positive_count,
+        'negative_count': negative_count,
+        'positive_percentage': (positive_count / total * 100) if total > 0 else 0,
+        'negative_percentage': (negative_count / total * 100) if total > 0 else 0,
+        'avg_positive_score': math.fsum(scores[positive].tolist()) / max(positive_count, 1),
+        'avg_negative_score': math.fsum(scores[negative].tolist()) / max(negative_count, 1)
+    }
@@ -0,0 +1,269 @@
+"""
+Olasılıksal Sayım Özetleri Modülü
+Çok büyük metin yığınlarında sınırlı bellekle en sık kelimeleri bulmak için
+Space-Saving ve Count-Min özetleri sağlar. İki özet de birleştirilebilir ve
+JSON'a yazılabilir.
+"""
+import base64
+import hashlib
+import math
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+import numpy as np
+
+class WordEstimate(NamedTuple):
+    """
+    Tahmini kelime sıklığı.
+
+    Gerçek sayı [count - error, count] aralığındadır; (kelime, sayı) tuple'ı
+    gibi de kullanılabilir.
+    """
+    word: str
+    count: int
+    error: int
+
+def _top(counts: Mapping[str, int], errors: Mapping[str, int], n: int) -> List[WordEstimate]:
+    """Sayıya göre azalan ilk n tahmin (eşitlikte ilk eklenen önce, Counter.most_common gibi)"""
+    items = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+    return [WordEstimate(word, count, errors.get(word, 0)) for word, count in items]
+
+class SpaceSaving:
+    """
+    Space-Saving en sık öğe özeti (Metwally vd.).
+
+    En fazla capacity sayaç tutulur. Her tahmin gerçek sayıyı en fazla
+    n / capacity kadar aşar; öğe başına tutulan hata bu sınırı daha sıkı verir.
+    Toplu güncelleme ve birleştirme, paralel Space-Saving birleştirmesiyle
+    (izlenmeyen öğenin sayısı özetin en küçük sayacı kabul edilerek) yapılır.
+
+    Args:
+        capacity: En fazla sayaç sayısı
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity en az 1 olmalı")
+        self.capacity = capacity
+        self.n = 0
+        self.counts = {}
+        self.errors = {}
+
+    @classmethod
+    def from_error(cls, epsilon: float) -> "SpaceSaving":
+        """Hata sınırı epsilon * n olacak şekilde özet oluşturur (capacity = ceil(1 / epsilon))"""
+        return cls(int(math.ceil(1.0 / epsilon)))
+
+    @property
+    def min_count(self) -> int:
+        """İzlenmeyen bir öğenin olabileceği en büyük sayı (özet dolu değilse 0)"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    @property
+    def error_bound(self) -> float:
+        """Herhangi bir tahminin en büyük fazlası"""
+        return self.n / self.capacity
+
+    def update_counts(self, counts: Mapping[str, int]) -> "SpaceSaving":
+        """
+        Kesin sayımları (ör. bir mesaj grubunun Counter'ı) özete ekler.
+
+        Args:
+            counts: kelime -> sayı
+        """
+        self._combine(counts, {}, 0, sum(counts.values()))
+        return self
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Başka bir özeti bu özetin ardına ekler"""
+        if other.capacity != self.capacity:
+            raise ValueError("Farklı capacity ile oluşturulmuş özetler birleştirilemez")
+        self._combine(other.counts, other.errors, other.min_count, other.n)
+        return self
+
+    def _combine(self, counts: Mapping[str, int], errors: Mapping[str, int], other_min: int, other_n: int):
+        own_min = self.min_count
+        merged_counts = {}
+        merged_errors = {}
+        for word, count in self.counts.items():
+            merged_counts[word] = count + counts.get(word, other_min)
+            merged_errors[word] = self.errors[word] + errors.get(word, other_min)
+        for word, count in counts.items():
+            if word not in merged_counts:
+                merged_counts[word] = count + own_min
+                merged_errors[word] = errors.get(word, 0) + own_min
+        if len(merged_counts) > self.capacity:
+            kept = sorted(merged_counts, key=merged_counts.__getitem__, reverse=True)[:self.capacity]
+            kept = set(kept)
+            merged_counts = {w: c for w, c in merged_counts.items() if w in kept}
+            merged_errors = {w: merged_errors[w] for w in merged_counts}
+        self.counts = merged_counts
+        self.errors = merged_errors
+        self.n += other_n
+
+    def estimate(self, word: str) -> WordEstimate:
+        """Kelimenin tahmini sayısı"""
+        if word in self.counts:
+            return WordEstimate(word, self.counts[word], self.errors[word])
+        bound = self.min_count
+        return WordEstimate(word, bound, bound)
+
+    def top(self, n: int) -> List[WordEstimate]:
+        """En sık n kelime"""
+        return _top(self.counts, self.errors, n)
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'space_saving',
+            'capacity': self.capacity,
+            'n': self.n,
+            'counts': self.counts,
+            'errors': self.errors
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "SpaceSaving":
+        sketch = cls(state['capacity'])
+        sketch.n = state.get('n', 0)
+        sketch.counts = dict(state.get('counts', {}))
+        sketch.errors = dict(state.get('errors', {}))
+        return sketch
+
+def _hash_pair(words: List[str], seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Süreçten bağımsız (PYTHONHASHSEED'e bağlı olmayan) iki 32 bitlik hash"""
+    key = seed.to_bytes(8, "little")
+    digests = b"".join(hashlib.blake2b(w.encode("utf-8"), digest_size=8, key=key).digest() for w in words)
+    values = np.frombuffer(digests, dtype=np.uint64)
+    h1 = values & np.uint64(0xFFFFFFFF)
+    h2 = (values >> np.uint64(32)) | np.uint64(1)
+    return h1, h2
+
+class CountMinSketch:
+    """
+    Count-Min özeti (Cormode ve Muthukrishnan) ve en sık aday listesi.
+
+    Tahminler gerçek sayıyı hiçbir zaman azımsamaz; 1 - delta olasılıkla
+    en fazla epsilon * n kadar fazla sayar. Bellek width * depth sayaç ve
+    en fazla capacity aday kelimeyle sınırlıdır.
+
+    Args:
+        width: Satır genişliği (ceil(e / epsilon))
+        depth: Satır sayısı (ceil(ln(1 / delta)))
+        capacity: Tutulan en sık aday kelime sayısı
+        seed: Hash tohumu (birleştirilecek özetlerde aynı olmalı)
+    """
+
+    def __init__(self, width: int, depth: int, capacity: int = 1000, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.seed = seed
+        self.n = 0
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.candidates = {}
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float = 0.01, capacity: int = 1000, seed: int = 0) -> "CountMinSketch":
+        """epsilon * n hata sınırı ve 1 - delta güvenle özet oluşturur"""
+        width = int(math.ceil(math.e / epsilon))
+        depth = int(math.ceil(math.log(1.0 / delta)))
+        return cls(width, max(depth, 1), capacity, seed)
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def error_bound(self) -> float:
+        """1 - delta olasılıkla bir tahminin en büyük fazlası"""
+        return self.epsilon * self.n
+
+    def _indices(self, words: List[str]) -> np.ndarray:
+        h1, h2 = _hash_pair(words, self.seed)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def _estimates(self, words: List[str]) -> np.ndarray:
+        if not words:
+            return np.zeros(0, dtype=np.int64)
+        cols = self._indices(words)
+        return self.table[np.arange(self.depth)[:, None], cols].min(axis=0)
+
+    def update_counts(self, counts: Mapping[str, int]) -> "CountMinSketch":
+        """
+        Kesin sayımları (ör. bir mesaj grubunun Counter'ı) özete ekler.
+
+        Args:
+            counts: kelime -> sayı
+        """
+        if not counts:
+            return self
+        words = list(counts)
+        cols = self._indices(words)
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(words))
+        for row in range(self.depth):
+            np.add.at(self.table[row], cols[row], values)
+        self.n += int(values.sum())
+        self._refresh_candidates(words)
+        return self
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Başka bir özeti bu özetin ardına ekler"""
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Farklı boyut veya tohumla oluşturulmuş Count-Min özetleri birleştirilemez")
+        self.table += other.table
+        self.n += other.n
+        self._refresh_candidates(list(other.candidates))
+        return self
+
+    def _refresh_candidates(self, new_words: List[str]):
+        """Aday kelimelerin tahminlerini günceller ve en büyük capacity tanesini tutar"""
+        words = list(self.candidates)
+        words.extend(w for w in new_words if w not in self.candidates)
+        estimates = self._estimates(words)
+        if len(words) > self.capacity:
+            keep = np.sort(np.argsort(-estimates, kind="stable")[:self.capacity])
+        else:
+            keep = range(len(words))
+        self.candidates = {words[i]: int(estimates[i]) for i in keep}
+
+    def estimate(self, word: str) -> WordEstimate:
+        """Kelimenin tahmini sayısı"""
+        count = int(self._estimates([word])[0])
+        return WordEstimate(word, count, min(count, int(math.ceil(self.error_bound))))
+
+    def top(self, n: int) -> List[WordEstimate]:
+        """En sık n aday kelime"""
+        bound = int(math.ceil(self.error_bound))
+        return _top(self.candidates, {w: min(c, bound) for w, c in self.candidates.items()}, n)
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'count_min',
+            'width': self.width,
+            'depth': self.depth,
+            'capacity': self.capacity,
+            'seed': self.seed,
+            'n': self.n,
+            'table': base64.b64encode(self.table.astype("<i8").tobytes()).decode("ascii"),
+            'candidates': self.candidates
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "CountMinSketch":
+        sketch = cls(state['width'], state['depth'], state.get('capacity', 1000), state.get('seed', 0))
+        sketch.n = state.get('n', 0)
+        table = np.frombuffer(base64.b64decode(state['table']), dtype="<i8").astype(np.int64)
+        sketch.table = table.reshape(sketch.depth, sketch.width)
+        sketch.candidates = dict(state.get('candidates', {}))
+        return sketch
+
+SKETCH_TYPES = {
+    'space_saving': SpaceSaving,
+    'count_min': CountMinSketch,
+}
+
+def sketch_from_dict(state: Dict):
+    """to_dict() çıktısından uygun özet nesnesini oluşturur"""
+    return SKETCH_TYPES[state['type']].from_dict(state)
@@ -3,12 +3,14 @@ Utility Modülü
 Metin temizleme ve PII maskeleme fonksiyonları.
 """
 import re
-from pii import extract_emails, extract_phone_numbers
+from pii import extract_emails, extract_phone_numbers, get_pii_engine, _iter_texts, IBAN_PATTERN, RE_EMAIL, RE_PHONE
 
-RE_IBAN = re.compile(r'\b[A-Z]{2}\d{2}(?:\s?\d{4}){4,7}\b')  # IBAN desenini tanımlayan regex
+RE_IBAN = re.compile(IBAN_PATTERN)  # IBAN desenini tanımlayan regex
 RE_MEDIA = re.compile(r'(?m)^\s<\sMedya\s+Dahil\s+Edilmedi\s>\s\n?')  # medya mesajlarını tanımlayan desen
-RE_EMAIL = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-RE_PHONE = re.compile(r'\b(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}\b')
+
+IBAN_MASK = '**** **** **** ****'
+EMAIL_MASK = "***@***.***"
+PHONE_MASK = "***-***-****"
 
 
 def mask_iban(text: str) -> str:
@@ -22,7 +24,7 @@ def mask_iban(text: str) -> str:
         str: Maskelenmiş metin
     """
     iban_pattern = RE_IBAN  
-    masked_text = re.sub(iban_pattern, '**** **** **** ****', text)
+    masked_text = re.sub(iban_pattern, IBAN_MASK, text)
     return masked_text
 
 
@@ -39,7 +41,7 @@ def mask_media(text: str) -> str:
     return text.replace("<Medya dahil edilmedi>", "").strip()
 
 
-def mask_email(text: str, replacement: str = "***@***.***") -> str:
+def mask_email(text: str, replacement: str = EMAIL_MASK) -> str:
     """
     E-posta adreslerini maskele.
     
@@ -53,7 +55,7 @@ def mask_email(text: str, replacement: str = "***@***.***") -> str:
     return re.sub(RE_EMAIL, replacement, text)
 
 
-def mask_phone(text: str, replacement: str = "***-***-****") -> str:
+def mask_phone(text: str, replacement: str = PHONE_MASK) -> str:
     """
     Telefon numaralarını maskele.
     
@@ -79,14 +81,72 @@ def clean_text(text: str, mask_emails: bool = False, mask_phones: bool = False)
     Returns:
         str: Temizlenmiş metin
     """
-    text = mask_iban(text)
-    text = mask_media(text)
+    # IBAN, medya, e-posta, telefon ve kart numarası tam PII motoruyla tek taramada maskelenir;
+    # diğer tipler (saat, tarih, URL, ...) yerinde kalır ama bir telefonun parçası sayılmaz
+    return get_pii_engine().mask(text, mask_replacements(mask_emails, mask_phones)).strip()
+
+
+def mask_replacements(mask_emails: bool = False, mask_phones: bool = False) -> dict:
+    """
+    clean_text'in PII motoruna verdiği tip -> maske eşlemesi.
     
+    Args:
+        mask_emails: E-postaları maskele
+        mask_phones: Telefon numaralarını maskele
+        
+    Returns:
+        dict: Maskelenecek tipler ve yerine konulacak metinler
+    """
+    replacements = {"iban": IBAN_MASK, "media": ""}
     if mask_emails:
-        text = mask_email(text)
-    
+        replacements["email"] = EMAIL_MASK
     if mask_phones:
-        text = mask_phone(text)
+        # Kart numaraları telefon deseniyle parça parça eşleşmesin diye bütün olarak maskelenir
+        replacements["phone"] = PHONE_MASK
+        replacements["credit_card"] = PHONE_MASK
+    return replacements
+
+
+def clean_and_extract(text: str, mask_emails: bool = False, mask_phones: bool = False):
+    """
+    Tek taramada metni temizler ve PII parçalarını döndürür (tam PII motoruyla;
+    maskeleme clean_text ile aynıdır).
+    
+    Args:
+        text: Temizlenecek metin
+        mask_emails: E-postaları maskele
+        mask_phones: Telefon numaralarını maskele
+        
+    Returns:
+        tuple: (temizlenmiş metin, orijinal metne göre PIISpan listesi)
+    """
+    masked, spans = get_pii_engine().scan_and_mask(text, mask_replacements(mask_emails, mask_phones))
+    return masked.strip(), spans
+
+
+def clean_texts(messages, mask_emails: bool = False, mask_phones: bool = False, with_spans: bool = False):
+    """
+    Metin listesi veya MessageTable için clean_text.
+    
+    with_spans açıksa aynı tarama hem maskelemeyi hem PII parçalarını üretir
+    (clean_and_extract); çıkarma için ikinci bir tarama gerekmez.
     
-    return text
+    Args:
+        messages: Metin listesi veya MessageTable
+        mask_emails: E-postaları maskele
+        mask_phones: Telefon numaralarını maskele
+        with_spans: PII parçaları da döndürülsün mü
+        
+    Returns:
+        list: Temizlenmiş metinler; with_spans açıksa (metinler, mesaj başına PIISpan listeleri)
+    """
+    if with_spans:
+        cleaned, spans = [], []
+        for text in _iter_texts(messages):
+            masked, text_spans = clean_and_extract(text, mask_emails, mask_phones)
+            cleaned.append(masked)
+            spans.append(text_spans)
+        return cleaned, spans
+    replacements = mask_replacements(mask_emails, mask_phones)
+    return [masked.strip() for masked in get_pii_engine().mask_batch(messages, replacements)]
 
@@ -1,186 +1,353 @@
 """
 Görselleştirme Modülü
 Analiz sonuçlarını görsel olarak sunar.
+
+Grafikler önceden hesaplanmış özetlerden (etiket sayımları, histogram kovaları,
+karşılaştırma istatistikleri) çizilir; ham mesaj listeleri verilirse önce
+özetlenir. matplotlib yalnızca çizim sırasında yüklenir ve dosyaya kaydederken
+etkileşimsiz (Agg) arka uç kullanılır. render_report bir raporun tüm
+grafiklerini süreç havuzunda paralel çizer.
 """
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List
+import os
 from collections import Counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from message_table import MessageTable, as_message_list
 
+DEFAULT_SETTINGS = {
+    "figure_size": (10, 6),
+    "dpi": 300,
+    "style": "whitegrid",
+}
 # Türkçe karakter desteği için
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
+FONT_FAMILY = "DejaVu Sans"
 
-def plot_entity_distribution(messages_with_entities: List[Dict], save_path: str = None):
+def visualization_settings(config: Optional[Dict] = None) -> Dict[str, Any]:
     """
-    Entity dağılımını görselleştirir.
-    
+    Yapılandırmanın visualization bölümünden çizim ayarlarını okur.
+
     Args:
-        messages_with_entities: Entity içeren mesaj listesi
-        save_path: Kaydedilecek dosya yolu (None ise gösterir)
+        config: Yapılandırma (None ise config.json)
+
+    Returns:
+        Dict: 'figure_size' (genişlik, yükseklik), 'dpi', 'style'
     """
+    if config is None:
+        from config import get_visualization_config
+        section = get_visualization_config()
+    else:
+        section = config.get("visualization", {})
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({key: section[key] for key in DEFAULT_SETTINGS if section.get(key) is not None})
+    settings["figure_size"] = tuple(settings["figure_size"])
+    return settings
+
+# --- Özetler ---
+
+def entity_label_counts(messages_with_entities) -> Dict[str, int]:
+    """
+    Entity etiketi başına sayım.
+
+    Args:
+        messages_with_entities: Entity içeren mesaj listesi veya MessageTable
+    """
+    if isinstance(messages_with_entities, MessageTable):
+        return messages_with_entities.entity_label_counts()
     entity_counts = Counter()
-    
     for msg in messages_with_entities:
-        ents = msg.get('ents', [])
-        for ent in ents:
-            label = ent.get('entity_group') or ent.get('label') or 'UNKNOWN'
-            entity_counts[label] += 1
-    
-    if not entity_counts:
-        print("Görselleştirilecek entity bulunamadı.")
-        return
-    
-    labels = list(entity_counts.keys())
-    counts = list(entity_counts.values())
-    
-    plt.figure(figsize=(10, 6))
-    plt.bar(labels, counts, color='skyblue', edgecolor='navy', alpha=0.7)
-    plt.xlabel('Entity Tipi', fontsize=12)
-    plt.ylabel('Sayı', fontsize=12)
-    plt.title('Entity Dağılımı', fontsize=14, fontweight='bold')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Grafik kaydedildi: {save_path}")
-    else:
-        plt.show()
-    
-    plt.close()
+        for ent in msg.get('ents') or []:
+            entity_counts[ent.get('entity_group') or ent.get('label') or 'UNKNOWN'] += 1
+    return dict(entity_counts)
 
-def plot_sentiment_distribution(messages_with_sentiment: List[Dict], save_path: str = None):
+def sentiment_label_counts(messages_with_sentiment) -> Dict[str, int]:
     """
-    Duygu dağılımını görselleştirir.
-    
+    Duygu etiketi başına sayım; sonucu olmayan ya da skorlanamayan (label None) mesajlar 'UNKNOWN' sayılır.
+
     Args:
-        messages_with_sentiment: Duygu analizi içeren mesaj listesi
-        save_path: Kaydedilecek dosya yolu
+        messages_with_sentiment: Duygu analizi içeren mesaj listesi veya MessageTable
     """
+    if isinstance(messages_with_sentiment, MessageTable):
+        return messages_with_sentiment.sentiment_label_counts()
     sentiment_counts = Counter()
-    
     for msg in messages_with_sentiment:
-        sentiment = msg.get('sentiment', {})
-        label = sentiment.get('label', 'UNKNOWN')
-        sentiment_counts[label] += 1
-    
-    if not sentiment_counts:
-        print("Görselleştirilecek duygu verisi bulunamadı.")
-        return
-    
+        sentiment_counts[(msg.get('sentiment') or {}).get('label') or 'UNKNOWN'] += 1
+    return dict(sentiment_counts)
+
+def word_count_histogram(messages) -> List[int]:
+    """
+    Mesaj uzunluğu (kelime sayısı) histogramı: histogram[k] = k kelimeli mesaj sayısı.
+
+    Args:
+        messages: Mesaj listesi, MessageTable, compute_message_kernel çıktısı
+            veya MessageStatisticsAccumulator
+    """
+    if hasattr(messages, "kernel"):
+        messages = messages.kernel
+    if isinstance(messages, Mapping):
+        return list(messages.get('word_count_histogram', []))
+    if isinstance(messages, MessageTable):
+        from analysis_statistics import compute_message_kernel
+        return compute_message_kernel(messages).get('word_count_histogram', [])
+    counts = Counter(len(msg.split()) for msg in as_message_list(messages))
+    return [counts.get(k, 0) for k in range(max(counts) + 1)] if counts else []
+
+# --- Çizim ---
+
+def _pyplot(headless: bool = True):
+    """pyplot'u yükler; dosyaya çizimde etkileşimsiz Agg arka ucunu zorlar"""
+    import matplotlib
+    if headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+def _style_sheets(plt, style: str) -> List:
+    """Yapılandırmadaki stil adını matplotlib stil sayfasına çevirir (seaborn adları dahil)"""
+    if not style:
+        return []
+    for name in (style, f"seaborn-v0_8-{style}", f"seaborn-{style}"):
+        if name in plt.style.available:
+            return [name]
+    try:
+        # Stil sayfası karşılığı yoksa seaborn'un kendi ayarları kullanılır
+        import seaborn as sns
+        return [sns.axes_style(style)]
+    except (ImportError, ValueError):
+        return []
+
+def _draw_entity_distribution(plt, entity_counts: Mapping[str, int], settings: Dict):
+    labels = list(entity_counts.keys())
+    counts = list(entity_counts.values())
+
+    fig, ax = plt.subplots(figsize=settings["figure_size"])
+    ax.bar(labels, counts, color='skyblue', edgecolor='navy', alpha=0.7)
+    ax.set_xlabel('Entity Tipi', fontsize=12)
+    ax.set_ylabel('Sayı', fontsize=12)
+    ax.set_title('Entity Dağılımı', fontsize=14, fontweight='bold')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
+    return fig
+
+def _draw_sentiment_distribution(plt, sentiment_counts: Mapping[str, int], settings: Dict):
     labels = list(sentiment_counts.keys())
     counts = list(sentiment_counts.values())
-    colors = ['#4CAF50' if 'POSITIVE' in label.upper() else '#F44336' if 'NEGATIVE' in label.upper() else '#FFC107' 
+    colors = ['#4CAF50' if 'POSITIVE' in label.upper() else '#F44336' if 'NEGATIVE' in label.upper() else '#FFC107'
               for label in labels]
-    
-    plt.figure(figsize=(8, 6))
-    plt.pie(counts, labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
-    plt.title('Duygu Dağılımı', fontsize=14, fontweight='bold')
-    
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Grafik kaydedildi: {save_path}")
+
+    fig, ax = plt.subplots(figsize=settings["figure_size"])
+    ax.pie(counts, labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
+    ax.set_title('Duygu Dağılımı', fontsize=14, fontweight='bold')
+    return fig
+
+def _draw_message_length_distribution(plt, histogram: Sequence[int], settings: Dict):
+    # Histogram kovaları ağırlık olarak verilir; çizim ham uzunluk listesiyle aynıdır
+    lengths = [k for k, count in enumerate(histogram) if count]
+    weights = [histogram[k] for k in lengths]
+    mean = sum(k * w for k, w in zip(lengths, weights)) / sum(weights)
+
+    fig, ax = plt.subplots(figsize=settings["figure_size"])
+    ax.hist(lengths, bins=30, weights=weights, color='steelblue', edgecolor='black', alpha=0.7)
+    ax.set_xlabel('Mesaj Uzunluğu (Kelime Sayısı)', fontsize=12)
+    ax.set_ylabel('Frekans', fontsize=12)
+    ax.set_title('Mesaj Uzunluk Dağılımı', fontsize=14, fontweight='bold')
+    ax.axvline(mean, color='red', linestyle='--', label=f'Ortalama: {mean:.1f}')
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+def _draw_author_comparison(plt, comparison_stats: Mapping[str, Dict], settings: Dict):
+    authors = list(comparison_stats.keys())
+    metrics = ['total_messages', 'avg_words_per_message', 'avg_characters_per_message']
+    width, height = settings["figure_size"]
+
+    # Üç panel yan yana: genişlik 1.5 kat
+    fig, axes = plt.subplots(1, len(metrics), figsize=(width * 1.5, height))
+    for ax, metric in zip(axes, metrics):
+        values = [comparison_stats[author].get(metric, 0) for author in authors]
+        ax.bar(authors, values, color=['#FF6B6B', '#4ECDC4', '#95E1D3'][:len(authors)], alpha=0.7)
+        ax.set_title(metric.replace('_', ' ').title(), fontweight='bold')
+        ax.set_ylabel('Değer')
+        ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+    return fig
+
+def _draw_word_frequency(plt, top_words: Sequence[tuple], settings: Dict):
+    words = [w[0] for w in top_words]
+    counts = [w[1] for w in top_words]
+    # Özet sonuçlarında gerçek sayı [sayı - hata, sayı] aralığındadır; aralık hata çubuğuyla gösterilir
+    errors = [w[2] if len(w) > 2 else 0 for w in top_words]
+    estimated = any(errors)
+
+    fig, ax = plt.subplots(figsize=settings["figure_size"])
+    ax.barh(words, counts, color='coral', edgecolor='darkred', alpha=0.7,
+            xerr=[errors, [0] * len(errors)] if estimated else None, ecolor='gray', capsize=3)
+    ax.set_xlabel('Kullanım Sayısı (tahmini)' if estimated else 'Kullanım Sayısı', fontsize=12)
+    ax.set_ylabel('Kelimeler', fontsize=12)
+    ax.set_title(f'En Sık Kullanılan {len(top_words)} Kelime', fontsize=14, fontweight='bold')
+    ax.invert_yaxis()
+    fig.tight_layout()
+    return fig
+
+# Grafik türü -> (çizim fonksiyonu, boş veri mesajı)
+CHARTS: Dict[str, Tuple[Callable, str]] = {
+    "entity_distribution": (_draw_entity_distribution, "Görselleştirilecek entity bulunamadı."),
+    "sentiment_distribution": (_draw_sentiment_distribution, "Görselleştirilecek duygu verisi bulunamadı."),
+    "message_length_distribution": (_draw_message_length_distribution, "Görselleştirilecek mesaj bulunamadı."),
+    "author_comparison": (_draw_author_comparison, "Karşılaştırılacak veri bulunamadı."),
+    "word_frequency": (_draw_word_frequency, "Görselleştirilecek kelime bulunamadı."),
+}
+
+def render_chart(kind: str, data, save_path: Optional[str] = None,
+                 settings: Optional[Dict] = None) -> Optional[str]:
+    """
+    Tek bir grafiği önceden hesaplanmış özetten çizer.
+
+    Args:
+        kind: CHARTS anahtarı
+        data: Grafiğin özeti (sayım sözlüğü, histogram, karşılaştırma, kelime listesi)
+        save_path: Kaydedilecek dosya yolu (None ise gösterir)
+        settings: visualization_settings çıktısı (None ise varsayılanlar)
+
+    Returns:
+        Optional[str]: Kaydedilen dosya yolu; veri boşsa veya gösterildiyse None
+    """
+    draw, _ = CHARTS[kind]
+    if not data:
+        return None
+    settings = settings or DEFAULT_SETTINGS
+    plt = _pyplot(headless=save_path is not None)
+    with plt.style.context(_style_sheets(plt, settings.get("style"))), plt.rc_context({"font.family": FONT_FAMILY}):
+        fig = draw(plt, data, settings)
+        try:
+            if save_path:
+                fig.savefig(save_path, dpi=settings["dpi"], bbox_inches='tight')
+            else:
+                plt.show()
+        finally:
+            plt.close(fig)
+    return save_path
+
+def _render_chart_args(args) -> Optional[str]:
+    return render_chart(*args)
+
+def render_report(charts: Sequence[Tuple[str, Any, str]], settings: Optional[Dict] = None,
+                  workers: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Bir raporun grafiklerini süreç havuzunda paralel çizer ve dosyaya kaydeder.
+
+    Args:
+        charts: (tür, özet, dosya yolu) listesi; özetler süreçlere gönderildiği
+            için küçük tutulmalıdır (ham mesaj listesi değil)
+        settings: visualization_settings çıktısı (None ise config.json)
+        workers: Süreç sayısı (None ise grafik ve CPU sayısının küçüğü; 1 ise aynı süreçte)
+
+    Returns:
+        List[Optional[str]]: Her grafik için kaydedilen yol (boş veri veya hata için None)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    settings = settings or visualization_settings()
+    jobs = [(kind, data, save_path, settings) for kind, data, save_path in charts if data]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    results = {}
+    if workers <= 1:
+        for job in jobs:
+            try:
+                results[job[2]] = render_chart(*job)
+            except Exception as e:
+                print(f"  Görselleştirme hatası ({job[0]}): {e}")
     else:
-        plt.show()
-    
-    plt.close()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(job, pool.submit(_render_chart_args, job)) for job in jobs]
+            for job, future in futures:
+                try:
+                    results[job[2]] = future.result()
+                except Exception as e:
+                    print(f"  Görselleştirme hatası ({job[0]}): {e}")
+
+    saved = []
+    for kind, data, save_path in charts:
+        path = results.get(save_path) if data else None
+        if path:
+            print(f"Grafik kaydedildi: {path}")
+        elif not data:
+            print(CHARTS[kind][1])
+        saved.append(path)
+    return saved
+
+def _plot(kind: str, data, save_path: Optional[str], settings: Optional[Dict]):
+    if not data:
+        print(CHARTS[kind][1])
+        return
+    if render_chart(kind, data, save_path, settings or visualization_settings()):
+        print(f"Grafik kaydedildi: {save_path}")
+
+# --- Tek grafik fonksiyonları ---
+
+def plot_entity_distribution(messages_with_entities, save_path: str = None, settings: Optional[Dict] = None):
+    """
+    Entity dağılımını görselleştirir.
+
+    Args:
+        messages_with_entities: Etiket -> sayı sözlüğü (entity_label_counts), entity
+            içeren mesaj listesi veya MessageTable
+        save_path: Kaydedilecek dosya yolu (None ise gösterir)
+        settings: visualization_settings çıktısı (None ise config.json)
+    """
+    counts = messages_with_entities if isinstance(messages_with_entities, Mapping) \
+        else entity_label_counts(messages_with_entities)
+    _plot("entity_distribution", counts, save_path, settings)
 
-def plot_message_length_distribution(messages: List[str], save_path: str = None):
+def plot_sentiment_distribution(messages_with_sentiment, save_path: str = None, settings: Optional[Dict] = None):
+    """
+    Duygu dağılımını görselleştirir.
+
+    Args:
+        messages_with_sentiment: Etiket -> sayı sözlüğü (sentiment_label_counts), duygu
+            analizi içeren mesaj listesi veya MessageTable
+        save_path: Kaydedilecek dosya yolu
+        settings: visualization_settings çıktısı (None ise config.json)
+    """
+    counts = messages_with_sentiment if isinstance(messages_with_sentiment, Mapping) \
+        else sentiment_label_counts(messages_with_sentiment)
+    _plot("sentiment_distribution", counts, save_path, settings)
+
+def plot_message_length_distribution(messages, save_path: str = None, settings: Optional[Dict] = None):
     """
     Mesaj uzunluk dağılımını görselleştirir.
-    
+
     Args:
-        messages: Mesaj listesi
+        messages: Mesaj listesi, MessageTable, compute_message_kernel çıktısı veya
+            MessageStatisticsAccumulator (histogram kovalarından çizilir)
         save_path: Kaydedilecek dosya yolu
+        settings: visualization_settings çıktısı (None ise config.json)
     """
-    lengths = [len(msg.split()) for msg in messages]
-    
-    if not lengths:
-        print("Görselleştirilecek mesaj bulunamadı.")
-        return
-    
-    plt.figure(figsize=(10, 6))
-    plt.hist(lengths, bins=30, color='steelblue', edgecolor='black', alpha=0.7)
-    plt.xlabel('Mesaj Uzunluğu (Kelime Sayısı)', fontsize=12)
-    plt.ylabel('Frekans', fontsize=12)
-    plt.title('Mesaj Uzunluk Dağılımı', fontsize=14, fontweight='bold')
-    plt.axvline(sum(lengths)/len(lengths), color='red', linestyle='--', 
-                label=f'Ortalama: {sum(lengths)/len(lengths):.1f}')
-    plt.legend()
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Grafik kaydedildi: {save_path}")
-    else:
-        plt.show()
-    
-    plt.close()
+    _plot("message_length_distribution", word_count_histogram(messages), save_path, settings)
 
-def plot_author_comparison(comparison_stats: Dict, save_path: str = None):
+def plot_author_comparison(comparison_stats: Dict, save_path: str = None, settings: Optional[Dict] = None):
     """
     Yazarlar arası karşılaştırmayı görselleştirir.
-    
+
     Args:
         comparison_stats: compare_authors() fonksiyonunun çıktısı
         save_path: Kaydedilecek dosya yolu
+        settings: visualization_settings çıktısı (None ise config.json)
     """
-    if not comparison_stats:
-        print("Karşılaştırılacak veri bulunamadı.")
-        return
-    
-    authors = list(comparison_stats.keys())
-    metrics = ['total_messages', 'avg_words_per_message', 'avg_characters_per_message']
-    
-    fig, axes = plt.subplots(1, len(metrics), figsize=(15, 5))
-    
-    for idx, metric in enumerate(metrics):
-        values = [comparison_stats[author].get(metric, 0) for author in authors]
-        axes[idx].bar(authors, values, color=['#FF6B6B', '#4ECDC4', '#95E1D3'][:len(authors)], alpha=0.7)
-        axes[idx].set_title(metric.replace('_', ' ').title(), fontweight='bold')
-        axes[idx].set_ylabel('Değer')
-        axes[idx].tick_params(axis='x', rotation=45)
-    
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Grafik kaydedildi: {save_path}")
-    else:
-        plt.show()
-    
-    plt.close()
+    _plot("author_comparison", comparison_stats, save_path, settings)
 
-def plot_word_frequency(word_counts: List[tuple], top_n: int = 20, save_path: str = None):
+def plot_word_frequency(word_counts: List[tuple], top_n: int = 20, save_path: str = None,
+                        settings: Optional[Dict] = None):
     """
     En sık kullanılan kelimeleri görselleştirir.
-    
+
     Args:
-        word_counts: (kelime, sayı) formatında tuple listesi
+        word_counts: (kelime, sayı) formatında tuple listesi, (kelime, sayı, hata)
+            WordEstimate listesi ya da result(top_n) metodu olan bir biriktirici
+            (WordCountAccumulator / WordSketchAccumulator)
         top_n: Gösterilecek kelime sayısı
         save_path: Kaydedilecek dosya yolu
+        settings: visualization_settings çıktısı (None ise config.json)
     """
-    if not word_counts:
-        print("Görselleştirilecek kelime bulunamadı.")
-        return
-    
-    top_words = word_counts[:top_n]
-    words = [w[0] for w in top_words]
-    counts = [w[1] for w in top_words]
-    
-    plt.figure(figsize=(12, 8))
-    plt.barh(words, counts, color='coral', edgecolor='darkred', alpha=0.7)
-    plt.xlabel('Kullanım Sayısı', fontsize=12)
-    plt.ylabel('Kelimeler', fontsize=12)
-    plt.title(f'En Sık Kullanılan {top_n} Kelime', fontsize=14, fontweight='bold')
-    plt.gca().invert_yaxis()
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Grafik kaydedildi: {save_path}")
-    else:
-        plt.show()
-    
-    plt.close()
+    if hasattr(word_counts, "result"):
+        word_counts = word_counts.result(top_n)
+    _plot("word_frequency", list(word_counts or [])[:top_n], save_path, settings)